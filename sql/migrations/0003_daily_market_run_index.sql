@@ -0,0 +1,2 @@
+-- Incremental validation scopes daily rows by the run that last changed them.
+CREATE INDEX IF NOT EXISTS idx_daily_run_id ON daily_market_data(run_id);
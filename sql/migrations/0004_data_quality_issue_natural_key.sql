@@ -0,0 +1,33 @@
+-- One row per (dataset, day, market, instrument/index, issue code); re-detection refreshes it instead of appending.
+ALTER TABLE data_quality_issues ADD COLUMN IF NOT EXISTS market_code VARCHAR(20) NULL;
+
+UPDATE data_quality_issues q
+SET market_code = i.market_code
+FROM instruments i
+WHERE q.instrument_id = i.instrument_id
+  AND q.market_code IS NULL;
+
+-- Market-level rows written before market_code existed cannot be attributed to a market; the next
+-- validation run re-detects them with a market, so close the legacy ones.
+UPDATE data_quality_issues
+SET resolved_at = now()
+WHERE issue_code = 'OPEN_DAY_TOTAL_MISSING'
+  AND market_code IS NULL
+  AND resolved_at IS NULL;
+
+DELETE FROM data_quality_issues q
+USING (
+    SELECT issue_id,
+           row_number() OVER (
+               PARTITION BY dataset_name, trade_date, market_code, instrument_id, index_code, issue_code
+               ORDER BY (resolved_at IS NULL) DESC, detected_at DESC, issue_id DESC
+           ) AS rn
+    FROM data_quality_issues
+) ranked
+WHERE q.issue_id = ranked.issue_id
+  AND ranked.rn > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_data_quality_issues_natural_key
+ON data_quality_issues(dataset_name, trade_date, market_code, instrument_id, index_code, issue_code) NULLS NOT DISTINCT;
+
+CREATE INDEX IF NOT EXISTS idx_issues_resolved_at ON data_quality_issues(resolved_at) WHERE resolved_at IS NOT NULL;
@@ -0,0 +1,32 @@
+-- Pre-aggregated issue counts per (day, market, dataset, issue code, severity), refreshed by date range
+-- whenever issues are written, resolved or purged (see Repository.refresh_issue_summary).
+CREATE TABLE IF NOT EXISTS data_quality_issue_summary (
+    trade_date DATE NULL,
+    market_code VARCHAR(20) NULL,
+    dataset_name VARCHAR(50) NOT NULL,
+    issue_code VARCHAR(50) NOT NULL,
+    severity VARCHAR(10) NOT NULL,
+    open_count BIGINT NOT NULL,
+    resolved_count BIGINT NOT NULL,
+    last_detected_at TIMESTAMP NOT NULL,
+    refreshed_at TIMESTAMP NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_data_quality_issue_summary
+ON data_quality_issue_summary(trade_date, market_code, dataset_name, issue_code, severity) NULLS NOT DISTINCT;
+
+CREATE INDEX IF NOT EXISTS idx_issue_summary_market_date ON data_quality_issue_summary(market_code, trade_date);
+
+CREATE INDEX IF NOT EXISTS idx_issues_market_date ON data_quality_issues(market_code, trade_date);
+
+INSERT INTO data_quality_issue_summary(
+    trade_date, market_code, dataset_name, issue_code, severity, open_count, resolved_count, last_detected_at, refreshed_at
+)
+SELECT trade_date, market_code, dataset_name, issue_code, severity,
+       COUNT(*) FILTER (WHERE resolved_at IS NULL),
+       COUNT(*) FILTER (WHERE resolved_at IS NOT NULL),
+       MAX(detected_at),
+       now() AT TIME ZONE 'UTC'
+FROM data_quality_issues
+GROUP BY trade_date, market_code, dataset_name, issue_code, severity
+ON CONFLICT DO NOTHING;
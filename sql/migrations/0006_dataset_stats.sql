@@ -0,0 +1,31 @@
+-- Row counts and trade date bounds per dataset partition: market for daily prices and instruments,
+-- index_code/index_name for benchmarks. Maintained by the repository upserts (see
+-- Repository._bump_dataset_stats) so the dashboard summary never scans the fact tables.
+CREATE TABLE IF NOT EXISTS dataset_stats (
+    dataset_name VARCHAR(50) NOT NULL,
+    partition_key VARCHAR(240) NOT NULL,
+    row_count BIGINT NOT NULL,
+    date_from DATE NULL,
+    date_to DATE NULL,
+    updated_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (dataset_name, partition_key)
+);
+
+INSERT INTO dataset_stats(dataset_name, partition_key, row_count, date_from, date_to, updated_at)
+SELECT 'daily_market_data', i.market_code, COUNT(*), MIN(d.trade_date), MAX(d.trade_date), now() AT TIME ZONE 'UTC'
+FROM daily_market_data d
+JOIN instruments i ON i.instrument_id = d.instrument_id
+GROUP BY i.market_code
+ON CONFLICT DO NOTHING;
+
+INSERT INTO dataset_stats(dataset_name, partition_key, row_count, date_from, date_to, updated_at)
+SELECT 'benchmark_index_data', index_code || '/' || index_name, COUNT(*), MIN(trade_date), MAX(trade_date), now() AT TIME ZONE 'UTC'
+FROM benchmark_index_data
+GROUP BY index_code, index_name
+ON CONFLICT DO NOTHING;
+
+INSERT INTO dataset_stats(dataset_name, partition_key, row_count, date_from, date_to, updated_at)
+SELECT 'instruments', market_code, COUNT(*), MIN(listing_date), MAX(listing_date), now() AT TIME ZONE 'UTC'
+FROM instruments
+GROUP BY market_code
+ON CONFLICT DO NOTHING;
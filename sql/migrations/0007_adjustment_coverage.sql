@@ -0,0 +1,21 @@
+-- Adjustment factor coverage per (trade_date, as_of_date): daily rows on the day and how many of them
+-- have a factor for that as_of_date. Every day with daily data has a 9999-12-31 row. Daily inserts bump
+-- daily_rows and factor writes recount their range (see Repository.refresh_adjustment_coverage).
+CREATE TABLE IF NOT EXISTS adjustment_coverage (
+    trade_date DATE NOT NULL,
+    as_of_date DATE NOT NULL,
+    daily_rows BIGINT NOT NULL,
+    factor_rows BIGINT NOT NULL,
+    updated_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (trade_date, as_of_date)
+);
+
+INSERT INTO adjustment_coverage(trade_date, as_of_date, daily_rows, factor_rows, updated_at)
+SELECT d.trade_date, a.as_of_date, COUNT(*), COUNT(p.instrument_id), now() AT TIME ZONE 'UTC'
+FROM daily_market_data d
+CROSS JOIN (SELECT DATE '9999-12-31' AS as_of_date UNION SELECT DISTINCT as_of_date FROM price_adjustment_factors) a
+LEFT JOIN price_adjustment_factors p
+  ON p.instrument_id = d.instrument_id AND p.trade_date = d.trade_date AND p.as_of_date = a.as_of_date
+GROUP BY d.trade_date, a.as_of_date
+HAVING a.as_of_date = DATE '9999-12-31' OR COUNT(p.instrument_id) > 0
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,18 @@
+-- Split adjustment_coverage per market: collections of different markets for the same day bump their
+-- own rows instead of contending on one (trade_date, as_of_date) row until their day commits.
+-- The table is derived, so it is emptied and recounted under the new key.
+DELETE FROM adjustment_coverage;
+
+ALTER TABLE adjustment_coverage ADD COLUMN IF NOT EXISTS market_code VARCHAR(20) NOT NULL;
+ALTER TABLE adjustment_coverage DROP CONSTRAINT IF EXISTS adjustment_coverage_pkey;
+ALTER TABLE adjustment_coverage ADD PRIMARY KEY (trade_date, as_of_date, market_code);
+
+INSERT INTO adjustment_coverage(trade_date, as_of_date, market_code, daily_rows, factor_rows, updated_at)
+SELECT d.trade_date, a.as_of_date, i.market_code, COUNT(*), COUNT(p.instrument_id), now() AT TIME ZONE 'UTC'
+FROM daily_market_data d
+JOIN instruments i ON i.instrument_id = d.instrument_id
+CROSS JOIN (SELECT DATE '9999-12-31' AS as_of_date UNION SELECT DISTINCT as_of_date FROM price_adjustment_factors) a
+LEFT JOIN price_adjustment_factors p
+  ON p.instrument_id = d.instrument_id AND p.trade_date = d.trade_date AND p.as_of_date = a.as_of_date
+GROUP BY d.trade_date, a.as_of_date, i.market_code
+HAVING a.as_of_date = DATE '9999-12-31' OR COUNT(p.instrument_id) > 0;
@@ -0,0 +1,10 @@
+-- Covering indexes for the ETag validators (Repository.get_instrument_daily_version and
+-- get_benchmark_daily_version): their counts and newest write times come from index-only scans.
+CREATE INDEX IF NOT EXISTS idx_daily_instrument_collected
+ON daily_market_data(instrument_id, trade_date) INCLUDE (collected_at);
+
+CREATE INDEX IF NOT EXISTS idx_price_adjustment_factors_instrument_created
+ON price_adjustment_factors(instrument_id, as_of_date, trade_date) INCLUDE (created_at);
+
+CREATE INDEX IF NOT EXISTS idx_index_series_collected
+ON benchmark_index_data(index_code, index_name, trade_date) INCLUDE (collected_at);
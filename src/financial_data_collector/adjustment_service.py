@@ -73,8 +73,12 @@ class AdjustmentService:
                 )
                 cumulative *= factor
 
-        self.repo.clear_price_adjustment_factors(date_from=date_from, date_to=date_to, as_of_date=as_of_date)
-        upserted = self.repo.upsert_price_adjustment_factors(rows)
+        with self.repo.transaction():
+            self.repo.clear_price_adjustment_factors(date_from=date_from, date_to=date_to, as_of_date=as_of_date, refresh_coverage=False)
+            upserted = self.repo.upsert_price_adjustment_factors(rows, refresh_coverage=False)
+            self.repo.refresh_adjustment_coverage(date_from, date_to, as_of_date)
+            # Rebuilds are not runs; API processes still have to drop responses built on the old factors.
+            self.repo.notify_data_changed()
         return {
             "trade_dates": len(trade_rows),
             "factors": upserted,
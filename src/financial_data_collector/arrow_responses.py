@@ -0,0 +1,137 @@
+"""Arrow IPC stream and Parquet encodings for API responses, selected through the Accept header."""
+from typing import Iterable, Iterator, List
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi.responses import StreamingResponse
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+FORMAT_MEDIA_TYPES = {
+    ARROW_STREAM_MEDIA_TYPE: "arrow",
+    PARQUET_MEDIA_TYPE: "parquet",
+    "application/x-parquet": "parquet",
+    "application/json": "json",
+}
+
+INSTRUMENT_DAILY_SCHEMA = pa.schema([
+    pa.field("instrument_id", pa.string()),
+    pa.field("external_code", pa.string()),
+    pa.field("market_code", pa.string()),
+    pa.field("instrument_name", pa.string()),
+    pa.field("listing_date", pa.date32()),
+    pa.field("delisting_date", pa.date32()),
+    pa.field("trade_date", pa.date32()),
+    pa.field("open", pa.float64()),
+    pa.field("high", pa.float64()),
+    pa.field("low", pa.float64()),
+    pa.field("close", pa.float64()),
+    pa.field("volume", pa.int64()),
+    pa.field("turnover_value", pa.float64()),
+    pa.field("market_value", pa.float64()),
+    pa.field("listed_shares", pa.int64()),
+    pa.field("base_price", pa.float64()),
+    pa.field("daily_factor", pa.float64()),
+    pa.field("cumulative_factor", pa.float64()),
+    pa.field("adj_open", pa.float64()),
+    pa.field("adj_high", pa.float64()),
+    pa.field("adj_low", pa.float64()),
+    pa.field("adj_close", pa.float64()),
+    pa.field("adj_volume", pa.float64()),
+    pa.field("is_trade_halted", pa.bool_()),
+    pa.field("record_status", pa.string()),
+    pa.field("source_name", pa.string()),
+    pa.field("collected_at", pa.timestamp("us")),
+])
+
+BENCHMARK_DAILY_SCHEMA = pa.schema([
+    pa.field("index_code", pa.string()),
+    pa.field("index_name", pa.string()),
+    pa.field("trade_date", pa.date32()),
+    pa.field("open", pa.float64()),
+    pa.field("high", pa.float64()),
+    pa.field("low", pa.float64()),
+    pa.field("close", pa.float64()),
+    pa.field("volume", pa.int64()),
+    pa.field("turnover_value", pa.float64()),
+    pa.field("market_cap", pa.float64()),
+    pa.field("record_status", pa.string()),
+    pa.field("source_name", pa.string()),
+    pa.field("collected_at", pa.timestamp("us")),
+])
+
+CALENDAR_SCHEMA = pa.schema([
+    pa.field("market_code", pa.string()),
+    pa.field("trade_date", pa.date32()),
+    pa.field("is_open", pa.bool_()),
+    pa.field("holiday_name", pa.string()),
+])
+
+
+def negotiate_format(accept: str) -> str:
+    """Return "arrow", "parquet" or "json" for an Accept header; the first supported media type wins."""
+    for part in (accept or "").split(","):
+        media_type, *params = [token.strip() for token in part.split(";")]
+        if any(p.replace(" ", "") in ("q=0", "q=0.0") for p in params):
+            continue
+        fmt = FORMAT_MEDIA_TYPES.get(media_type.lower())
+        if fmt:
+            return fmt
+    return "json"
+
+
+def request_format(request) -> str:
+    return negotiate_format(request.headers.get("accept", ""))
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the response generator."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def encode_batches(fmt: str, schema: pa.Schema, batches: Iterable[pa.RecordBatch]) -> Iterator[bytes]:
+    """Encode record batches as they arrive; Parquet writes one row group per batch."""
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema) if fmt == "arrow" else pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            writer.write_batch(batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        writer.close()
+        yield sink.drain()
+    finally:
+        # Release the database cursor even when the client goes away mid-stream.
+        close = getattr(batches, "close", None)
+        if close is not None:
+            close()
+
+
+def batch_response(fmt: str, schema: pa.Schema, batches: Iterable[pa.RecordBatch]) -> StreamingResponse:
+    media_type = ARROW_STREAM_MEDIA_TYPE if fmt == "arrow" else PARQUET_MEDIA_TYPE
+    return StreamingResponse(encode_batches(fmt, schema, batches), media_type=media_type, headers={"Vary": "Accept"})
@@ -1,8 +1,8 @@
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List
-from uuid import UUID
+from datetime import datetime, timezone
+from typing import List
 
 from .repository import Repository
+from .runs import RunRef, resolve_run_id
 
 
 class TradingCalendarBuilder:
@@ -16,35 +16,8 @@ class TradingCalendarBuilder:
         date_to,
         index_trade_dates: List,
         source_name: str,
-        run_id: str,
+        run_id: RunRef,
     ) -> int:
-        open_days = {str(d) for d in index_trade_dates}
-        persisted_run_id = None
-        if run_id:
-            try:
-                normalized = str(UUID(str(run_id)))
-                if self.repo.query("SELECT run_id FROM collection_runs WHERE run_id = %s", (normalized,)):
-                    persisted_run_id = normalized
-            except ValueError:
-                persisted_run_id = None
-        current = date_from
-        rows: List[Dict] = []
+        persisted_run_id = resolve_run_id(self.repo, run_id)
         now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-
-        while current <= date_to:
-            day = str(current)
-            rows.append(
-                {
-                    "market_code": market_code,
-                    "trade_date": day,
-                    "is_open": day in open_days,
-                    "holiday_name": None if day in open_days else "CLOSED",
-                    "source_name": source_name,
-                    "collected_at": now,
-                    "run_id": persisted_run_id,
-                }
-            )
-            current = current + timedelta(days=1)
-
-        self.repo.upsert_trading_calendar(rows)
-        return len(rows)
+        return self.repo.build_trading_calendar(market_code, date_from, date_to, index_trade_dates, source_name, now, persisted_run_id)
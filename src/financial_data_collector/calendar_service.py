@@ -0,0 +1,133 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from threading import Lock, RLock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+CalendarLoader = Callable[[], List[Dict]]
+DateLike = Union[date, str]
+
+_CALENDARS: Dict[Tuple[str, Optional[str]], "TradingCalendar"] = {}
+_CALENDARS_LOCK = Lock()
+
+
+def _ordinal(value: DateLike) -> int:
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+
+class MarketCalendar:
+    """Trading days of one market as sorted arrays of date ordinals; lookups are bisections."""
+
+    __slots__ = ("market_code", "days", "open_days", "holidays")
+
+    def __init__(self, market_code: str, rows: Iterable[Tuple[int, bool, Optional[str]]]):
+        self.market_code = market_code
+        self.days = array("l")
+        self.open_days = array("l")
+        self.holidays: Dict[int, Optional[str]] = {}
+        for ordinal, is_open, holiday_name in sorted(rows):
+            self.days.append(ordinal)
+            if is_open:
+                self.open_days.append(ordinal)
+            else:
+                self.holidays[ordinal] = holiday_name
+
+    def is_open(self, day: DateLike) -> bool:
+        ordinal = _ordinal(day)
+        pos = bisect_left(self.open_days, ordinal)
+        return pos < len(self.open_days) and self.open_days[pos] == ordinal
+
+    def next_open(self, day: DateLike, inclusive: bool = False) -> Optional[date]:
+        ordinal = _ordinal(day)
+        pos = bisect_left(self.open_days, ordinal) if inclusive else bisect_right(self.open_days, ordinal)
+        return date.fromordinal(self.open_days[pos]) if pos < len(self.open_days) else None
+
+    def prev_open(self, day: DateLike, inclusive: bool = False) -> Optional[date]:
+        ordinal = _ordinal(day)
+        pos = bisect_right(self.open_days, ordinal) if inclusive else bisect_left(self.open_days, ordinal)
+        return date.fromordinal(self.open_days[pos - 1]) if pos > 0 else None
+
+    def offset(self, day: DateLike, sessions: int) -> Optional[date]:
+        """The open day `sessions` sessions after `day` (before it when negative); 0 is `day` itself or the next session."""
+        ordinal = _ordinal(day)
+        if sessions > 0:
+            pos = bisect_right(self.open_days, ordinal) + sessions - 1
+        elif sessions < 0:
+            pos = bisect_left(self.open_days, ordinal) + sessions
+        else:
+            pos = bisect_left(self.open_days, ordinal)
+        return date.fromordinal(self.open_days[pos]) if 0 <= pos < len(self.open_days) else None
+
+    def count_open_between(self, date_from: DateLike, date_to: DateLike) -> int:
+        """Open days in [date_from, date_to]."""
+        return max(bisect_right(self.open_days, _ordinal(date_to)) - bisect_left(self.open_days, _ordinal(date_from)), 0)
+
+    def rows(self, date_from: DateLike, date_to: DateLike) -> List[Dict]:
+        start = bisect_left(self.days, _ordinal(date_from))
+        end = bisect_right(self.days, _ordinal(date_to))
+        return [
+            {
+                "market_code": self.market_code,
+                "trade_date": date.fromordinal(ordinal).isoformat(),
+                "is_open": ordinal not in self.holidays,
+                "holiday_name": self.holidays.get(ordinal),
+            }
+            for ordinal in self.days[start:end]
+        ]
+
+
+class TradingCalendar:
+    """Process-local copy of `trading_calendar`, one MarketCalendar per market.
+
+    Loads lazily on first use; repository write paths that touch `trading_calendar` call `invalidate()`.
+    Writes from other processes are picked up by the API server's data change listener, which reacts
+    to the notification `RunManager.finish` sends.
+    """
+
+    def __init__(self, loader: CalendarLoader):
+        self._loader = loader
+        self._lock = RLock()
+        self._markets: Optional[Dict[str, MarketCalendar]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._markets is not None
+
+    def _ensure_loaded(self) -> Dict[str, MarketCalendar]:
+        markets = self._markets
+        if markets is not None:
+            return markets
+        with self._lock:
+            if self._markets is None:
+                grouped: Dict[str, List[Tuple[int, bool, Optional[str]]]] = {}
+                for row in self._loader():
+                    grouped.setdefault(str(row["market_code"]).upper(), []).append((_ordinal(row["trade_date"]), bool(row["is_open"]), row.get("holiday_name")))
+                self._markets = {code: MarketCalendar(code, rows) for code, rows in grouped.items()}
+            return self._markets
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._markets = None
+
+    def market(self, market_code: str) -> MarketCalendar:
+        code = str(market_code).upper()
+        return self._ensure_loaded().get(code) or MarketCalendar(code, [])
+
+    def get_calendar(self, market_codes: Iterable[str], date_from: DateLike, date_to: DateLike) -> List[Dict]:
+        codes = sorted({str(c).strip().upper() for c in market_codes if str(c).strip()})
+        rows: List[Dict] = []
+        for code in codes:
+            rows.extend(self.market(code).rows(date_from, date_to))
+        return rows
+
+
+def calendar_for(database_url: str, schema: Optional[str], loader: CalendarLoader) -> TradingCalendar:
+    key = (database_url, schema)
+    with _CALENDARS_LOCK:
+        calendar = _CALENDARS.get(key)
+        if calendar is None:
+            calendar = TradingCalendar(loader)
+            _CALENDARS[key] = calendar
+        return calendar
@@ -40,7 +40,7 @@ def run_kind_delisting_collection(
     repo.init_schema()
     kind_client = client or KINDClient()
     run_manager = RunManager(repo)
-    run_id = run_manager.start(
+    run = run_manager.start(
         "phase1-collect-delisting-kind",
         source_name,
         date_from.isoformat(),
@@ -59,23 +59,23 @@ def run_kind_delisting_collection(
                 )
             )
         deduped = _deduplicate_rows(collected_rows)
-        snapshot_result = repo.upsert_delisting_snapshot(deduped, source_name=source_name, run_id=run_id)
-        result = repo.bulk_update_delisting_dates(deduped, source_name=source_name, run_id=run_id)
+        snapshot_result = repo.upsert_delisting_snapshot(deduped, source_name=source_name, run_id=run.run_id)
+        result = repo.bulk_update_delisting_dates(deduped, source_name=source_name, run_id=run.run_id)
         run_manager.finish(
-            run_id=run_id,
+            run_id=run,
             success_count=result["updated"] + result["unchanged"],
             failure_count=result["invalid"] + snapshot_result["invalid"],
             warning_count=result["unmatched"],
         )
         return {
-            "run_id": run_id,
+            "run_id": run.run_id,
             "collected": len(collected_rows),
             "deduped": len(deduped),
             "snapshot": snapshot_result,
             "result": result,
         }
     except Exception:
-        run_manager.fail(run_id)
+        run_manager.fail(run)
         raise
 
 
@@ -0,0 +1,275 @@
+import argparse
+import json
+import logging
+import os
+import signal
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .collect_krx_data import _build_client, _collect_market
+from .krx_client import KRXClient
+from .repository import Repository
+from .settings import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MarketSchedule:
+    market_code: str
+    index_code: str
+    run_at: time
+
+
+def parse_schedule(spec: str, index_codes: Optional[List[str]] = None) -> List[MarketSchedule]:
+    """Parse `KOSDAQ=08:00,KOSPI=08:10` into schedules; index codes map by order and default to the market code."""
+    entries = [e.strip() for e in spec.split(",") if e.strip()]
+    if not entries:
+        raise ValueError("schedule must contain at least one MARKET=HH:MM entry")
+    indices = [i.strip().upper() for i in index_codes or [] if i.strip()]
+    if indices and len(indices) != len(entries):
+        raise ValueError("index codes count must match schedule entries")
+    schedules: List[MarketSchedule] = []
+    for pos, entry in enumerate(entries):
+        market_code, sep, run_at = entry.partition("=")
+        if not sep or not market_code.strip():
+            raise ValueError(f"invalid schedule entry: {entry}")
+        try:
+            parsed = datetime.strptime(run_at.strip(), "%H:%M").time()
+        except ValueError as exc:
+            raise ValueError(f"invalid schedule time in entry: {entry}") from exc
+        market = market_code.strip().upper()
+        schedules.append(MarketSchedule(market_code=market, index_code=indices[pos] if indices else market, run_at=parsed))
+    return schedules
+
+
+def _utc_iso(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class CollectorDaemon:
+    """Long-lived KRX collector: one warm Repository, per-market daily schedule, catch-up from the last good run."""
+
+    def __init__(
+        self,
+        repo: Repository,
+        schedules: List[MarketSchedule],
+        client_factory: Callable[[], KRXClient] = _build_client,
+        source_name: str = "krx",
+        tz: timezone = timezone(timedelta(hours=9)),
+        date_offset_days: int = 1,
+        max_catchup_days: int = 31,
+        retry_after: timedelta = timedelta(minutes=30),
+        status_path: Optional[str] = None,
+    ):
+        self.repo = repo
+        self.schedules = schedules
+        self.client_factory = client_factory
+        self.source_name = source_name
+        self.tz = tz
+        self.date_offset_days = date_offset_days
+        self.max_catchup_days = max_catchup_days
+        self.retry_after = retry_after
+        self.status_path = Path(status_path) if status_path else None
+        self._client: Optional[KRXClient] = None
+        self._client_day: Optional[date] = None
+        self._lock = threading.Lock()
+        self._done_through: Dict[str, date] = {}
+        self._retry_at: Dict[str, datetime] = {}
+        self._status: Dict[str, Any] = {
+            "state": "starting",
+            "started_at": _utc_iso(datetime.now(timezone.utc)),
+            "heartbeat_at": None,
+            "markets": {s.market_code: {"index_code": s.index_code, "run_at": s.run_at.strftime("%H:%M")} for s in schedules},
+        }
+
+    def _now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def _get_client(self, today: date) -> KRXClient:
+        # KRXClient counts calls against the daily quota for its lifetime, so start a fresh one each local day.
+        if self._client is None or self._client_day != today:
+            self._client = self.client_factory()
+            self._client_day = today
+        return self._client
+
+    def _last_collected_day(self, market_code: str) -> Optional[date]:
+        # Same rule as `_collect`: a run that completed counts even when validation marked it FAILED;
+        # only runs aborted by an exception are collected again.
+        if market_code not in self._done_through:
+            rows = self.repo.query(
+                """
+                SELECT MAX(window_end) AS last_day
+                FROM collection_runs
+                WHERE pipeline_name = %s
+                  AND (status IN ('SUCCESS', 'PARTIAL') OR metadata @> '{"completed": true}')
+                """,
+                (f"phase1-collect-{market_code}",),
+            )
+            last_day = rows[0]["last_day"] if rows else None
+            if last_day is None:
+                return None
+            self._done_through[market_code] = last_day if isinstance(last_day, date) else date.fromisoformat(str(last_day))
+        return self._done_through[market_code]
+
+    def pending_window(self, schedule: MarketSchedule, now: datetime) -> Optional[Dict[str, date]]:
+        if now.time() < schedule.run_at:
+            return None
+        retry_at = self._retry_at.get(schedule.market_code)
+        if retry_at is not None and now < retry_at:
+            return None
+        target = now.date() - timedelta(days=self.date_offset_days)
+        last_day = self._last_collected_day(schedule.market_code)
+        if last_day is not None and last_day >= target:
+            return None
+        date_from = target if last_day is None else last_day + timedelta(days=1)
+        earliest = target - timedelta(days=self.max_catchup_days - 1)
+        if date_from < earliest:
+            logger.warning("Catch-up for %s capped at %d days (last collected %s)", schedule.market_code, self.max_catchup_days, last_day)
+            date_from = earliest
+        return {"date_from": date_from, "date_to": target}
+
+    def tick(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        now = now or self._now()
+        results: List[Dict[str, Any]] = []
+        for schedule in self.schedules:
+            window = self.pending_window(schedule, now)
+            if window is None:
+                continue
+            results.append(self._collect(schedule, window["date_from"], window["date_to"], now))
+        self._update_status(state="idle", heartbeat_at=_utc_iso(datetime.now(timezone.utc)))
+        return results
+
+    def _collect(self, schedule: MarketSchedule, date_from: date, date_to: date, now: datetime) -> Dict[str, Any]:
+        market = schedule.market_code
+        logger.info("Collecting %s (%s) %s..%s", market, schedule.index_code, date_from, date_to)
+        self._update_status(state="collecting", market=market, last_started_at=_utc_iso(datetime.now(timezone.utc)), window=[date_from.isoformat(), date_to.isoformat()])
+        try:
+            result = _collect_market(self.repo, self._get_client(now.date()), market, schedule.index_code, date_from, date_to, self.source_name)
+        except Exception as exc:
+            logger.exception("Collection failed for %s", market)
+            self._retry_at[market] = now + self.retry_after
+            self._update_status(market=market, last_finished_at=_utc_iso(datetime.now(timezone.utc)), last_error=str(exc), retry_at=_utc_iso(self._retry_at[market]))
+            return {"run_id": None, "market_code": market, "error": str(exc)}
+        self._retry_at.pop(market, None)
+        self._done_through[market] = date_to
+        self._update_status(market=market, last_finished_at=_utc_iso(datetime.now(timezone.utc)), last_error=None, retry_at=None, last_run_id=result["run_id"], last_counts=result["counts"], done_through=date_to.isoformat())
+        return result
+
+    def _update_status(self, market: Optional[str] = None, **fields: Any) -> None:
+        with self._lock:
+            if market is None:
+                self._status.update(fields)
+            else:
+                self._status["markets"][market].update(fields)
+            snapshot = json.dumps(self._status, ensure_ascii=False, indent=2)
+        if self.status_path is not None:
+            self.status_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.status_path.with_suffix(self.status_path.suffix + ".tmp")
+            tmp_path.write_text(snapshot, encoding="utf-8")
+            os.replace(tmp_path, self.status_path)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return json.loads(json.dumps(self._status))
+
+    def run_forever(self, stop_event: threading.Event, poll_seconds: float = 30.0) -> None:
+        self._update_status(state="idle")
+        while not stop_event.is_set():
+            try:
+                self.tick()
+            except Exception:
+                # Scheduling errors (e.g. the database is briefly unreachable) must not kill the daemon.
+                logger.exception("Collector tick failed")
+                self._update_status(state="degraded", heartbeat_at=_utc_iso(datetime.now(timezone.utc)))
+            stop_event.wait(poll_seconds)
+        self._update_status(state="stopped")
+
+
+def start_status_server(daemon: CollectorDaemon, host: str, port: int, stale_after_seconds: float) -> ThreadingHTTPServer:
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path not in ("/", "/health", "/status"):
+                self.send_error(404)
+                return
+            status = daemon.status()
+            healthy = status["state"] in ("idle", "collecting", "starting")
+            heartbeat = status.get("heartbeat_at")
+            if healthy and heartbeat and status["state"] == "idle":
+                age = (datetime.now(timezone.utc) - datetime.fromisoformat(heartbeat.replace("Z", "+00:00"))).total_seconds()
+                healthy = age <= stale_after_seconds
+            body = json.dumps(status, ensure_ascii=False).encode("utf-8")
+            self.send_response(200 if healthy or self.path == "/status" else 503)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug("status server: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), StatusHandler)
+    threading.Thread(target=server.serve_forever, name="collector-status", daemon=True).start()
+    return server
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run the KRX collector as a long-lived scheduled process.")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", ""))
+    parser.add_argument("--schedule", default=os.getenv("COLLECTOR_SCHEDULE", "KOSDAQ=08:00,KOSPI=08:00"), help="Comma-separated MARKET=HH:MM local run times")
+    parser.add_argument("--index-codes", default=os.getenv("COLLECTOR_INDEX_CODES", ""), help="Comma-separated index codes mapped by order to --schedule")
+    parser.add_argument("--utc-offset-hours", type=float, default=float(os.getenv("COLLECTOR_UTC_OFFSET_HOURS", "9")), help="Offset of the schedule clock from UTC (KST=9)")
+    parser.add_argument("--date-offset-days", type=int, default=int(os.getenv("COLLECTOR_DATE_OFFSET_DAYS", "1")), help="Collect the local day minus this many days")
+    parser.add_argument("--max-catchup-days", type=int, default=int(os.getenv("COLLECTOR_MAX_CATCHUP_DAYS", "31")))
+    parser.add_argument("--retry-minutes", type=float, default=float(os.getenv("COLLECTOR_RETRY_MINUTES", "30")))
+    parser.add_argument("--poll-seconds", type=float, default=float(os.getenv("COLLECTOR_POLL_SECONDS", "30")))
+    parser.add_argument("--status-file", default=os.getenv("COLLECTOR_STATUS_FILE", ""), help="Write daemon status JSON to this path")
+    parser.add_argument("--status-host", default=os.getenv("COLLECTOR_STATUS_HOST", "127.0.0.1"))
+    parser.add_argument("--status-port", type=int, default=int(os.getenv("COLLECTOR_STATUS_PORT", "0")), help="Serve /health and /status on this port (0 disables)")
+    parser.add_argument("--source-name", default="krx")
+    parser.add_argument("--db-pipeline", action="store_true", help="Batch database statements with psycopg pipeline mode")
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    return parser
+
+
+def main() -> None:
+    load_dotenv(".env")
+    args = _build_parser().parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if not args.database_url:
+        raise ValueError("--database-url or DATABASE_URL is required")
+    schedules = parse_schedule(args.schedule, args.index_codes.split(",") if args.index_codes.strip() else None)
+    _build_client()  # fail fast on missing KRX settings
+
+    repo = Repository(args.database_url, pool_size=2, pipeline=args.db_pipeline)
+    repo.init_schema()
+    daemon = CollectorDaemon(
+        repo,
+        schedules,
+        source_name=args.source_name,
+        tz=timezone(timedelta(hours=args.utc_offset_hours)),
+        date_offset_days=args.date_offset_days,
+        max_catchup_days=args.max_catchup_days,
+        retry_after=timedelta(minutes=args.retry_minutes),
+        status_path=args.status_file or None,
+    )
+    server = start_status_server(daemon, args.status_host, args.status_port, stale_after_seconds=max(args.poll_seconds * 3, 60)) if args.status_port else None
+
+    stop_event = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop_event.set())
+    logger.info("Collector daemon started: %s", ", ".join(f"{s.market_code}@{s.run_at.strftime('%H:%M')}" for s in schedules))
+    try:
+        daemon.run_forever(stop_event, poll_seconds=args.poll_seconds)
+    finally:
+        if server is not None:
+            server.shutdown()
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import json
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from typing import Any, Dict, Iterable, List, Optional
 from uuid import UUID, uuid5
@@ -235,15 +236,40 @@ def _normalize_benchmark(rows: List[Dict[str, Any]], index_code: str, trade_date
     return normalized
 
 
-def run_collection(database_url: str, market_code: str, index_code: str, date_from: date, date_to: date, source_name: str = "krx") -> Dict[str, Any]:
-    load_dotenv(".env")
+def _build_client() -> KRXClient:
     settings = KRXSettings.from_env()
     settings.validate()
-    repo = Repository(database_url)
-    repo.init_schema()
-    client = KRXClient(KRXClientConfig.from_settings(settings))
+    return KRXClient(KRXClientConfig.from_settings(settings))
+
+
+def run_collection(
+    database_url: str,
+    market_code: str,
+    index_code: str,
+    date_from: date,
+    date_to: date,
+    source_name: str = "krx",
+    client: Optional[KRXClient] = None,
+    repo: Optional[Repository] = None,
+    pipeline: bool = False,
+) -> Dict[str, Any]:
+    load_dotenv(".env")
+    if client is None:
+        client = _build_client()
+    owns_repo = repo is None
+    if owns_repo:
+        repo = Repository(database_url, pool_size=2, pipeline=pipeline)
+    try:
+        repo.init_schema()
+        return _collect_market(repo, client, market_code, index_code, date_from, date_to, source_name)
+    finally:
+        if owns_repo:
+            repo.close()
+
+
+def _collect_market(repo: Repository, client: KRXClient, market_code: str, index_code: str, date_from: date, date_to: date, source_name: str) -> Dict[str, Any]:
     run_manager = RunManager(repo)
-    run_id = run_manager.start(f"phase1-collect-{market_code.upper()}", source_name, date_from.isoformat(), date_to.isoformat())
+    run = run_manager.start(f"phase1-collect-{market_code.upper()}", source_name, date_from.isoformat(), date_to.isoformat())
     instrument_collector = InstrumentCollector(repo)
     daily_collector = DailyMarketCollector(repo)
     benchmark_collector = BenchmarkCollector(repo)
@@ -261,21 +287,40 @@ def run_collection(database_url: str, market_code: str, index_code: str, date_fr
             benchmark_payload = client.get_index_daily(index_code, trade_day)
             normalized_daily = _normalize_daily_market(_extract_rows(daily_payload), market_code, trade_day, base_price_rows=_extract_rows(base_price_payload))
             normalized_benchmark = _normalize_benchmark(_extract_rows(benchmark_payload), index_code, trade_day)
-            daily_count += daily_collector.collect(normalized_daily, source_name, run_id)
-            benchmark_count += benchmark_collector.collect(normalized_benchmark, source_name, run_id)
+            # One (market, day) is one unit of work: either all of its rows and issues land, or none do.
+            with repo.transaction():
+                day_daily_count = daily_collector.collect(normalized_daily, source_name, run)
+                day_benchmark_count = benchmark_collector.collect(normalized_benchmark, source_name, run, detect_gaps=False)
+            daily_count += day_daily_count
+            benchmark_count += day_benchmark_count
             if normalized_benchmark:
                 index_days.append(trade_day)
-        calendar_count = calendar_builder.build_from_index_days(market_code=market_code.upper(), date_from=date_from, date_to=date_to, index_trade_dates=index_days, source_name=source_name, run_id=run_id)
-        validation = validation_job.validate_range(market_code.upper(), date_from.isoformat(), date_to.isoformat(), run_id)
-        AdjustmentService(repo).rebuild_factors(date_from.isoformat(), date_to.isoformat(), run_id=run_id)
-        run_manager.finish(run_id=run_id, success_count=instrument_count + daily_count + benchmark_count + calendar_count, failure_count=validation["errors"], warning_count=validation["warnings"])
+        calendar_count = calendar_builder.build_from_index_days(market_code=market_code.upper(), date_from=date_from, date_to=date_to, index_trade_dates=index_days, source_name=source_name, run_id=run)
+        # A single day cannot show a gap, so benchmark gaps are checked once over the window against its calendar.
+        benchmark_code = benchmark_collector.index_code_map.get(index_code.upper())
+        if benchmark_code:
+            benchmark_collector.detect_gaps(benchmark_code, date_from.isoformat(), date_to.isoformat(), source_name, run)
+        validation = validation_job.validate_range(market_code.upper(), date_from.isoformat(), date_to.isoformat(), run, changed_only=True)
+        AdjustmentService(repo).rebuild_factors(date_from.isoformat(), date_to.isoformat(), run_id=run.run_id)
+        run_manager.finish(run_id=run, success_count=instrument_count + daily_count + benchmark_count + calendar_count, failure_count=validation["errors"], warning_count=validation["warnings"])
     except Exception:
-        run_manager.fail(run_id)
+        run_manager.fail(run)
         raise
-    return {"run_id": run_id, "counts": {"instruments": instrument_count, "daily_market": daily_count, "benchmark": benchmark_count}}
-
-
-def run_collection_multi(database_url: str, market_codes: List[str], index_codes: Optional[List[str]], date_from: date, date_to: date, source_name: str = "krx") -> Dict[str, Any]:
+    return {"run_id": run.run_id, "market_code": market_code.upper(), "counts": {"instruments": instrument_count, "daily_market": daily_count, "benchmark": benchmark_count}}
+
+
+def run_collection_multi(
+    database_url: str,
+    market_codes: List[str],
+    index_codes: Optional[List[str]],
+    date_from: date,
+    date_to: date,
+    source_name: str = "krx",
+    pipeline: bool = False,
+    parallel_markets: bool = False,
+    client: Optional[KRXClient] = None,
+    repo: Optional[Repository] = None,
+) -> Dict[str, Any]:
     markets = [m.strip().upper() for m in market_codes if m.strip()]
     if not markets:
         raise ValueError("at least one market code is required")
@@ -284,7 +329,28 @@ def run_collection_multi(database_url: str, market_codes: List[str], index_codes
         indices = indices * len(markets)
     if len(indices) != len(markets):
         raise ValueError("index codes count must match market codes count (or provide one shared index code)")
-    return {"markets": [run_collection(database_url, market_code, index_code, date_from, date_to, source_name=source_name) for market_code, index_code in zip(markets, indices)]}
+    pairs = list(zip(markets, indices))
+    if not parallel_markets or len(pairs) == 1:
+        return {"markets": [run_collection(database_url, market_code, index_code, date_from, date_to, source_name=source_name, client=client, repo=repo, pipeline=pipeline) for market_code, index_code in pairs]}
+
+    # Markets are independent, so each runs in its own thread with its own Repository (and pool) unless one is
+    # injected. The KRX client is shared so every market draws from the same daily API quota.
+    load_dotenv(".env")
+    if client is None:
+        client = _build_client()
+    results: List[Dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=len(pairs), thread_name_prefix="collect-market") as executor:
+        futures = [
+            executor.submit(run_collection, database_url, market_code, index_code, date_from, date_to, source_name=source_name, client=client, repo=repo, pipeline=pipeline)
+            for market_code, index_code in pairs
+        ]
+        for (market_code, index_code), future in zip(pairs, futures):
+            try:
+                results.append(future.result())
+            except Exception as exc:
+                logger.exception("Collection failed for market %s", market_code)
+                results.append({"run_id": None, "market_code": market_code, "index_code": index_code, "error": str(exc)})
+    return {"markets": results}
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -297,6 +363,8 @@ def _build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--date-from", required=True, help="YYYY-MM-DD")
     parser.add_argument("--date-to", required=True, help="YYYY-MM-DD")
     parser.add_argument("--source-name", default="krx")
+    parser.add_argument("--db-pipeline", action="store_true", help="Batch database statements with psycopg pipeline mode (for high-latency database links)")
+    parser.add_argument("--parallel-markets", action="store_true", help="Collect markets concurrently; a failed market is reported without aborting the others")
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
     return parser
 
@@ -315,10 +383,12 @@ def main() -> None:
     if args.market_code.strip():
         market_code = args.market_code.strip().upper()
         index_code = (args.index_code.strip() or market_code).upper()
-        result = run_collection(args.database_url, market_code, index_code, date_from, date_to, source_name=args.source_name)
+        result = run_collection(args.database_url, market_code, index_code, date_from, date_to, source_name=args.source_name, pipeline=args.db_pipeline)
     else:
-        result = run_collection_multi(args.database_url, args.market_codes.split(","), args.index_codes.split(",") if args.index_codes.strip() else None, date_from, date_to, source_name=args.source_name)
+        result = run_collection_multi(args.database_url, args.market_codes.split(","), args.index_codes.split(",") if args.index_codes.strip() else None, date_from, date_to, source_name=args.source_name, pipeline=args.db_pipeline, parallel_markets=args.parallel_markets)
     print(json.dumps(result, ensure_ascii=False, indent=2))
+    if any("error" in market for market in result.get("markets", [])):
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
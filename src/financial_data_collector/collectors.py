@@ -1,10 +1,8 @@
-from datetime import date, datetime, timedelta, timezone
-from typing import Dict, List
-from uuid import UUID, uuid5
+from datetime import date, datetime, timezone
+from typing import Dict, List, Set
 
 from .repository import Repository
-
-UUID_COERCE_NAMESPACE = UUID("7c76f04a-fca0-494d-96f8-6a68f1f21e84")
+from .runs import RunContext, RunRef, _coerce_uuid, resolve_run_id
 
 
 def _to_iso(value) -> str:
@@ -25,26 +23,6 @@ def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
 
-def _coerce_uuid(value: str) -> str:
-    if value is None:
-        return value
-    raw = str(value).strip()
-    if not raw:
-        return raw
-    try:
-        return str(UUID(raw))
-    except ValueError:
-        return str(uuid5(UUID_COERCE_NAMESPACE, raw))
-
-
-def _resolve_existing_run_id(repo: Repository, run_id: str) -> str:
-    if not run_id:
-        return None
-    normalized = _coerce_uuid(run_id)
-    rows = repo.query("SELECT run_id FROM collection_runs WHERE run_id = %s", (normalized,))
-    return normalized if rows else None
-
-
 def _issue(dataset_name: str, issue_code: str, severity: str, source_name: str, detected_at: str, run_id: str = None, trade_date: str = None, instrument_id: str = None, index_code: str = None, issue_detail: str = None) -> Dict:
     return {
         "dataset_name": dataset_name,
@@ -103,9 +81,9 @@ class DailyMarketCollector:
     def __init__(self, repo: Repository):
         self.repo = repo
 
-    def collect(self, rows: List[Dict], source_name: str, run_id: str) -> int:
+    def collect(self, rows: List[Dict], source_name: str, run_id: RunRef) -> int:
         now = _utc_now_iso()
-        persisted_run_id = _resolve_existing_run_id(self.repo, run_id)
+        persisted_run_id = resolve_run_id(self.repo, run_id)
         normalized = []
         issues = []
         for r in rows:
@@ -181,7 +159,7 @@ class DailyMarketCollector:
                     }
                 )
             if missing_rows:
-                self.repo.upsert_instruments(missing_rows)
+                self.repo.insert_missing_instruments(missing_rows)
             self.repo.upsert_daily_market(normalized)
         if issues:
             self.repo.insert_issues(issues)
@@ -193,12 +171,31 @@ class BenchmarkCollector:
         self.repo = repo
         self.index_code_map = index_code_map or {"KOSDAQ": "KOSDAQ", "KOSPI": "KOSPI"}
 
-    def collect(self, rows: List[Dict], source_name: str, run_id: str) -> int:
+    def _open_days(self, index_code: str, date_from: str, date_to: str, run: RunRef) -> Set[str]:
+        # Benchmark index codes are market codes; a run collecting several chunks reuses the lookup.
+        key = ("open_days", index_code, date_from, date_to)
+        cache = run.cache if isinstance(run, RunContext) else {}
+        if key not in cache:
+            cache[key] = set(self.repo.get_open_days(index_code, date_from, date_to))
+        return cache[key]
+
+    def _gap_issues(self, index_code: str, index_name: str, trade_dates: Set[str], date_from: str, date_to: str, source_name: str, now: str, persisted_run_id: str, run: RunRef) -> List[Dict]:
+        open_days = self._open_days(index_code, date_from, date_to, run)
+        return [
+            _issue("benchmark_index_data", "BENCHMARK_DAY_MISSING", "WARN", source_name, now, run_id=persisted_run_id, trade_date=missing, index_code=index_code, issue_detail=f"missing benchmark day for {index_code}/{index_name}")
+            for missing in sorted(open_days - trade_dates)
+        ]
+
+    def collect(self, rows: List[Dict], source_name: str, run_id: RunRef, detect_gaps: bool = True) -> int:
+        """Upsert benchmark rows; with `detect_gaps`, also flag sessions missing between each series' first and last row.
+
+        Callers that collect one day at a time pass `detect_gaps=False` and run `detect_gaps` over the window instead.
+        """
         now = _utc_now_iso()
-        persisted_run_id = _resolve_existing_run_id(self.repo, run_id)
+        persisted_run_id = resolve_run_id(self.repo, run_id)
         normalized = []
         issues = []
-        dates_by_series: Dict[tuple, set] = {}
+        dates_by_series: Dict[tuple, Set[str]] = {}
         for r in rows:
             raw_index_code = str(r.get("index_code", "")).upper()
             if raw_index_code not in self.index_code_map:
@@ -243,18 +240,36 @@ class BenchmarkCollector:
                     "run_id": persisted_run_id,
                 }
             )
-            dates_by_series.setdefault((index_code, index_name), set()).add(date.fromisoformat(trade_date))
-        for (index_code, index_name), trade_dates in dates_by_series.items():
-            if len(trade_dates) <= 1:
-                continue
-            current = min(trade_dates)
-            end = max(trade_dates)
-            while current <= end:
-                if current not in trade_dates:
-                    issues.append(_issue("benchmark_index_data", "BENCHMARK_DAY_MISSING", "WARN", source_name, now, run_id=persisted_run_id, trade_date=current.isoformat(), index_code=index_code, issue_detail=f"missing benchmark day for {index_code}/{index_name}"))
-                current += timedelta(days=1)
+            dates_by_series.setdefault((index_code, index_name), set()).add(trade_date)
+        if detect_gaps:
+            for (index_code, index_name), trade_dates in dates_by_series.items():
+                if len(trade_dates) > 1:
+                    issues.extend(self._gap_issues(index_code, index_name, trade_dates, min(trade_dates), max(trade_dates), source_name, now, persisted_run_id, run_id))
         if normalized:
             self.repo.upsert_benchmark(normalized)
         if issues:
             self.repo.insert_issues(issues)
-        return len(normalized)
\ No newline at end of file
+        if detect_gaps:
+            # Days that now have data, or are no longer inside a detected gap, close their earlier gap issues.
+            for index_code in {code for code, _ in dates_by_series}:
+                trade_dates = set().union(*(dates for (code, _), dates in dates_by_series.items() if code == index_code))
+                self.repo.resolve_stale_issues("benchmark_index_data", ["BENCHMARK_DAY_MISSING"], min(trade_dates), max(trade_dates), now, index_code=index_code)
+        return len(normalized)
+
+    def detect_gaps(self, index_code: str, date_from: str, date_to: str, source_name: str, run_id: RunRef) -> int:
+        """Flag the sessions in [date_from, date_to] that a stored series of `index_code` lacks, and close gaps that filled.
+
+        Run it once the window's trading calendar is built; returns the number of open gaps.
+        """
+        now = _utc_now_iso()
+        persisted_run_id = resolve_run_id(self.repo, run_id)
+        dates_by_name: Dict[str, Set[str]] = {}
+        for r in self.repo.get_benchmark_days(index_code, date_from, date_to):
+            dates_by_name.setdefault(r["index_name"], set()).add(r["trade_date"])
+        issues = []
+        for index_name, trade_dates in sorted(dates_by_name.items()):
+            issues.extend(self._gap_issues(index_code, index_name, trade_dates, date_from, date_to, source_name, now, persisted_run_id, run_id))
+        if issues:
+            self.repo.insert_issues(issues)
+        self.repo.resolve_stale_issues("benchmark_index_data", ["BENCHMARK_DAY_MISSING"], date_from, date_to, now, index_code=index_code)
+        return len(issues)
\ No newline at end of file
@@ -1,15 +1,35 @@
 """Dashboard routes for minimal backtest data browsing."""
+import re
+from datetime import date
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
 
+import pyarrow as pa
 from fastapi import APIRouter, HTTPException, Query, Request
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
 
-router = APIRouter()
+from .arrow_responses import BENCHMARK_DAILY_SCHEMA, CALENDAR_SCHEMA, INSTRUMENT_DAILY_SCHEMA, batch_response, request_format
+from .json_responses import FastJSONRoute, columnar, ndjson_lines
+from .repository import Repository
+
+router = APIRouter(route_class=FastJSONRoute)
 
 DASHBOARD_HTML = Path(__file__).parent / "dashboard.html"
 DASHBOARD_CSS = Path(__file__).parent / "dashboard.css"
 DASHBOARD_JS = Path(__file__).parent / "dashboard.js"
 
+# Narrower ETag versions for single-resource reads; other API paths are versioned by the latest finished run.
+ETAG_VERSIONS = [
+    (
+        re.compile(r"^/api/v1/instruments/(?P<external_code>[^/]+)/daily$"),
+        lambda repo, path, query: repo.get_instrument_daily_version(path["external_code"], query.get("date_from", ""), query.get("date_to", "")),
+    ),
+    (
+        re.compile(r"^/api/v1/benchmarks/(?P<index_code>[^/]+)/daily$"),
+        lambda repo, path, query: repo.get_benchmark_daily_version(path["index_code"], query.get("series_name", ""), query.get("date_from", ""), query.get("date_to", "")),
+    ),
+]
+
 
 @router.get("/dashboard", response_class=HTMLResponse, include_in_schema=False)
 async def dashboard(request: Request):
@@ -43,9 +63,101 @@ async def get_instrument_profile(external_code: str, request: Request):
     return payload
 
 
+# `shape=columnar` on the daily endpoints returns {"columns": [...], "data": {column: [...]}} in place of "items".
+SHAPE_PATTERN = "^(rows|columnar)$"
+
+
+def _shaped(payload: Dict, shape: str, columns: Iterable[str]) -> Dict:
+    if shape != "columnar":
+        return payload
+    items = payload.pop("items")
+    payload.update(columnar(items, list(columns)))
+    return payload
+
+
 @router.get("/api/v1/instruments/{external_code}/daily")
-async def get_prices(external_code: str, request: Request, date_from: str = Query(""), date_to: str = Query(""), limit: int = Query(250, ge=1, le=2000), offset: int = Query(0, ge=0)):
-    return request.app.state.repo.get_instrument_daily(external_code=external_code, date_from=date_from, date_to=date_to, limit=limit, offset=offset)
+async def get_prices(external_code: str, request: Request, date_from: str = Query(""), date_to: str = Query(""), limit: int = Query(250, ge=1, le=2000), offset: int = Query(0, ge=0), shape: str = Query("rows", pattern=SHAPE_PATTERN)):
+    fmt = request_format(request)
+    if fmt != "json":
+        batches = request.app.state.repo.instrument_daily_batches(external_code, INSTRUMENT_DAILY_SCHEMA, date_from=date_from, date_to=date_to, limit=limit, offset=offset)
+        return batch_response(fmt, INSTRUMENT_DAILY_SCHEMA, batches)
+    payload = request.app.state.repo.get_instrument_daily(external_code=external_code, date_from=date_from, date_to=date_to, limit=limit, offset=offset)
+    return _shaped(payload, shape, INSTRUMENT_DAILY_SCHEMA.names)
+
+
+def _split_codes(raw: str, upper: bool = False) -> List[str]:
+    codes = [code.strip() for code in raw.split(",") if code.strip()]
+    return [code.upper() for code in codes] if upper else codes
+
+
+def _ndjson_chunks(rows: Iterable[Dict], rows_per_chunk: int = 1000) -> Iterator[bytes]:
+    chunk = []
+    try:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= rows_per_chunk:
+                yield ndjson_lines(chunk)
+                chunk = []
+        if chunk:
+            yield ndjson_lines(chunk)
+    finally:
+        # Release the database cursor even when the client goes away mid-stream.
+        close = getattr(rows, "close", None)
+        if close is not None:
+            close()
+
+
+def _date_range(date_from: str, date_to: str) -> None:
+    try:
+        if date.fromisoformat(date_from) > date.fromisoformat(date_to):
+            raise ValueError("date_from must be <= date_to")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _projection(columns: str) -> Optional[List[str]]:
+    selected = _split_codes(columns)
+    unknown = [c for c in selected if c not in Repository.PANEL_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown columns: {unknown}; choose from {list(Repository.PANEL_COLUMNS)}")
+    return selected or None
+
+
+def _panel_response(request: Request, date_from: str, date_to: str, codes: List[str], market_codes: List[str], columns: Optional[List[str]]):
+    repo = request.app.state.repo
+    fmt = request_format(request)
+    if fmt != "json":
+        schema = pa.schema([INSTRUMENT_DAILY_SCHEMA.field(c) for c in columns]) if columns else INSTRUMENT_DAILY_SCHEMA
+        batches = repo.instrument_panel_batches(date_from, date_to, schema, external_codes=codes, market_codes=market_codes)
+        return batch_response(fmt, schema, batches)
+    rows = repo.stream_instrument_panel(date_from, date_to, external_codes=codes, market_codes=market_codes, columns=columns)
+    return StreamingResponse(_ndjson_chunks(rows), media_type="application/x-ndjson")
+
+
+@router.get("/api/v1/panel/daily")
+async def get_daily_panel(request: Request, date_from: str = Query(...), date_to: str = Query(...), codes: str = Query(""), market_codes: str = Query(""), columns: str = Query("")):
+    """Daily rows of many instruments ordered by (trade_date, external_code): NDJSON, or Arrow/Parquet on request."""
+    _date_range(date_from, date_to)
+    return _panel_response(request, date_from, date_to, _split_codes(codes), _split_codes(market_codes, upper=True), _projection(columns))
+
+
+@router.get("/api/v1/markets/{market_code}/daily")
+async def get_market_daily_range(market_code: str, request: Request, date_from: str = Query(...), date_to: str = Query(...), columns: str = Query("")):
+    """Adjusted cross-sections of a whole market for every day in the range, streamed like the panel."""
+    _date_range(date_from, date_to)
+    return _panel_response(request, date_from, date_to, [], [market_code.upper()], _projection(columns))
+
+
+@router.get("/api/v1/markets/{market_code}/daily/{trade_date}")
+async def get_market_daily(market_code: str, trade_date: str, request: Request, columns: str = Query(""), shape: str = Query("rows", pattern=SHAPE_PATTERN)):
+    """Adjusted cross-section of a whole market on one day."""
+    _date_range(trade_date, trade_date)
+    selected = _projection(columns)
+    if request_format(request) != "json":
+        return _panel_response(request, trade_date, trade_date, [], [market_code.upper()], selected)
+    items = list(request.app.state.repo.stream_instrument_panel(trade_date, trade_date, market_codes=[market_code.upper()], columns=selected))
+    payload = {"market_code": market_code.upper(), "trade_date": trade_date, "count": len(items), "items": items}
+    return _shaped(payload, shape, selected or Repository.PANEL_COLUMNS)
 
 
 @router.get("/api/v1/benchmarks")
@@ -54,14 +166,73 @@ async def get_benchmarks(request: Request):
 
 
 @router.get("/api/v1/benchmarks/{index_code}/daily")
-async def get_benchmark_series(index_code: str, request: Request, series_name: str = Query(""), date_from: str = Query(""), date_to: str = Query(""), limit: int = Query(250, ge=1, le=2000), offset: int = Query(0, ge=0)):
-    return request.app.state.repo.get_benchmark_daily(index_code=index_code, series_name=series_name, date_from=date_from, date_to=date_to, limit=limit, offset=offset)
+async def get_benchmark_series(index_code: str, request: Request, series_name: str = Query(""), date_from: str = Query(""), date_to: str = Query(""), limit: int = Query(250, ge=1, le=2000), offset: int = Query(0, ge=0), shape: str = Query("rows", pattern=SHAPE_PATTERN)):
+    fmt = request_format(request)
+    if fmt != "json":
+        batches = request.app.state.repo.benchmark_daily_batches(index_code, BENCHMARK_DAILY_SCHEMA, series_name=series_name, date_from=date_from, date_to=date_to, limit=limit, offset=offset)
+        return batch_response(fmt, BENCHMARK_DAILY_SCHEMA, batches)
+    payload = request.app.state.repo.get_benchmark_daily(index_code=index_code, series_name=series_name, date_from=date_from, date_to=date_to, limit=limit, offset=offset)
+    return _shaped(payload, shape, BENCHMARK_DAILY_SCHEMA.names)
 
 
 @router.get("/api/v1/calendar")
 async def get_calendar(request: Request, market_codes: str = Query(...), date_from: str = Query(...), date_to: str = Query(...)):
     codes = [code.strip().upper() for code in market_codes.split(",") if code.strip()]
-    return request.app.state.repo.get_calendar(codes, date_from, date_to)
+    try:
+        rows = request.app.state.repo.calendar.get_calendar(codes, date_from, date_to)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    fmt = request_format(request)
+    if fmt != "json":
+        batch = pa.RecordBatch.from_pylist([{**row, "trade_date": date.fromisoformat(row["trade_date"])} for row in rows], schema=CALENDAR_SCHEMA)
+        return batch_response(fmt, CALENDAR_SCHEMA, [batch])
+    return rows
+
+
+def _session_response(market_code: str, trade_date: str, result) -> dict:
+    if result is None:
+        raise HTTPException(status_code=404, detail="no open session within the stored calendar")
+    return {"market_code": market_code.upper(), "date": trade_date, "trade_date": result.isoformat()}
+
+
+def _market_calendar(request: Request, market_code: str):
+    return request.app.state.repo.calendar.market(market_code)
+
+
+@router.get("/api/v1/calendar/{market_code}/next")
+async def get_next_session(market_code: str, request: Request, trade_date: str = Query(..., alias="date"), inclusive: bool = Query(False)):
+    try:
+        result = _market_calendar(request, market_code).next_open(trade_date, inclusive=inclusive)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _session_response(market_code, trade_date, result)
+
+
+@router.get("/api/v1/calendar/{market_code}/prev")
+async def get_prev_session(market_code: str, request: Request, trade_date: str = Query(..., alias="date"), inclusive: bool = Query(False)):
+    try:
+        result = _market_calendar(request, market_code).prev_open(trade_date, inclusive=inclusive)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _session_response(market_code, trade_date, result)
+
+
+@router.get("/api/v1/calendar/{market_code}/offset")
+async def get_session_offset(market_code: str, request: Request, trade_date: str = Query(..., alias="date"), sessions: int = Query(...)):
+    try:
+        result = _market_calendar(request, market_code).offset(trade_date, sessions)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {**_session_response(market_code, trade_date, result), "sessions": sessions}
+
+
+@router.get("/api/v1/calendar/{market_code}/count")
+async def get_session_count(market_code: str, request: Request, date_from: str = Query(...), date_to: str = Query(...)):
+    try:
+        count = _market_calendar(request, market_code).count_open_between(date_from, date_to)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"market_code": market_code.upper(), "date_from": date_from, "date_to": date_to, "count": count}
 
 
 @router.get("/api/v1/adjustments/coverage")
@@ -69,18 +240,38 @@ async def get_adjustment_coverage(request: Request, date_from: str = Query(...),
     return request.app.state.repo.get_adjustment_coverage(date_from=date_from, date_to=date_to, as_of_date=as_of_date)
 
 
+@router.get("/api/v1/adjustments/missing")
+async def get_missing_adjustment_factors(request: Request, date_from: str = Query(...), date_to: str = Query(...), as_of_date: str = Query("9999-12-31"), limit: int = Query(1000, ge=1, le=10000)):
+    items = request.app.state.repo.list_missing_adjustment_factors(date_from=date_from, date_to=date_to, as_of_date=as_of_date, limit=limit)
+    return {"date_from": date_from, "date_to": date_to, "as_of_date": as_of_date, "limit": limit, "items": items}
+
+
+@router.get("/api/v1/quality/summary")
+async def get_quality_summary(request: Request, date_from: str = Query(""), date_to: str = Query(""), market_code: str = Query(""), dataset_name: str = Query(""), issue_code: str = Query(""), severity: str = Query("")):
+    return request.app.state.repo.get_issue_summary(
+        date_from=date_from, date_to=date_to, market_code=market_code.upper(), dataset_name=dataset_name, issue_code=issue_code.upper(), severity=severity.upper()
+    )
+
+
+@router.get("/api/v1/quality/issues")
+async def get_quality_issues(
+    request: Request,
+    date_from: str = Query(""),
+    date_to: str = Query(""),
+    market_code: str = Query(""),
+    dataset_name: str = Query(""),
+    issue_code: str = Query(""),
+    severity: str = Query(""),
+    status: str = Query("open", pattern="^(open|resolved|all)$"),
+    after_id: Optional[int] = Query(None, ge=1),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    return request.app.state.repo.list_issues(
+        date_from=date_from, date_to=date_to, market_code=market_code.upper(), dataset_name=dataset_name, issue_code=issue_code.upper(), severity=severity.upper(),
+        status=status, after_id=after_id, limit=limit,
+    )
+
+
 @router.get("/api/v1/dashboard/summary")
 async def get_summary(request: Request):
-    repo = request.app.state.repo
-    instrument_count = repo.query("SELECT COUNT(*) AS cnt FROM instruments")[0]["cnt"]
-    price_row = repo.query("SELECT COUNT(*) AS cnt, MIN(trade_date) AS date_from, MAX(trade_date) AS date_to FROM daily_market_data")[0]
-    bench_row = repo.query("SELECT COUNT(*) AS cnt, MIN(trade_date) AS date_from, MAX(trade_date) AS date_to FROM benchmark_index_data")[0]
-    return {
-        "instrument_count": instrument_count,
-        "price_count": price_row["cnt"],
-        "price_date_from": price_row["date_from"],
-        "price_date_to": price_row["date_to"],
-        "benchmark_count": bench_row["cnt"],
-        "benchmark_date_from": bench_row["date_from"],
-        "benchmark_date_to": bench_row["date_to"],
-    }
\ No newline at end of file
+    return request.app.state.repo.get_dashboard_summary()
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""Cross-process "stored data changed" notifications over PostgreSQL LISTEN/NOTIFY."""
+import logging
+from threading import Event, Thread
+from typing import Callable, Optional
+
+import psycopg
+
+logger = logging.getLogger(__name__)
+
+# Sent by Repository.notify_data_changed when a run finishes or adjustment factors are rebuilt; the payload is the schema name ("" for the default search_path).
+DATA_CHANGED_CHANNEL = "financial_data_changed"
+
+
+def start_change_listener(database_url: str, schema: Optional[str], on_change: Callable[[], None], stop_event: Event, poll_seconds: float = 1.0) -> Thread:
+    """Call `on_change` for every notification about `schema`, and after each (re)connect since earlier ones may be lost."""
+
+    def listen() -> None:
+        while not stop_event.is_set():
+            try:
+                with psycopg.connect(database_url, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {DATA_CHANGED_CHANNEL}")
+                    on_change()
+                    while not stop_event.is_set():
+                        for notify in conn.notifies(timeout=poll_seconds):
+                            if notify.payload == (schema or ""):
+                                on_change()
+            except psycopg.Error:
+                logger.exception("Data change listener lost its connection; reconnecting")
+                stop_event.wait(poll_seconds)
+
+    thread = Thread(target=listen, name="data-change-listener", daemon=True)
+    thread.start()
+    return thread
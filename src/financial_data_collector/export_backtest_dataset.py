@@ -10,6 +10,9 @@ import requests
 
 
 JsonGetter = Callable[[str, Dict[str, object]], object]
+BatchStreamer = Callable[[str, Dict[str, object]], Iterable[pa.RecordBatch]]
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
 
 INSTRUMENT_SCHEMA = pa.schema([
     pa.field("external_code", pa.string()),
@@ -94,6 +97,15 @@ class HttpApiClient:
         response.raise_for_status()
         return response.json()
 
+    def iter_arrow_batches(self, path: str, params: Dict[str, object]) -> Iterable[pa.RecordBatch]:
+        headers = {"Accept": ARROW_STREAM_MEDIA_TYPE}
+        with self.session.get(f"{self.base_url}{path}", params=params, headers=headers, timeout=self.timeout_sec, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            with pa.ipc.open_stream(response.raw) as reader:
+                for batch in reader:
+                    yield batch
+
 
 class ParquetTableWriter:
     def __init__(self, path: Path, schema: pa.Schema):
@@ -112,6 +124,13 @@ class ParquetTableWriter:
         self.writer.write_table(table)
         self.row_count += len(payload)
 
+    def write_batch(self, batch: pa.RecordBatch) -> None:
+        if not batch.num_rows:
+            return
+        table = pa.Table.from_batches([batch]).select(self.fieldnames).cast(self.schema)
+        self.writer.write_table(table)
+        self.row_count += table.num_rows
+
     def close(self) -> None:
         self.writer.close()
 
@@ -150,12 +169,20 @@ def export_backtest_dataset(
     series_page_size: int = 1000,
     fail_on_incomplete_factors: bool = True,
     api_get: Optional[JsonGetter] = None,
+    api_batches: Optional[BatchStreamer] = None,
 ) -> Dict[str, object]:
+    """Export the API's datasets to Parquet.
+
+    Daily instrument rows come from the panel endpoint in one request, as Arrow record batches that
+    are written to Parquet without a detour through Python dicts. Callers that inject only `api_get`
+    fall back to paging `/api/v1/instruments/{code}/daily` per instrument.
+    """
     if instrument_page_size <= 0 or series_page_size <= 0:
         raise ValueError("page sizes must be positive")
 
     client = HttpApiClient(base_url) if api_get is None else None
     get_json = api_get or client.get_json
+    get_batches = api_batches or (client.iter_arrow_batches if client is not None else None)
     resolved_from, resolved_to = _resolve_date_window(get_json, date_from, date_to)
     coverage = get_json(
         "/api/v1/adjustments/coverage",
@@ -190,17 +217,21 @@ def export_backtest_dataset(
                 if market_code:
                     market_codes.add(market_code)
 
-        for instrument in instruments:
-            code = str(instrument.get("external_code") or "").strip()
-            if not code:
-                continue
-            for batch in _iter_paged_batches(
-                get_json,
-                f"/api/v1/instruments/{code}/daily",
-                {"date_from": resolved_from, "date_to": resolved_to},
-                min(series_page_size, 2000),
-            ):
-                instrument_daily_writer.write_rows(batch)
+        if get_batches is not None:
+            for batch in get_batches("/api/v1/panel/daily", {"date_from": resolved_from, "date_to": resolved_to}):
+                instrument_daily_writer.write_batch(batch)
+        else:
+            for instrument in instruments:
+                code = str(instrument.get("external_code") or "").strip()
+                if not code:
+                    continue
+                for batch in _iter_paged_batches(
+                    get_json,
+                    f"/api/v1/instruments/{code}/daily",
+                    {"date_from": resolved_from, "date_to": resolved_to},
+                    min(series_page_size, 2000),
+                ):
+                    instrument_daily_writer.write_rows(batch)
 
         benchmarks = get_json("/api/v1/benchmarks", {})
         if not isinstance(benchmarks, list):
@@ -0,0 +1,125 @@
+from datetime import date, datetime
+from threading import Lock, RLock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+InstrumentLoader = Callable[[], List[Dict]]
+
+_REGISTRIES: Dict[Tuple[str, Optional[str]], "InstrumentRegistry"] = {}
+_REGISTRIES_LOCK = Lock()
+
+
+def _normalize_id(value) -> str:
+    raw = str(value).strip()
+    try:
+        return str(UUID(raw))
+    except ValueError:
+        return raw
+
+
+def _normalize_date(value) -> Optional[str]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+class InstrumentRegistry:
+    """Process-local view of the instrument master indexed by id and (market_code, external_code).
+
+    The registry loads lazily on first lookup and is kept coherent by the repository write paths
+    that touch `instruments`. Writers that bypass the repository must call `invalidate()`.
+    """
+
+    def __init__(self, loader: InstrumentLoader):
+        self._loader = loader
+        self._lock = RLock()
+        self._by_id: Optional[Dict[str, Dict]] = None
+        self._by_market_code: Dict[Tuple[str, str], Dict] = {}
+        self._by_code: Dict[str, List[Dict]] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._by_id is not None
+
+    def _ensure_loaded(self) -> Dict[str, Dict]:
+        with self._lock:
+            if self._by_id is None:
+                self._by_id = {}
+                self._by_market_code = {}
+                self._by_code = {}
+                try:
+                    for row in self._loader():
+                        self._put(row)
+                except Exception:
+                    self._by_id = None
+                    raise
+            return self._by_id
+
+    def _put(self, row: Dict) -> None:
+        record = {
+            "instrument_id": _normalize_id(row["instrument_id"]),
+            "external_code": str(row["external_code"]),
+            "market_code": str(row["market_code"]).upper(),
+            "listing_date": _normalize_date(row.get("listing_date")),
+            "delisting_date": _normalize_date(row.get("delisting_date")),
+        }
+        previous = self._by_id.get(record["instrument_id"])
+        if previous is not None:
+            self._by_market_code.pop((previous["market_code"], previous["external_code"]), None)
+            siblings = self._by_code.get(previous["external_code"], [])
+            self._by_code[previous["external_code"]] = [r for r in siblings if r["instrument_id"] != record["instrument_id"]]
+        self._by_id[record["instrument_id"]] = record
+        self._by_market_code[(record["market_code"], record["external_code"])] = record
+        self._by_code.setdefault(record["external_code"], []).append(record)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._by_id = None
+            self._by_market_code = {}
+            self._by_code = {}
+
+    def register(self, rows: Iterable[Dict]) -> None:
+        with self._lock:
+            if self._by_id is None:
+                return
+            for row in rows:
+                self._put(row)
+
+    def get(self, instrument_id: str) -> Optional[Dict]:
+        if not instrument_id:
+            return None
+        with self._lock:
+            return self._ensure_loaded().get(_normalize_id(instrument_id))
+
+    def existing_ids(self, instrument_ids: Iterable[str]) -> set[str]:
+        with self._lock:
+            by_id = self._ensure_loaded()
+            return {iid for iid in (_normalize_id(x) for x in instrument_ids if str(x).strip()) if iid in by_id}
+
+    def find(self, external_code: str, market_code: Optional[str] = None) -> Optional[Dict]:
+        code = str(external_code or "").strip()
+        if not code:
+            return None
+        with self._lock:
+            self._ensure_loaded()
+            if market_code:
+                return self._by_market_code.get((str(market_code).upper(), code))
+            candidates = self._by_code.get(code) or []
+            if not candidates:
+                return None
+            # Same preference as the previous SQL lookup: listed first, then the most recent listing.
+            return max(candidates, key=lambda r: (r["delisting_date"] is None, r["listing_date"] or ""))
+
+
+def registry_for(database_url: str, schema: Optional[str], loader: InstrumentLoader) -> InstrumentRegistry:
+    key = (database_url, schema)
+    with _REGISTRIES_LOCK:
+        registry = _REGISTRIES.get(key)
+        if registry is None:
+            registry = InstrumentRegistry(loader)
+            _REGISTRIES[key] = registry
+        return registry
@@ -1,3 +1,4 @@
+import threading
 from dataclasses import dataclass
 from datetime import date
 from typing import Dict, Optional
@@ -24,6 +25,8 @@ class KRXClient:
         self.config = config
         self.openapi_client = openapi_client or self._build_openapi_client()
         self._call_count = 0
+        # Shared by concurrently collected markets, so the daily quota is reserved under a lock.
+        self._call_lock = threading.Lock()
         if self.openapi_client is None:
             raise KRXClientError("pykrx_openapi is required but unavailable. Install dependency and verify AUTH_KEY.")
 
@@ -38,8 +41,14 @@ class KRXClient:
             return None
 
     def _check_limit(self) -> None:
-        if self._call_count >= self.config.daily_limit:
-            raise KRXClientError("Daily API limit exceeded")
+        with self._call_lock:
+            if self._call_count >= self.config.daily_limit:
+                raise KRXClientError("Daily API limit exceeded")
+            self._call_count += 1
+
+    def _release_call(self) -> None:
+        with self._call_lock:
+            self._call_count -= 1
 
     @staticmethod
     def _to_bas_dd(value: date) -> str:
@@ -48,19 +57,19 @@ class KRXClient:
     def _request_with_openapi(self, method_name: str, bas_dd: str) -> Dict:
         if not self.openapi_client:
             raise KRXClientError("pykrx_openapi client is unavailable")
-        self._check_limit()
         try:
             fn = getattr(self.openapi_client, method_name)
         except AttributeError as exc:
             raise KRXClientError(f"pykrx_openapi method not found: {method_name}") from exc
+        self._check_limit()
         try:
             payload = fn(bas_dd=bas_dd)
-            self._call_count += 1
-            if payload is None:
-                raise KRXClientError("Empty response payload")
-            return payload
         except Exception as exc:
+            self._release_call()
             raise KRXClientError(f"pykrx_openapi request failed: {exc}") from exc
+        if payload is None:
+            raise KRXClientError("pykrx_openapi request failed: Empty response payload")
+        return payload
 
     @staticmethod
     def _instrument_method_name(market_code: str) -> Optional[str]:
@@ -1,16 +1,21 @@
-from contextlib import closing, contextmanager
+from contextlib import contextmanager
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from pathlib import Path
+import threading
 import time
 from typing import Dict, Iterable, Iterator, List, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import psycopg
 from psycopg import sql
-from psycopg.rows import dict_row
+from psycopg.rows import dict_row, tuple_row
 from psycopg.types.json import Json
 
+from .calendar_service import TradingCalendar, calendar_for
+from .data_changes import DATA_CHANGED_CHANNEL
+from .instrument_registry import InstrumentRegistry, registry_for
+from .schema_migrations import apply_migrations, load_migrations
+
 
 class Repository:
     DEFAULT_BENCHMARK_SERIES_CANDIDATES = {
@@ -18,12 +23,35 @@ class Repository:
         "KOSPI": ["KOSPI", "코스피"],
     }
 
-    def __init__(self, database_url: str, schema: Optional[str] = None):
+    def __init__(self, database_url: str, schema: Optional[str] = None, pool_size: int = 0, pipeline: bool = False):
         self.database_url = database_url
         self.schema = schema
+        self.pool_size = max(int(pool_size or 0), 0)
+        self.pipeline = bool(pipeline)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
 
-    @contextmanager
-    def connect(self):
+    @property
+    def instruments(self) -> InstrumentRegistry:
+        return registry_for(self.database_url, self.schema, self._load_instrument_registry)
+
+    def _load_instrument_registry(self) -> List[Dict]:
+        return self.query("SELECT instrument_id, external_code, market_code, listing_date, delisting_date FROM instruments")
+
+    @property
+    def calendar(self) -> TradingCalendar:
+        return calendar_for(self.database_url, self.schema, self._load_trading_calendar)
+
+    def _load_trading_calendar(self) -> List[Dict]:
+        return self.query("SELECT market_code, trade_date, is_open, holiday_name FROM trading_calendar")
+
+    def _configure_connection(self, conn) -> None:
+        if self.schema:
+            conn.execute(sql.SQL("SET search_path TO {}").format(sql.Identifier(self.schema)))
+            conn.commit()
+
+    def _open_connection(self):
         conn = None
         last_error = None
         for attempt in range(3):
@@ -38,25 +66,98 @@ class Repository:
         if conn is None:
             raise last_error
         try:
-            if self.schema:
-                conn.execute(sql.SQL("SET search_path TO {}") .format(sql.Identifier(self.schema)))
+            self._configure_connection(conn)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                from psycopg_pool import ConnectionPool
+
+                self._pool = ConnectionPool(
+                    self.database_url,
+                    min_size=1,
+                    max_size=self.pool_size,
+                    kwargs={"row_factory": dict_row},
+                    configure=self._configure_connection,
+                    open=True,
+                )
+            return self._pool
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
+    @contextmanager
+    def connect(self):
+        active = getattr(self._local, "conn", None)
+        if active is not None:
+            # Inside transaction(): every repository call shares the unit-of-work connection.
+            yield active
+            return
+        pool = self._get_pool() if self.pool_size else None
+        conn = pool.getconn() if pool is not None else self._open_connection()
+        try:
             yield conn
             conn.commit()
         except Exception:
             conn.rollback()
             raise
         finally:
-            conn.close()
+            if pool is not None:
+                pool.putconn(conn)
+            else:
+                conn.close()
+
+    @contextmanager
+    def _write_connection(self):
+        # In pipeline mode BEGIN, the statements and COMMIT of a write path go out in one round trip.
+        if not self.pipeline or getattr(self._local, "conn", None) is not None:
+            with self.connect() as conn:
+                yield conn
+            return
+        with self.connect() as conn:
+            with conn.pipeline():
+                yield conn
+                conn.commit()
+
+    @contextmanager
+    def transaction(self, pipeline: Optional[bool] = None):
+        """Run every repository call made by this thread inside one connection and one commit.
+
+        Nested calls join the outer unit of work. On failure nothing is committed and the instrument
+        registry is reloaded, since it may already hold rows that were rolled back. `pipeline`
+        defaults to the repository-wide setting.
+        """
+        if getattr(self._local, "conn", None) is not None:
+            yield self._local.conn
+            return
+        if pipeline is None:
+            pipeline = self.pipeline
+        with self.connect() as conn:
+            self._local.conn = conn
+            try:
+                if pipeline:
+                    with conn.pipeline():
+                        yield conn
+                        conn.commit()
+                else:
+                    yield conn
+            except Exception:
+                self.instruments.invalidate()
+                raise
+            finally:
+                self._local.conn = None
 
-    def init_schema(self) -> None:
-        sql_dir = Path(__file__).resolve().parents[2] / "sql"
-        ddl = (sql_dir / "platform_schema.sql").read_text(encoding="utf-8-sig")
-        migrations = (sql_dir / "platform_postgres_migrations.sql").read_text(encoding="utf-8-sig")
+    def init_schema(self) -> List[int]:
+        migrations = load_migrations()
         with self.connect() as conn:
-            exists = conn.execute("SELECT to_regclass('instruments') AS table_name").fetchone()
-            if not exists or not exists.get("table_name"):
-                conn.execute(ddl)
-            conn.execute(migrations)
+            return apply_migrations(conn, migrations)
 
     def query(self, query_text: str, params: tuple = ()) -> List[Dict]:
         if "?" in query_text and "%s" not in query_text:
@@ -66,12 +167,16 @@ class Repository:
             return [self._normalize_row(dict(row)) for row in cur.fetchall()]
 
     def stream_query(self, query_text: str, params: tuple = (), fetch_size: int = 10000) -> Iterator[Dict]:
+        """Yield rows from a server-side cursor, `fetch_size` at a time.
+
+        Closing the generator early (a client that disconnects mid-stream) closes the cursor and
+        releases the connection.
+        """
         if "?" in query_text and "%s" not in query_text:
             query_text = query_text.replace("?", "%s")
-        conn_ctx = self.connect()
-        conn = conn_ctx.__enter__()
-        try:
-            with closing(conn.cursor()) as cur:
+        with self.connect() as conn:
+            with conn.cursor(name=f"stream_{uuid4().hex}") as cur:
+                cur.itersize = fetch_size
                 cur.execute(query_text, params)
                 while True:
                     rows = cur.fetchmany(fetch_size)
@@ -79,11 +184,28 @@ class Repository:
                         break
                     for row in rows:
                         yield self._normalize_row(dict(row))
-        except Exception:
-            conn_ctx.__exit__(*__import__("sys").exc_info())
-            raise
-        else:
-            conn_ctx.__exit__(None, None, None)
+
+    def stream_record_batches(self, query_text: str, params: tuple, schema, batch_size: int = 100_000) -> Iterator:
+        """Yield pyarrow RecordBatches of `schema` from a server-side cursor, holding one batch in memory at a time."""
+        import pyarrow as pa
+
+        with self.connect() as conn:
+            with conn.cursor(name=f"batches_{uuid4().hex}", row_factory=tuple_row) as cur:
+                cur.itersize = batch_size
+                cur.execute(query_text, params)
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    columns = list(zip(*rows))
+                    yield pa.RecordBatch.from_arrays([pa.array(columns[pos], type=field.type) for pos, field in enumerate(schema)], schema=schema)
+
+    # SQL casts that make database values arrive as the Python types pyarrow expects for each Arrow type.
+    ARROW_SQL_TYPES = {"string": "text", "double": "float8", "int64": "int8", "bool": "boolean", "date32[day]": "date", "timestamp[us]": "timestamp"}
+
+    @classmethod
+    def _arrow_select_list(cls, schema) -> str:
+        return ", ".join(f"{field.name}::{cls.ARROW_SQL_TYPES[str(field.type)]} AS {field.name}" for field in schema)
 
     @staticmethod
     def _normalize_row(row: Dict) -> Dict:
@@ -100,7 +222,7 @@ class Repository:
         return normalized
 
     def insert_run(self, run: Dict) -> None:
-        with self.connect() as conn:
+        with self._write_connection() as conn:
             conn.execute(
                 """
                 INSERT INTO collection_runs(
@@ -121,10 +243,11 @@ class Repository:
         adapted = {k: (Json(v) if isinstance(v, (dict, list)) else v) for k, v in fields.items()}
         assignments = sql.SQL(", ").join(sql.SQL("{} = %s").format(sql.Identifier(k)) for k in adapted.keys())
         query = sql.SQL("UPDATE collection_runs SET {} WHERE run_id = %s").format(assignments)
-        with self.connect() as conn:
+        with self._write_connection() as conn:
             conn.execute(query, [*adapted.values(), run_id])
 
     def upsert_instruments(self, rows: Iterable[Dict]) -> None:
+        rows = list(rows)
         payload = [
             (
                 r["instrument_id"], r["external_code"], r["market_code"], r["instrument_name"], r["listing_date"],
@@ -134,7 +257,7 @@ class Repository:
         ]
         if not payload:
             return
-        with self.connect() as conn:
+        with self._write_connection() as conn:
             with conn.cursor() as cur:
                 cur.executemany(
                     """
@@ -155,6 +278,43 @@ class Repository:
                     """,
                     payload,
                 )
+            self._refresh_instrument_stats(conn)
+        self.instruments.register(rows)
+
+    def insert_missing_instruments(self, rows: Iterable[Dict]) -> None:
+        rows = list(rows)
+        payload = [
+            (
+                r["instrument_id"], r["external_code"], r["market_code"], r["instrument_name"], r["listing_date"],
+                r.get("delisting_date"), r.get("listed_shares"), r["source_name"], r["collected_at"], r.get("updated_at"),
+            )
+            for r in rows
+        ]
+        if not payload:
+            return
+        with self._write_connection() as conn:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    """
+                    INSERT INTO instruments(
+                        instrument_id, external_code, market_code, instrument_name, listing_date,
+                        delisting_date, listed_shares, source_name, collected_at, updated_at
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT DO NOTHING
+                    RETURNING instrument_id
+                    """,
+                    payload,
+                    returning=True,
+                )
+                # rowcount only covers the last statement of a pipelined batch; count what came back instead.
+                inserted = sum(1 for _ in self._returned_rows(cur))
+            if inserted:
+                self._refresh_instrument_stats(conn)
+        if inserted == len(payload):
+            self.instruments.register(rows)
+        else:
+            # Another writer got there first; reload instead of guessing which rows won.
+            self.instruments.invalidate()
 
     def upsert_daily_market(self, rows: Iterable[Dict]) -> None:
         payload = [
@@ -167,7 +327,7 @@ class Repository:
         ]
         if not payload:
             return
-        with self.connect() as conn:
+        with self._write_connection() as conn:
             with conn.cursor() as cur:
                 cur.executemany(
                     """
@@ -191,9 +351,29 @@ class Repository:
                         source_name=excluded.source_name,
                         collected_at=excluded.collected_at,
                         run_id=excluded.run_id
+                    WHERE (
+                        daily_market_data.open, daily_market_data.high, daily_market_data.low, daily_market_data.close,
+                        daily_market_data.volume, daily_market_data.turnover_value, daily_market_data.market_value,
+                        daily_market_data.listed_shares, daily_market_data.base_price, daily_market_data.is_trade_halted,
+                        daily_market_data.record_status, daily_market_data.source_name
+                    ) IS DISTINCT FROM (
+                        excluded.open, excluded.high, excluded.low, excluded.close,
+                        excluded.volume, excluded.turnover_value, excluded.market_value,
+                        excluded.listed_shares, excluded.base_price, excluded.is_trade_halted,
+                        excluded.record_status, excluded.source_name
+                    )
+                    RETURNING instrument_id, trade_date, (xmax = 0) AS inserted
                     """,
                     payload,
+                    returning=True,
                 )
+                inserted: Dict[str, List] = {}
+                for row in self._returned_rows(cur):
+                    if row["inserted"]:
+                        instrument = self.instruments.get(str(row["instrument_id"]))
+                        inserted.setdefault(instrument["market_code"] if instrument else "", []).append(row["trade_date"])
+            self._bump_dataset_stats(conn, "daily_market_data", inserted)
+            self._bump_adjustment_coverage(conn, inserted)
 
     def upsert_benchmark(self, rows: Iterable[Dict]) -> None:
         payload = [
@@ -205,7 +385,7 @@ class Repository:
         ]
         if not payload:
             return
-        with self.connect() as conn:
+        with self._write_connection() as conn:
             with conn.cursor() as cur:
                 cur.executemany(
                     """
@@ -225,9 +405,142 @@ class Repository:
                         source_name=excluded.source_name,
                         collected_at=excluded.collected_at,
                         run_id=excluded.run_id
+                    RETURNING index_code, index_name, trade_date, (xmax = 0) AS inserted
                     """,
                     payload,
+                    returning=True,
                 )
+                inserted: Dict[str, List] = {}
+                for row in self._returned_rows(cur):
+                    if row["inserted"]:
+                        inserted.setdefault(f"{row['index_code']}/{row['index_name']}", []).append(row["trade_date"])
+            self._bump_dataset_stats(conn, "benchmark_index_data", inserted)
+
+    @staticmethod
+    def _returned_rows(cur) -> Iterator[Dict]:
+        # executemany(returning=True) leaves one result set per parameter row.
+        while True:
+            yield from cur.fetchall()
+            if not cur.nextset():
+                break
+
+    @staticmethod
+    def _bump_dataset_stats(conn, dataset_name: str, inserted: Dict[str, List]) -> None:
+        """Add freshly inserted rows (upsert RETURNING `xmax = 0`) to `dataset_stats`; updates never change counts or bounds."""
+        payload = [(dataset_name, key, len(days), min(days), max(days)) for key, days in inserted.items() if days]
+        if not payload:
+            return
+        with conn.cursor() as cur:
+            cur.executemany(
+                """
+                INSERT INTO dataset_stats(dataset_name, partition_key, row_count, date_from, date_to, updated_at)
+                VALUES (%s, %s, %s, %s, %s, now() AT TIME ZONE 'UTC')
+                ON CONFLICT(dataset_name, partition_key) DO UPDATE SET
+                    row_count = dataset_stats.row_count + excluded.row_count,
+                    date_from = LEAST(dataset_stats.date_from, excluded.date_from),
+                    date_to = GREATEST(dataset_stats.date_to, excluded.date_to),
+                    updated_at = excluded.updated_at
+                """,
+                payload,
+            )
+
+    @staticmethod
+    def _bump_adjustment_coverage(conn, inserted: Dict[str, List]) -> None:
+        """Count newly inserted daily rows, per market, in `adjustment_coverage`; they have no factor until the next rebuild."""
+        counts: Dict = {}
+        for market_code, days in inserted.items():
+            for day in days:
+                counts[(day, market_code)] = counts.get((day, market_code), 0) + 1
+        if not counts:
+            return
+        # Shared: bumps commute with each other, but must not interleave with a range recount.
+        conn.execute("SELECT pg_advisory_xact_lock_shared(hashtext(current_schema() || '.adjustment_coverage'))")
+        with conn.cursor() as cur:
+            cur.executemany(
+                """
+                INSERT INTO adjustment_coverage(trade_date, as_of_date, market_code, daily_rows, factor_rows, updated_at)
+                VALUES (%s, DATE '9999-12-31', %s, %s, 0, now() AT TIME ZONE 'UTC')
+                ON CONFLICT(trade_date, as_of_date, market_code) DO UPDATE SET
+                    daily_rows = adjustment_coverage.daily_rows + excluded.daily_rows,
+                    updated_at = excluded.updated_at
+                """,
+                [(day, market_code, n) for (day, market_code), n in counts.items()],
+            )
+            cur.executemany(
+                """
+                UPDATE adjustment_coverage
+                SET daily_rows = daily_rows + %s, updated_at = now() AT TIME ZONE 'UTC'
+                WHERE trade_date = %s AND market_code = %s AND as_of_date <> DATE '9999-12-31'
+                """,
+                [(n, day, market_code) for (day, market_code), n in counts.items()],
+            )
+
+    @staticmethod
+    def _refresh_instrument_stats(conn) -> None:
+        # The instrument master is small and an upsert may move an instrument between markets, so recount it.
+        # Serialized with other recounts, or two writers could both re-insert the rows they just deleted.
+        conn.execute("SELECT pg_advisory_xact_lock(hashtext(current_schema() || '.dataset_stats'))")
+        conn.execute("DELETE FROM dataset_stats WHERE dataset_name = 'instruments'")
+        conn.execute(
+            """
+            INSERT INTO dataset_stats(dataset_name, partition_key, row_count, date_from, date_to, updated_at)
+            SELECT 'instruments', market_code, COUNT(*), MIN(listing_date), MAX(listing_date), now() AT TIME ZONE 'UTC'
+            FROM instruments
+            GROUP BY market_code
+            """
+        )
+
+    def rebuild_dataset_stats(self) -> None:
+        """Recount `dataset_stats` from the fact tables; only needed after rows were deleted or loaded outside the repository."""
+        with self._write_connection() as conn:
+            conn.execute("SELECT pg_advisory_xact_lock(hashtext(current_schema() || '.dataset_stats'))")
+            conn.execute("DELETE FROM dataset_stats WHERE dataset_name IN ('daily_market_data', 'benchmark_index_data')")
+            conn.execute(
+                """
+                INSERT INTO dataset_stats(dataset_name, partition_key, row_count, date_from, date_to, updated_at)
+                SELECT 'daily_market_data', i.market_code, COUNT(*), MIN(d.trade_date), MAX(d.trade_date), now() AT TIME ZONE 'UTC'
+                FROM daily_market_data d
+                JOIN instruments i ON i.instrument_id = d.instrument_id
+                GROUP BY i.market_code
+                """
+            )
+            conn.execute(
+                """
+                INSERT INTO dataset_stats(dataset_name, partition_key, row_count, date_from, date_to, updated_at)
+                SELECT 'benchmark_index_data', index_code || '/' || index_name, COUNT(*), MIN(trade_date), MAX(trade_date), now() AT TIME ZONE 'UTC'
+                FROM benchmark_index_data
+                GROUP BY index_code, index_name
+                """
+            )
+            self._refresh_instrument_stats(conn)
+
+    def get_dataset_stats(self) -> List[Dict]:
+        return self.query("SELECT dataset_name, partition_key, row_count, date_from, date_to, updated_at FROM dataset_stats ORDER BY dataset_name, partition_key")
+
+    def get_dashboard_summary(self) -> Dict:
+        """Totals for the dashboard header, read from `dataset_stats` rather than the fact tables."""
+        partitions = self.get_dataset_stats()
+        totals: Dict[str, Dict] = {}
+        for row in partitions:
+            total = totals.setdefault(row["dataset_name"], {"cnt": 0, "date_from": None, "date_to": None})
+            total["cnt"] += row["row_count"]
+            if row["date_from"] and (total["date_from"] is None or row["date_from"] < total["date_from"]):
+                total["date_from"] = row["date_from"]
+            if row["date_to"] and (total["date_to"] is None or row["date_to"] > total["date_to"]):
+                total["date_to"] = row["date_to"]
+        empty = {"cnt": 0, "date_from": None, "date_to": None}
+        price = totals.get("daily_market_data", empty)
+        bench = totals.get("benchmark_index_data", empty)
+        return {
+            "instrument_count": totals.get("instruments", empty)["cnt"],
+            "price_count": price["cnt"],
+            "price_date_from": price["date_from"],
+            "price_date_to": price["date_to"],
+            "benchmark_count": bench["cnt"],
+            "benchmark_date_from": bench["date_from"],
+            "benchmark_date_to": bench["date_to"],
+            "partitions": partitions,
+        }
 
     def upsert_trading_calendar(self, rows: Iterable[Dict]) -> None:
         payload = [
@@ -236,7 +549,7 @@ class Repository:
         ]
         if not payload:
             return
-        with self.connect() as conn:
+        with self._write_connection() as conn:
             with conn.cursor() as cur:
                 cur.executemany(
                     """
@@ -252,33 +565,226 @@ class Repository:
                     """,
                     payload,
                 )
+        self.calendar.invalidate()
 
-    def insert_issues(self, rows: Iterable[Dict]) -> None:
-        payload = [
+    def build_trading_calendar(
+        self,
+        market_code: str,
+        date_from: str,
+        date_to: str,
+        open_days: Iterable,
+        source_name: str,
+        collected_at: str,
+        run_id: Optional[str] = None,
+    ) -> int:
+        """Write one calendar row per day in [date_from, date_to] in a single statement; days not in `open_days` are closed."""
+        days = sorted({str(d) for d in open_days})
+        with self._write_connection() as conn:
+            row = conn.execute(
+                """
+                WITH written AS (
+                    INSERT INTO trading_calendar(
+                        market_code, trade_date, is_open, holiday_name, source_name, collected_at, run_id
+                    )
+                    SELECT %s, d::date, o.day IS NOT NULL, CASE WHEN o.day IS NULL THEN 'CLOSED' END, %s, %s, %s
+                    FROM generate_series(%s::date, %s::date, interval '1 day') AS d
+                    LEFT JOIN unnest(%s::date[]) AS o(day) ON o.day = d::date
+                    ON CONFLICT(market_code, trade_date) DO UPDATE SET
+                        is_open=excluded.is_open,
+                        holiday_name=excluded.holiday_name,
+                        source_name=excluded.source_name,
+                        collected_at=excluded.collected_at,
+                        run_id=excluded.run_id
+                    RETURNING 1
+                )
+                SELECT COUNT(*) AS c FROM written
+                """,
+                (market_code, source_name, collected_at, run_id, str(date_from), str(date_to), days),
+            ).fetchone()
+        self.calendar.invalidate()
+        return int(row["c"])
+
+    def notify_data_changed(self) -> None:
+        """Drop this process's calendar copy and tell listening API processes that stored data changed (delivered on commit)."""
+        with self.connect() as conn:
+            conn.execute("SELECT pg_notify(%s, %s)", (DATA_CHANGED_CHANNEL, self.schema or ""))
+        self.calendar.invalidate()
+
+    def get_data_version(self) -> str:
+        """Token that changes when data the read API serves changes; identical across processes reading the same database.
+
+        Counts finished runs of the collecting pipelines only. Validation runs only write issues, which
+        enter through the content of `data_quality_issue_summary`, so a validation pass that finds what
+        was already recorded leaves the token alone. Factor rebuilds, which are not runs,
+        show up through `adjustment_coverage`.
+        """
+        return self.query(
+            """
+            SELECT md5(concat_ws(':', r.finished, r.latest, c.entries, c.latest, q.entries, q.open_count, q.resolved_count, q.latest)) AS token
+            FROM (
+                SELECT COUNT(finished_at) AS finished, MAX(finished_at) AS latest
+                FROM collection_runs
+                WHERE pipeline_name <> 'validate-data'
+            ) r,
+            (SELECT COUNT(*) AS entries, MAX(updated_at) AS latest FROM adjustment_coverage) c,
             (
-                r["dataset_name"], r.get("trade_date"), r.get("instrument_id"), r.get("index_code"), r["issue_code"],
-                r["severity"], r.get("issue_detail"), r.get("source_name"), r["detected_at"], r.get("run_id"), r.get("resolved_at"),
+                SELECT COUNT(*) AS entries, SUM(open_count) AS open_count, SUM(resolved_count) AS resolved_count, MAX(last_detected_at) AS latest
+                FROM data_quality_issue_summary
+            ) q
+            """
+        )[0]["token"]
+
+    def insert_issues(self, rows: Iterable[Dict], refresh_summary: bool = True) -> None:
+        """Upsert issues on their natural key; a re-detected issue gets the new detected_at/run_id and is reopened.
+
+        Callers writing many batches over one range can pass `refresh_summary=False` and call
+        `refresh_issue_summary` once at the end.
+        """
+        payload = []
+        for r in rows:
+            market_code = r.get("market_code")
+            if not market_code and r.get("instrument_id"):
+                instrument = self.instruments.get(r["instrument_id"])
+                market_code = instrument["market_code"] if instrument else None
+            payload.append(
+                (
+                    r["dataset_name"], r.get("trade_date"), market_code, r.get("instrument_id"), r.get("index_code"), r["issue_code"],
+                    r["severity"], r.get("issue_detail"), r.get("source_name"), r["detected_at"], r.get("run_id"), r.get("resolved_at"),
+                )
             )
-            for r in rows
-        ]
         if not payload:
             return
-        with self.connect() as conn:
+        dates = sorted(str(p[1]) for p in payload if p[1])
+        with self.transaction(), self._write_connection() as conn:
             with conn.cursor() as cur:
                 cur.executemany(
                     """
                     INSERT INTO data_quality_issues(
-                        dataset_name, trade_date, instrument_id, index_code, issue_code, severity,
+                        dataset_name, trade_date, market_code, instrument_id, index_code, issue_code, severity,
                         issue_detail, source_name, detected_at, run_id, resolved_at
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT(dataset_name, trade_date, market_code, instrument_id, index_code, issue_code) DO UPDATE SET
+                        severity=excluded.severity,
+                        issue_detail=excluded.issue_detail,
+                        source_name=excluded.source_name,
+                        detected_at=excluded.detected_at,
+                        run_id=excluded.run_id,
+                        resolved_at=excluded.resolved_at
                     """,
                     payload,
                 )
+            if refresh_summary:
+                self.refresh_issue_summary(dates[0] if dates else None, dates[-1] if dates else None, undated=len(dates) < len(payload))
+
+    def refresh_issue_summary(self, date_from: Optional[str], date_to: Optional[str], undated: bool = False) -> None:
+        """Recompute data_quality_issue_summary for [date_from, date_to], and for undated issues when `undated`."""
+        scopes = []
+        params: List = []
+        if date_from and date_to:
+            scopes.append("trade_date BETWEEN %s AND %s")
+            params.extend([date_from, date_to])
+        if undated:
+            scopes.append("trade_date IS NULL")
+        if not scopes:
+            return
+        scope = " OR ".join(scopes)
+        with self.transaction() as conn:
+            # Concurrent refreshes of overlapping ranges would otherwise race between the DELETE and the INSERT.
+            conn.execute("SELECT pg_advisory_xact_lock(hashtext(current_schema() || '.data_quality_issue_summary'))")
+            conn.execute(f"DELETE FROM data_quality_issue_summary WHERE {scope}", tuple(params))
+            conn.execute(
+                f"""
+                INSERT INTO data_quality_issue_summary(
+                    trade_date, market_code, dataset_name, issue_code, severity, open_count, resolved_count, last_detected_at, refreshed_at
+                )
+                SELECT trade_date, market_code, dataset_name, issue_code, severity,
+                       COUNT(*) FILTER (WHERE resolved_at IS NULL),
+                       COUNT(*) FILTER (WHERE resolved_at IS NOT NULL),
+                       MAX(detected_at),
+                       now() AT TIME ZONE 'UTC'
+                FROM data_quality_issues
+                WHERE {scope}
+                GROUP BY trade_date, market_code, dataset_name, issue_code, severity
+                """,
+                tuple(params),
+            )
+
+    def resolve_stale_issues(
+        self,
+        dataset_name: str,
+        issue_codes: Iterable[str],
+        date_from: str,
+        date_to: str,
+        detected_before: str,
+        market_code: Optional[str] = None,
+        index_code: Optional[str] = None,
+        changed_run_id: Optional[str] = None,
+        refresh_summary: bool = True,
+    ) -> int:
+        """Resolve open issues in scope that the check just re-ran without reproducing.
+
+        Anything re-detected has detected_at >= `detected_before`, so what is left older was not seen again.
+        With `changed_run_id`, instrument-level issues are only resolved on rows that run re-checked.
+        """
+        codes = list(issue_codes)
+        if not codes:
+            return 0
+        conditions = ["dataset_name = %s", "issue_code = ANY(%s)", "trade_date BETWEEN %s AND %s", "resolved_at IS NULL", "detected_at < %s"]
+        params: List = [dataset_name, codes, date_from, date_to, detected_before]
+        if market_code is not None:
+            conditions.append("market_code = %s")
+            params.append(market_code)
+        if index_code is not None:
+            conditions.append("index_code = %s")
+            params.append(index_code)
+        if changed_run_id is not None:
+            conditions.append(
+                "(instrument_id IS NULL OR EXISTS (SELECT 1 FROM daily_market_data d WHERE d.instrument_id = data_quality_issues.instrument_id AND d.trade_date = data_quality_issues.trade_date AND d.run_id = %s))"
+            )
+            params.append(changed_run_id)
+        with self.transaction() as conn:
+            row = conn.execute(
+                f"WITH resolved AS (UPDATE data_quality_issues SET resolved_at = %s WHERE {' AND '.join(conditions)} RETURNING 1) SELECT COUNT(*) AS c FROM resolved",
+                (datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"), *params),
+            ).fetchone()
+            if row["c"] and refresh_summary:
+                self.refresh_issue_summary(date_from, date_to)
+            return int(row["c"])
+
+    def purge_resolved_issues(self, older_than_days: int, batch_size: int = 10000) -> int:
+        """Delete issues resolved more than `older_than_days` ago, in short batches to keep locks and WAL bursts small."""
+        purged = 0
+        while True:
+            with self.transaction() as conn:
+                row = conn.execute(
+                    """
+                    WITH purged AS (
+                        DELETE FROM data_quality_issues
+                        WHERE issue_id IN (
+                            SELECT issue_id
+                            FROM data_quality_issues
+                            WHERE resolved_at < (now() AT TIME ZONE 'UTC') - make_interval(days => %s)
+                            LIMIT %s
+                        )
+                        RETURNING trade_date
+                    )
+                    SELECT COUNT(*) AS c, MIN(trade_date) AS date_from, MAX(trade_date) AS date_to, BOOL_OR(trade_date IS NULL) AS undated
+                    FROM purged
+                    """,
+                    (older_than_days, batch_size),
+                ).fetchone()
+                deleted = int(row["c"])
+                if deleted:
+                    self.refresh_issue_summary(row["date_from"], row["date_to"], undated=bool(row["undated"]))
+            purged += deleted
+            if deleted < batch_size:
+                return purged
 
     def bulk_update_delisting_dates(self, rows: Iterable[Dict], source_name: str, run_id: Optional[str] = None) -> Dict:
         now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        matched = updated = unchanged = unmatched = invalid = 0
+        matched = unchanged = unmatched = invalid = 0
         issues = []
+        updates: Dict[str, Dict] = {}
         for row in rows:
             market_code = str(row.get("market_code") or "").upper().strip()
             external_code = str(row.get("external_code") or "").strip()
@@ -286,17 +792,14 @@ class Repository:
             if not market_code or not external_code or not delisting_date:
                 invalid += 1
                 continue
-            target = self.query(
-                "SELECT instrument_id, listing_date, delisting_date FROM instruments WHERE market_code = %s AND external_code = %s LIMIT 1",
-                (market_code, external_code),
-            )
+            target = self.instruments.find(external_code, market_code)
             if not target:
                 unmatched += 1
                 continue
             matched += 1
-            instrument_id = target[0]["instrument_id"]
-            listing_date = target[0]["listing_date"]
-            existing = target[0]["delisting_date"]
+            instrument_id = target["instrument_id"]
+            listing_date = target["listing_date"]
+            existing = updates[instrument_id]["delisting_date"] if instrument_id in updates else target["delisting_date"]
             if listing_date and str(delisting_date) < str(listing_date):
                 invalid += 1
                 issues.append(
@@ -318,15 +821,18 @@ class Repository:
             if existing == delisting_date:
                 unchanged += 1
                 continue
-            with self.connect() as conn:
-                conn.execute(
-                    "UPDATE instruments SET delisting_date = %s, source_name = %s, collected_at = %s, updated_at = %s WHERE instrument_id = %s",
-                    (delisting_date, source_name, now, now, instrument_id),
-                )
-            updated += 1
+            updates[instrument_id] = {**target, "delisting_date": delisting_date}
+        if updates:
+            with self._write_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.executemany(
+                        "UPDATE instruments SET delisting_date = %s, source_name = %s, collected_at = %s, updated_at = %s WHERE instrument_id = %s",
+                        [(r["delisting_date"], source_name, now, now, iid) for iid, r in updates.items()],
+                    )
+            self.instruments.register(updates.values())
         if issues:
             self.insert_issues(issues)
-        return {"matched": matched, "updated": updated, "unchanged": unchanged, "unmatched": unmatched, "invalid": invalid}
+        return {"matched": matched, "updated": len(updates), "unchanged": unchanged, "unmatched": unmatched, "invalid": invalid}
 
     def upsert_delisting_snapshot(self, rows: Iterable[Dict], source_name: str, run_id: Optional[str] = None) -> Dict:
         now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
@@ -342,7 +848,7 @@ class Repository:
             payload.append((market_code, external_code, delisting_date, row.get("delisting_reason"), row.get("note"), source_name, row.get("collected_at") or now, now, run_id))
         if not payload:
             return {"upserted": 0, "invalid": invalid}
-        with self.connect() as conn:
+        with self._write_connection() as conn:
             with conn.cursor() as cur:
                 cur.executemany(
                     """
@@ -363,14 +869,19 @@ class Repository:
                 )
         return {"upserted": len(payload), "invalid": invalid}
 
-    def upsert_price_adjustment_factors(self, rows: Iterable[Dict]) -> int:
+    def upsert_price_adjustment_factors(self, rows: Iterable[Dict], refresh_coverage: bool = True) -> int:
+        """Upsert factor rows; `refresh_coverage=False` leaves `adjustment_coverage` to the caller (see `refresh_adjustment_coverage`)."""
         payload = [
             (r["instrument_id"], r["trade_date"], r.get("as_of_date", "9999-12-31"), r["factor"], r["cumulative_factor"], r["created_at"], r.get("run_id"))
             for r in rows
         ]
         if not payload:
             return 0
-        with self.connect() as conn:
+        ranges: Dict[str, List[str]] = {}
+        for p in payload:
+            bounds = ranges.setdefault(str(p[2]), [str(p[1]), str(p[1])])
+            bounds[0], bounds[1] = min(bounds[0], str(p[1])), max(bounds[1], str(p[1]))
+        with self.transaction(), self._write_connection() as conn:
             with conn.cursor() as cur:
                 cur.executemany(
                     """
@@ -385,15 +896,49 @@ class Repository:
                     """,
                     payload,
                 )
+            if refresh_coverage:
+                for as_of_date, (date_from, date_to) in ranges.items():
+                    self.refresh_adjustment_coverage(date_from, date_to, as_of_date)
         return len(payload)
 
-    def clear_price_adjustment_factors(self, date_from: str, date_to: str, as_of_date: str = "9999-12-31") -> int:
-        with self.connect() as conn:
-            cur = conn.execute(
-                "DELETE FROM price_adjustment_factors WHERE trade_date BETWEEN %s AND %s AND as_of_date = %s",
+    def clear_price_adjustment_factors(self, date_from: str, date_to: str, as_of_date: str = "9999-12-31", refresh_coverage: bool = True) -> int:
+        with self.transaction() as conn:
+            deleted = conn.execute(
+                """
+                WITH deleted AS (
+                    DELETE FROM price_adjustment_factors WHERE trade_date BETWEEN %s AND %s AND as_of_date = %s
+                    RETURNING 1
+                )
+                SELECT COUNT(*) AS deleted FROM deleted
+                """,
                 (date_from, date_to, as_of_date),
+            ).fetchone()["deleted"]
+            if refresh_coverage:
+                self.refresh_adjustment_coverage(date_from, date_to, as_of_date)
+            return deleted
+
+    def refresh_adjustment_coverage(self, date_from: str, date_to: str, as_of_date: str = "9999-12-31") -> None:
+        """Recount `adjustment_coverage` for one as_of_date over [date_from, date_to]."""
+        with self.transaction() as conn:
+            conn.execute("SELECT pg_advisory_xact_lock(hashtext(current_schema() || '.adjustment_coverage'))")
+            conn.execute(
+                "DELETE FROM adjustment_coverage WHERE as_of_date = %s AND trade_date BETWEEN %s AND %s",
+                (as_of_date, date_from, date_to),
+            )
+            conn.execute(
+                """
+                INSERT INTO adjustment_coverage(trade_date, as_of_date, market_code, daily_rows, factor_rows, updated_at)
+                SELECT d.trade_date, %(as_of)s::date, i.market_code, COUNT(*), COUNT(p.instrument_id), now() AT TIME ZONE 'UTC'
+                FROM daily_market_data d
+                JOIN instruments i ON i.instrument_id = d.instrument_id
+                LEFT JOIN price_adjustment_factors p
+                  ON p.instrument_id = d.instrument_id AND p.trade_date = d.trade_date AND p.as_of_date = %(as_of)s::date
+                WHERE d.trade_date BETWEEN %(date_from)s AND %(date_to)s
+                GROUP BY d.trade_date, i.market_code
+                HAVING %(as_of)s::date = DATE '9999-12-31' OR COUNT(p.instrument_id) > 0
+                """,
+                {"as_of": as_of_date, "date_from": date_from, "date_to": date_to},
             )
-            return int(cur.rowcount or 0)
 
     def get_market_adjustment_inputs(self, date_from: str, date_to: str) -> List[Dict]:
         return self.query(
@@ -423,27 +968,13 @@ class Repository:
         )
 
     def get_existing_instrument_ids(self, instrument_ids: Iterable[str]) -> set[str]:
-        ids = [str(x).strip() for x in instrument_ids if str(x).strip()]
-        if not ids:
-            return set()
-        placeholders = ", ".join(["%s"] * len(ids))
-        rows = self.query(f"SELECT instrument_id FROM instruments WHERE instrument_id IN ({placeholders})", tuple(ids))
-        return {str(row["instrument_id"]) for row in rows if row.get("instrument_id")}
+        return self.instruments.existing_ids(instrument_ids)
 
     def get_instrument_id_by_external_code(self, external_code: str, market_code: Optional[str] = None) -> Optional[str]:
         if not external_code:
             return None
-        if market_code:
-            rows = self.query(
-                "SELECT instrument_id FROM instruments WHERE external_code = %s AND market_code = %s LIMIT 1",
-                (external_code, str(market_code).upper()),
-            )
-        else:
-            rows = self.query(
-                "SELECT instrument_id FROM instruments WHERE external_code = %s ORDER BY (delisting_date IS NULL) DESC, listing_date DESC LIMIT 1",
-                (external_code,),
-            )
-        return rows[0]["instrument_id"] if rows else None
+        record = self.instruments.find(external_code, market_code)
+        return record["instrument_id"] if record else None
 
     def list_instruments(self, search: str = "", listed_status: str = "", limit: int = 50, offset: int = 0) -> Dict:
         where_clauses = []
@@ -495,7 +1026,8 @@ class Repository:
         )
         return rows[0] if rows else {}
 
-    def get_instrument_daily(self, external_code: str, date_from: str = "", date_to: str = "", limit: int = 250, offset: int = 0) -> Dict:
+    @staticmethod
+    def _instrument_daily_filter(external_code: str, date_from: str, date_to: str):
         params: List = [external_code.strip()]
         where_date = ""
         if date_from:
@@ -504,15 +1036,19 @@ class Repository:
         if date_to:
             where_date += " AND trade_date <= %s"
             params.append(date_to)
+        return f"external_code = %s {where_date}", params
+
+    def get_instrument_daily(self, external_code: str, date_from: str = "", date_to: str = "", limit: int = 250, offset: int = 0) -> Dict:
+        where_sql, params = self._instrument_daily_filter(external_code, date_from, date_to)
         total = self.query(
-            f"SELECT COUNT(*) AS cnt FROM instrument_daily_v1 WHERE external_code = %s {where_date}",
+            f"SELECT COUNT(*) AS cnt FROM instrument_daily_v1 WHERE {where_sql}",
             tuple(params),
         )[0]["cnt"]
         rows = self.query(
             f"""
             SELECT *
             FROM instrument_daily_v1
-            WHERE external_code = %s {where_date}
+            WHERE {where_sql}
             ORDER BY trade_date DESC
             LIMIT %s OFFSET %s
             """,
@@ -520,6 +1056,120 @@ class Repository:
         )
         return {"total": total, "items": rows, "limit": limit, "offset": offset, "has_more": offset + len(rows) < total}
 
+    def get_instrument_daily_version(self, external_code: str, date_from: str = "", date_to: str = "") -> str:
+        """Cheap fingerprint of what `get_instrument_daily` reads for the range, for ETags.
+
+        Covers the instrument metadata plus the count and newest `collected_at` of its daily rows and of
+        its adjustment factors. Both aggregates are index-only scans (migration 0009), so a revalidation
+        never touches the rows themselves. Upserts skip unchanged rows, so `collected_at` only moves when
+        a run actually rewrote this instrument.
+        """
+        params: List = []
+        where_date = ""
+        if date_from:
+            where_date += " AND trade_date >= %s"
+            params.append(date_from)
+        if date_to:
+            where_date += " AND trade_date <= %s"
+            params.append(date_to)
+        return self.query(
+            f"""
+            SELECT md5(COALESCE(string_agg(concat_ws('|',
+                i.instrument_id, i.market_code, i.instrument_name, i.listing_date, i.delisting_date,
+                d.row_count, d.latest, p.row_count, p.latest
+            ), ';' ORDER BY i.instrument_id), '')) AS version
+            FROM instruments i
+            CROSS JOIN LATERAL (
+                SELECT COUNT(*) AS row_count, MAX(collected_at) AS latest
+                FROM daily_market_data
+                WHERE instrument_id = i.instrument_id {where_date}
+            ) d
+            CROSS JOIN LATERAL (
+                SELECT COUNT(*) AS row_count, MAX(created_at) AS latest
+                FROM price_adjustment_factors
+                WHERE instrument_id = i.instrument_id AND as_of_date = DATE '9999-12-31' {where_date}
+            ) p
+            WHERE i.external_code = %s
+            """,
+            tuple(params + params + [external_code.strip()]),
+        )[0]["version"]
+
+    def instrument_daily_batches(self, external_code: str, schema, date_from: str = "", date_to: str = "", limit: int = 250, offset: int = 0, batch_size: int = 100_000) -> Iterator:
+        """The page `get_instrument_daily` returns, as RecordBatches of `schema`."""
+        where_sql, params = self._instrument_daily_filter(external_code, date_from, date_to)
+        return self.stream_record_batches(
+            f"SELECT {self._arrow_select_list(schema)} FROM instrument_daily_v1 WHERE {where_sql} ORDER BY trade_date DESC LIMIT %s OFFSET %s",
+            tuple(params + [limit, offset]),
+            schema,
+            batch_size,
+        )
+
+    PANEL_COLUMNS = (
+        "instrument_id", "external_code", "market_code", "instrument_name", "trade_date", "listing_date", "delisting_date",
+        "is_trade_halted", "record_status", "open", "high", "low", "close", "volume", "turnover_value", "market_value", "listed_shares",
+        "adj_open", "adj_high", "adj_low", "adj_close", "adj_volume", "base_price", "daily_factor", "cumulative_factor",
+    )
+
+    @staticmethod
+    def _instrument_panel_filter(date_from: str, date_to: str, external_codes: Optional[Iterable[str]], market_codes: Optional[Iterable[str]]):
+        where_clauses = ["trade_date BETWEEN %s AND %s"]
+        params: List = [date_from, date_to]
+        codes = [str(c).strip() for c in (external_codes or []) if str(c).strip()]
+        if codes:
+            where_clauses.append("external_code = ANY(%s)")
+            params.append(codes)
+        markets = [str(m).strip().upper() for m in (market_codes or []) if str(m).strip()]
+        if markets:
+            where_clauses.append("market_code = ANY(%s)")
+            params.append(markets)
+        return " AND ".join(where_clauses), params
+
+    def stream_instrument_panel(
+        self,
+        date_from: str,
+        date_to: str,
+        external_codes: Optional[Iterable[str]] = None,
+        market_codes: Optional[Iterable[str]] = None,
+        fetch_size: int = 10000,
+        columns: Optional[Iterable[str]] = None,
+    ) -> Iterator[Dict]:
+        """instrument_daily_v1 rows of many instruments ordered by (trade_date, external_code), streamed through one cursor.
+
+        `columns` projects the rows onto a subset of PANEL_COLUMNS.
+        """
+        selected = list(columns) if columns else list(self.PANEL_COLUMNS)
+        unknown = [c for c in selected if c not in self.PANEL_COLUMNS]
+        if unknown:
+            raise ValueError(f"unknown panel columns: {unknown}")
+        where_sql, params = self._instrument_panel_filter(date_from, date_to, external_codes, market_codes)
+        return self.stream_query(
+            f"""
+            SELECT {", ".join(selected)}
+            FROM instrument_daily_v1
+            WHERE {where_sql}
+            ORDER BY trade_date, external_code, market_code
+            """,
+            tuple(params),
+            fetch_size=fetch_size,
+        )
+
+    def instrument_panel_batches(
+        self,
+        date_from: str,
+        date_to: str,
+        schema,
+        external_codes: Optional[Iterable[str]] = None,
+        market_codes: Optional[Iterable[str]] = None,
+        batch_size: int = 100_000,
+    ) -> Iterator:
+        where_sql, params = self._instrument_panel_filter(date_from, date_to, external_codes, market_codes)
+        return self.stream_record_batches(
+            f"SELECT {self._arrow_select_list(schema)} FROM instrument_daily_v1 WHERE {where_sql} ORDER BY trade_date, external_code, market_code",
+            tuple(params),
+            schema,
+            batch_size,
+        )
+
     def get_default_benchmark_series_map(self, index_codes: Iterable[str]) -> Dict[str, str]:
         out: Dict[str, str] = {}
         for code in [str(c).strip().upper() for c in index_codes if str(c).strip()]:
@@ -555,25 +1205,144 @@ class Repository:
             """
         )
 
+    def get_benchmark_days(self, index_code: str, date_from: str, date_to: str) -> List[Dict]:
+        return self.query(
+            """
+            SELECT index_name, trade_date
+            FROM benchmark_index_data
+            WHERE index_code = %s AND trade_date BETWEEN %s AND %s
+            ORDER BY index_name, trade_date
+            """,
+            (index_code, date_from, date_to),
+        )
+
     def get_adjustment_coverage(self, date_from: str, date_to: str, as_of_date: str = "9999-12-31") -> Dict:
-        daily_rows = self.query(
-            "SELECT COUNT(*) AS cnt FROM daily_market_data WHERE trade_date BETWEEN %s AND %s",
-            (date_from, date_to),
-        )[0]["cnt"]
-        factor_rows = self.query(
-            "SELECT COUNT(*) AS cnt FROM price_adjustment_factors WHERE trade_date BETWEEN %s AND %s AND as_of_date = %s",
-            (date_from, date_to, as_of_date),
-        )[0]["cnt"]
+        """Factor coverage from `adjustment_coverage`; `missing_dates` lists the days with daily rows that lack a factor."""
+        days = self.query(
+            """
+            SELECT base.trade_date, SUM(base.daily_rows)::bigint AS daily_rows, COALESCE(SUM(c.factor_rows), 0)::bigint AS factor_rows
+            FROM adjustment_coverage base
+            LEFT JOIN adjustment_coverage c ON c.trade_date = base.trade_date AND c.market_code = base.market_code AND c.as_of_date = %s
+            WHERE base.as_of_date = DATE '9999-12-31' AND base.trade_date BETWEEN %s AND %s
+            GROUP BY base.trade_date
+            HAVING SUM(base.daily_rows) > 0
+            ORDER BY base.trade_date
+            """,
+            (as_of_date, date_from, date_to),
+        )
+        daily_rows = sum(int(d["daily_rows"]) for d in days)
+        factor_rows = sum(int(d["factor_rows"]) for d in days)
         return {
             "date_from": date_from,
             "date_to": date_to,
             "as_of_date": as_of_date,
             "daily_rows": daily_rows,
             "factor_rows": factor_rows,
-            "is_complete": int(factor_rows) >= int(daily_rows),
+            "is_complete": factor_rows >= daily_rows,
+            "missing_dates": [
+                {"trade_date": d["trade_date"], "daily_rows": d["daily_rows"], "missing_rows": int(d["daily_rows"]) - int(d["factor_rows"])}
+                for d in days
+                if int(d["factor_rows"]) < int(d["daily_rows"])
+            ],
         }
 
-    def get_benchmark_daily(self, index_code: str, series_name: str = "", date_from: str = "", date_to: str = "", limit: int = 250, offset: int = 0) -> Dict:
+    def list_missing_adjustment_factors(self, date_from: str, date_to: str, as_of_date: str = "9999-12-31", limit: int = 1000) -> List[Dict]:
+        """Daily rows without a factor, scanning only the (day, market) partitions `adjustment_coverage` reports as incomplete."""
+        return self.query(
+            """
+            SELECT d.trade_date, d.instrument_id, i.external_code, i.market_code, i.instrument_name
+            FROM adjustment_coverage base
+            LEFT JOIN adjustment_coverage c ON c.trade_date = base.trade_date AND c.market_code = base.market_code AND c.as_of_date = %s
+            JOIN daily_market_data d ON d.trade_date = base.trade_date
+            JOIN instruments i ON i.instrument_id = d.instrument_id AND i.market_code = base.market_code
+            WHERE base.as_of_date = DATE '9999-12-31' AND base.trade_date BETWEEN %s AND %s
+              AND COALESCE(c.factor_rows, 0) < base.daily_rows
+              AND NOT EXISTS (
+                  SELECT 1 FROM price_adjustment_factors p
+                  WHERE p.instrument_id = d.instrument_id AND p.trade_date = d.trade_date AND p.as_of_date = %s
+              )
+            ORDER BY d.trade_date, i.external_code
+            LIMIT %s
+            """,
+            (as_of_date, date_from, date_to, as_of_date, limit),
+        )
+
+    @staticmethod
+    def _issue_filters(date_from: str, date_to: str, market_code: str, dataset_name: str, issue_code: str, severity: str):
+        where_clauses = []
+        params: List = []
+        if date_from:
+            where_clauses.append("trade_date >= %s")
+            params.append(date_from)
+        if date_to:
+            where_clauses.append("trade_date <= %s")
+            params.append(date_to)
+        for column, value in (("market_code", market_code), ("dataset_name", dataset_name), ("issue_code", issue_code), ("severity", severity)):
+            if value:
+                where_clauses.append(f"{column} = %s")
+                params.append(value)
+        return where_clauses, params
+
+    def get_issue_summary(self, date_from: str = "", date_to: str = "", market_code: str = "", dataset_name: str = "", issue_code: str = "", severity: str = "") -> Dict:
+        where_clauses, params = self._issue_filters(date_from, date_to, market_code, dataset_name, issue_code, severity)
+        where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        rows = self.query(
+            f"""
+            SELECT trade_date, market_code, dataset_name, issue_code, severity, open_count, resolved_count, last_detected_at
+            FROM data_quality_issue_summary
+            {where_sql}
+            ORDER BY trade_date DESC NULLS LAST, market_code, dataset_name, issue_code, severity
+            """,
+            tuple(params),
+        )
+        totals: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            bucket = totals.setdefault(row["severity"], {"open_count": 0, "resolved_count": 0})
+            bucket["open_count"] += int(row["open_count"])
+            bucket["resolved_count"] += int(row["resolved_count"])
+        return {"items": rows, "totals": totals}
+
+    def list_issues(
+        self,
+        date_from: str = "",
+        date_to: str = "",
+        market_code: str = "",
+        dataset_name: str = "",
+        issue_code: str = "",
+        severity: str = "",
+        status: str = "open",
+        after_id: Optional[int] = None,
+        limit: int = 100,
+    ) -> Dict:
+        """Newest issues first, paged by issue_id; pass the returned `next_after_id` to get the next page."""
+        where_clauses, params = self._issue_filters(date_from, date_to, market_code, dataset_name, issue_code, severity)
+        status = str(status or "").lower()
+        if status == "open":
+            where_clauses.append("resolved_at IS NULL")
+        elif status == "resolved":
+            where_clauses.append("resolved_at IS NOT NULL")
+        elif status != "all":
+            raise ValueError(f"status must be open, resolved or all: {status}")
+        if after_id is not None:
+            where_clauses.append("issue_id < %s")
+            params.append(after_id)
+        where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        rows = self.query(
+            f"""
+            SELECT issue_id, dataset_name, trade_date, market_code, instrument_id::text AS instrument_id, index_code,
+                   issue_code, severity, issue_detail, source_name, detected_at, run_id::text AS run_id, resolved_at
+            FROM data_quality_issues
+            {where_sql}
+            ORDER BY issue_id DESC
+            LIMIT %s
+            """,
+            tuple(params + [limit + 1]),
+        )
+        has_more = len(rows) > limit
+        items = rows[:limit]
+        return {"items": items, "limit": limit, "next_after_id": items[-1]["issue_id"] if has_more else None}
+
+    def _benchmark_daily_filter(self, index_code: str, series_name: str, date_from: str, date_to: str):
         selected_series = series_name.strip()
         if not selected_series:
             selected_series = self.get_default_benchmark_series_map([index_code]).get(str(index_code).upper(), "")
@@ -589,15 +1358,19 @@ class Repository:
         if date_to:
             where_date += " AND trade_date <= %s"
             params.append(date_to)
+        return selected_series, f"index_code = %s {where_series} {where_date}", params
+
+    def get_benchmark_daily(self, index_code: str, series_name: str = "", date_from: str = "", date_to: str = "", limit: int = 250, offset: int = 0) -> Dict:
+        selected_series, where_sql, params = self._benchmark_daily_filter(index_code, series_name, date_from, date_to)
         total = self.query(
-            f"SELECT COUNT(*) AS cnt FROM benchmark_daily_v1 WHERE index_code = %s {where_series} {where_date}",
+            f"SELECT COUNT(*) AS cnt FROM benchmark_daily_v1 WHERE {where_sql}",
             tuple(params),
         )[0]["cnt"]
         rows = self.query(
             f"""
             SELECT *
             FROM benchmark_daily_v1
-            WHERE index_code = %s {where_series} {where_date}
+            WHERE {where_sql}
             ORDER BY trade_date DESC, index_name
             LIMIT %s OFFSET %s
             """,
@@ -605,15 +1378,43 @@ class Repository:
         )
         return {"total": total, "items": rows, "limit": limit, "offset": offset, "series_name": selected_series, "has_more": offset + len(rows) < total}
 
-    def get_calendar(self, market_codes: Iterable[str], date_from: str, date_to: str) -> List[Dict]:
-        codes = [str(c).upper() for c in market_codes if str(c).strip()]
-        if not codes:
-            return []
-        placeholders = ", ".join(["%s"] * len(codes))
+    def get_benchmark_daily_version(self, index_code: str, series_name: str = "", date_from: str = "", date_to: str = "") -> str:
+        """Fingerprint of what `get_benchmark_daily` reads (series, count, newest `collected_at`), from an index-only scan."""
+        selected_series, where_sql, params = self._benchmark_daily_filter(index_code, series_name, date_from, date_to)
         return self.query(
-            f"SELECT market_code, trade_date, is_open, holiday_name FROM trading_calendar_v1 WHERE market_code IN ({placeholders}) AND trade_date BETWEEN %s AND %s ORDER BY market_code, trade_date",
-            tuple(codes + [date_from, date_to]),
+            f"""
+            SELECT md5(concat_ws('|', %s::text, COUNT(*), MAX(collected_at))) AS version
+            FROM benchmark_index_data
+            WHERE {where_sql}
+            """,
+            tuple([selected_series] + params),
+        )[0]["version"]
+
+    def benchmark_daily_batches(self, index_code: str, schema, series_name: str = "", date_from: str = "", date_to: str = "", limit: int = 250, offset: int = 0, batch_size: int = 100_000) -> Iterator:
+        """The page `get_benchmark_daily` returns, as RecordBatches of `schema`."""
+        _, where_sql, params = self._benchmark_daily_filter(index_code, series_name, date_from, date_to)
+        return self.stream_record_batches(
+            f"SELECT {self._arrow_select_list(schema)} FROM benchmark_daily_v1 WHERE {where_sql} ORDER BY trade_date DESC, index_name LIMIT %s OFFSET %s",
+            tuple(params + [limit, offset]),
+            schema,
+            batch_size,
+        )
+
+    def get_open_days(self, market_code: str, date_from: str, date_to: str) -> List[str]:
+        """Sessions of `market_code` in [date_from, date_to]; days missing from trading_calendar count as open on weekdays."""
+        rows = self.query(
+            """
+            SELECT d::date AS trade_date
+            FROM generate_series(%s::date, %s::date, interval '1 day') AS d
+            LEFT JOIN trading_calendar c
+              ON c.market_code = %s
+             AND c.trade_date = d::date
+            WHERE COALESCE(c.is_open, EXTRACT(ISODOW FROM d) < 6)
+            ORDER BY d
+            """,
+            (date_from, date_to, str(market_code).upper()),
         )
+        return [r["trade_date"] for r in rows]
 
     def get_latest_trade_date(self) -> Optional[str]:
         rows = self.query("SELECT MAX(trade_date) AS latest_trade_date FROM daily_market_data")
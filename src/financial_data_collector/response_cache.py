@@ -0,0 +1,243 @@
+"""In-process cache of read API responses, keyed by request and the stored-data version."""
+import hashlib
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Pattern, Sequence, Tuple
+from urllib.parse import parse_qsl
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from .arrow_responses import negotiate_format
+
+logger = logging.getLogger(__name__)
+
+# (data-version token, path, parameters, format, per-resource version or "").
+CacheKey = Tuple[str, str, Tuple[Tuple[str, str], ...], str, str]
+CachedResponse = Tuple[int, List[Tuple[bytes, bytes]], bytes]
+# (repository, path parameters, non-blank query parameters) -> version string of the resource.
+EtagVersion = Callable[[object, Dict[str, str], Dict[str, str]], str]
+
+# Per-entry bookkeeping counted against the byte budget on top of body and headers.
+ENTRY_OVERHEAD_BYTES = 256
+
+
+class DataVersion:
+    """The current data-version token, loaded lazily and reloaded when a run finishes.
+
+    `on_change(token)` is called, under the same lock, whenever a load yields a token other than the
+    previous one; the response cache hangs off it so only one place ever switches tokens.
+    """
+
+    def __init__(self, loader: Callable[[], str], on_change: Optional[Callable[[str], None]] = None):
+        self._loader = loader
+        self._on_change = on_change
+        self._lock = Lock()
+        self._token: Optional[str] = None
+        self._last: Optional[str] = None
+
+    def _load(self) -> str:
+        token = self._loader()
+        if token != self._last and self._on_change is not None:
+            self._on_change(token)
+        self._last = token
+        return token
+
+    def current(self) -> str:
+        token = self._token
+        if token is not None:
+            return token
+        with self._lock:
+            if self._token is None:
+                self._token = self._load()
+            return self._token
+
+    def refresh(self) -> None:
+        with self._lock:
+            try:
+                self._token = self._load()
+            except Exception:
+                logger.exception("Could not reload the data version; it will be retried on the next request")
+                self._token = None
+
+
+class ResponseCache:
+    """LRU of response bodies bounded by total bytes rather than entry count.
+
+    Entries carry the data-version token in their key. `reset(token)` drops everything and starts
+    accepting entries for `token`; a store under any other token (a request that began before the
+    switch) is skipped.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: Optional[int] = None):
+        self.max_bytes = max(int(max_bytes), 0)
+        self.max_entry_bytes = self.max_bytes // 8 if max_entry_bytes is None else min(int(max_entry_bytes), self.max_bytes)
+        self._entries: "OrderedDict[CacheKey, Tuple[CachedResponse, int]]" = OrderedDict()
+        self._size = 0
+        self._token: Optional[str] = None
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def entry_size(entry: CachedResponse) -> int:
+        _, headers, body = entry
+        return len(body) + sum(len(k) + len(v) for k, v in headers) + ENTRY_OVERHEAD_BYTES
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: CacheKey, entry: CachedResponse) -> bool:
+        size = self.entry_size(entry)
+        if size > self.max_entry_bytes:
+            return False
+        with self._lock:
+            if key[0] != self._token:
+                return False
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (entry, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def reset(self, token: str) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._token = token
+
+
+def cache_key(token: str, path: str, query_string: bytes, accept: str, resource_version: str = "") -> CacheKey:
+    # Blank parameters mean "not given" for every read endpoint, so they are dropped with ordering.
+    params = tuple(sorted((k, v) for k, v in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True) if v != ""))
+    return (token, path, params, negotiate_format(accept), resource_version)
+
+
+def make_etag(version: str, key: CacheKey) -> str:
+    """Strong validator for one representation: the data version plus path, parameters and format."""
+    digest = hashlib.sha1(repr((version,) + key[1:4]).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so a W/ prefix on the client's copy still matches.
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return any(c == "*" or (c[2:] if c.startswith("W/") else c) == etag for c in candidates)
+
+
+class ResponseCacheMiddleware:
+    """Serves repeated GETs under `path_prefix` from `app.state.response_cache`, with ETags.
+
+    The token comes from `app.state.data_version`; without it on the app state requests pass through.
+    Every response carries an ETag built from that token, or from a narrower per-resource version when
+    the path matches one of `etag_versions` (pattern, `fn(repo, path_params, query_params) -> str`)
+    pairs, so a finished run only changes the ETags of resources it actually wrote. That version is
+    part of the cache key too, so a body cached before the resource changed is never served under
+    its new ETag, even while the token stays the same. A matching If-None-Match is answered with 304 before any row query runs. Bodies are forwarded while they
+    stream, and copied only up to the per-entry limit, so large downloads are never buffered.
+    """
+
+    def __init__(self, app, path_prefix: str = "/api/v1/", etag_versions: Sequence[Tuple[Pattern, EtagVersion]] = ()):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.etag_versions = list(etag_versions)
+
+    def _resource_version(self, path: str) -> Optional[Tuple[EtagVersion, Dict[str, str]]]:
+        for pattern, fn in self.etag_versions:
+            match = pattern.match(path)
+            if match:
+                return fn, match.groupdict()
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        state = getattr(scope.get("app"), "state", None)
+        cache: Optional[ResponseCache] = getattr(state, "response_cache", None)
+        version: Optional[DataVersion] = getattr(state, "data_version", None)
+        if version is None:
+            await self.app(scope, receive, send)
+            return
+        if cache is not None and not cache.max_bytes:
+            cache = None
+
+        request_headers = Headers(scope=scope)
+        token = await run_in_threadpool(version.current)
+        key = cache_key(token, scope["path"], scope.get("query_string", b""), request_headers.get("accept", ""))
+        resource = self._resource_version(scope["path"])
+        if resource is None:
+            etag = make_etag(token, key)
+        else:
+            fn, path_params = resource
+            resource_version = await run_in_threadpool(fn, state.repo, path_params, dict(key[2]))
+            key = key[:4] + (resource_version,)
+            etag = make_etag(resource_version, key)
+        etag_header = (b"etag", etag.encode("latin-1"))
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            await send({"type": "http.response.start", "status": 304, "headers": [etag_header, (b"vary", b"Accept")]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        hit = cache.get(key) if cache is not None else None
+        if hit is not None:
+            status, headers, body = hit
+            await send({"type": "http.response.start", "status": status, "headers": headers + [etag_header, (b"x-cache", b"HIT")]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        status = 0
+        headers: List[Tuple[bytes, bytes]] = []
+        chunks: List[bytes] = []
+        copied = 0
+        cacheable = cache is not None
+
+        async def send_and_capture(message):
+            nonlocal status, headers, copied, cacheable
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                cacheable = cacheable and status == 200
+                extra = [etag_header] if status == 200 else []
+                if cache is not None:
+                    extra.append((b"x-cache", b"MISS"))
+                message = {**message, "headers": headers + extra}
+            elif message["type"] == "http.response.body" and cacheable:
+                body = message.get("body", b"")
+                copied += len(body)
+                if copied > cache.max_entry_bytes:
+                    cacheable = False
+                    chunks.clear()
+                else:
+                    chunks.append(body)
+                    if not message.get("more_body", False):
+                        cache.put(key, (status, headers, b"".join(chunks)))
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
@@ -0,0 +1,140 @@
+"""gzip / zstd compression of API responses, negotiated through Accept-Encoding and applied while streaming."""
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .arrow_responses import ARROW_STREAM_MEDIA_TYPE
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is always available
+    zstandard = None
+
+# Parquet bodies are already compressed column by column, so they are left alone.
+COMPRESSIBLE_MEDIA_TYPES = {"application/json", "application/x-ndjson", ARROW_STREAM_MEDIA_TYPE}
+
+
+def supported_encodings() -> List[str]:
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """The supported content coding the client weights highest (zstd on ties), or None for identity."""
+    weights = {}
+    for part in (accept_encoding or "").split(","):
+        coding, *params = [token.strip() for token in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            if param.replace(" ", "").startswith("q="):
+                try:
+                    q = float(param.split("=", 1)[1])
+                except ValueError:
+                    q = 0.0
+        weights[coding.lower()] = q
+    best, best_q = None, 0.0
+    for coding in supported_encodings():
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Compressor:
+    """Incremental encoder; every chunk is flushed so streamed rows reach the client without waiting for the end."""
+
+    def __init__(self, encoding: str, gzip_level: int, zstd_level: int):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=zstd_level).compressobj()
+        else:
+            self._obj = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK if self.encoding == "zstd" else zlib.Z_SYNC_FLUSH
+        return self._obj.compress(data) + self._obj.flush(flush_mode)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class CompressionMiddleware:
+    """Compresses 200 responses under `path_prefix` whose media type is in COMPRESSIBLE_MEDIA_TYPES.
+
+    Bodies shorter than `minimum_size` go out as they are; longer or streamed ones are compressed chunk
+    by chunk, so a panel export is never buffered. A compressed response's ETag becomes weak (it no
+    longer names the exact bytes), which If-None-Match still matches. Install it outside the
+    response cache so cached entries stay uncompressed and serve every encoding.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, path_prefix: str = "/api/v1/", gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.path_prefix = path_prefix
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[dict] = None
+        pending: List[bytes] = []
+        pending_size = 0
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_start(compress: bool) -> None:
+            headers = MutableHeaders(raw=list(start["headers"]))
+            headers.add_vary_header("Accept-Encoding")
+            if compress:
+                del headers["content-length"]
+                headers["content-encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["etag"] = f"W/{etag}"
+            await send({**start, "headers": headers.raw})
+
+        async def send_compressing(message):
+            nonlocal start, pending_size, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+                if message["status"] != 200 or "content-encoding" in headers or media_type not in COMPRESSIBLE_MEDIA_TYPES:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                pending.append(body)
+                pending_size += len(body)
+                if pending_size < self.minimum_size:
+                    if more_body:
+                        return
+                    await send_start(compress=False)
+                    await send({"type": "http.response.body", "body": b"".join(pending)})
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.zstd_level)
+                await send_start(compress=True)
+                body = b"".join(pending)
+                pending.clear()
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressing)
@@ -1,14 +1,65 @@
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from uuid import uuid4
+from typing import Any, Dict, Optional, Union
+from uuid import UUID, uuid4, uuid5
 
 from .repository import Repository
 
+UUID_COERCE_NAMESPACE = UUID("7c76f04a-fca0-494d-96f8-6a68f1f21e84")
+
+
+@dataclass
+class RunContext:
+    run_id: str
+    pipeline_name: str
+    source_name: str
+    window_start: str
+    window_end: str
+    started_at: str
+    cache: Dict[str, Any] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        return self.run_id
+
+
+RunRef = Union[RunContext, str, None]
+
+
+def _coerce_uuid(value: str) -> str:
+    if value is None:
+        return value
+    raw = str(value).strip()
+    if not raw:
+        return raw
+    try:
+        return str(UUID(raw))
+    except ValueError:
+        return str(uuid5(UUID_COERCE_NAMESPACE, raw))
+
+
+def resolve_run_id(repo: Repository, run: RunRef) -> Optional[str]:
+    """Return the persisted run_id for `run`, or None when it does not reference a stored run.
+
+    A RunContext has already been validated by `RunManager.start` and costs nothing; a bare string
+    still needs one lookup against collection_runs. Non-UUID strings are looked up under their uuid5
+    in UUID_COERCE_NAMESPACE, the same mapping `_coerce_uuid` applies to instrument ids.
+    """
+    if isinstance(run, RunContext):
+        return run.run_id
+    if not run:
+        return None
+    normalized = _coerce_uuid(run)
+    if not normalized:
+        return None
+    rows = repo.query("SELECT run_id FROM collection_runs WHERE run_id = %s", (normalized,))
+    return normalized if rows else None
+
 
 class RunManager:
     def __init__(self, repo: Repository):
         self.repo = repo
 
-    def start(self, pipeline_name: str, source_name: str, window_start: str, window_end: str) -> str:
+    def start(self, pipeline_name: str, source_name: str, window_start: str, window_end: str) -> RunContext:
         run_id = str(uuid4())
         now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
         self.repo.insert_run(
@@ -27,9 +78,16 @@ class RunManager:
                 "metadata": None,
             }
         )
-        return run_id
+        return RunContext(
+            run_id=run_id,
+            pipeline_name=pipeline_name,
+            source_name=source_name,
+            window_start=window_start,
+            window_end=window_end,
+            started_at=now,
+        )
 
-    def finish(self, run_id: str, success_count: int, failure_count: int, warning_count: int) -> None:
+    def finish(self, run_id: RunRef, success_count: int, failure_count: int, warning_count: int) -> None:
         if failure_count == 0 and warning_count == 0:
             status = "SUCCESS"
         elif failure_count > 0:
@@ -38,23 +96,29 @@ class RunManager:
             status = "PARTIAL"
         now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
         self.repo.update_run(
-            run_id,
+            str(run_id),
             {
                 "status": status,
                 "finished_at": now,
                 "success_count": success_count,
                 "failure_count": failure_count,
                 "warning_count": warning_count,
+                # Tells a run that got to the end (even FAILED on validation errors) from one aborted by `fail`.
+                "metadata": {"completed": True},
             },
         )
+        # API processes drop cached responses and their trading-session index.
+        self.repo.notify_data_changed()
 
-    def fail(self, run_id: str, failure_count: int = 1) -> None:
+    def fail(self, run_id: RunRef, failure_count: int = 1) -> None:
         now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
         self.repo.update_run(
-            run_id,
+            str(run_id),
             {
                 "status": "FAILED",
                 "finished_at": now,
                 "failure_count": failure_count,
             },
         )
+        # Units of work committed before the failure are visible too.
+        self.repo.notify_data_changed()
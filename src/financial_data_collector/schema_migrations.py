@@ -0,0 +1,114 @@
+import hashlib
+import logging
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+SQL_DIR = Path(__file__).resolve().parents[2] / "sql"
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    path: Path
+    # Adopted without running when the database already has the baseline tables (pre-versioning installs).
+    baseline: bool = False
+
+    @property
+    def sql(self) -> str:
+        return self.path.read_text(encoding="utf-8-sig")
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.replace("\r\n", "\n").encode("utf-8")).hexdigest()
+
+
+def load_migrations(sql_dir: Path = SQL_DIR) -> List[Migration]:
+    """Return the ordered migration steps: the two legacy scripts, then `sql/migrations/NNNN_name.sql`."""
+    migrations = [
+        Migration(1, "platform_schema", sql_dir / "platform_schema.sql", baseline=True),
+        Migration(2, "platform_postgres_migrations", sql_dir / "platform_postgres_migrations.sql"),
+    ]
+    migrations_dir = sql_dir / "migrations"
+    if migrations_dir.is_dir():
+        for path in sorted(migrations_dir.glob("*.sql")):
+            match = MIGRATION_FILE_PATTERN.match(path.name)
+            if not match:
+                raise MigrationError(f"migration file name must look like NNNN_name.sql: {path.name}")
+            migrations.append(Migration(int(match.group(1)), match.group(2), path))
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions) or versions != sorted(versions):
+        raise MigrationError(f"migration versions must be unique and increasing: {versions}")
+    return migrations
+
+
+def _applied(conn) -> Dict[int, str]:
+    present = conn.execute("SELECT to_regclass('schema_migrations') IS NOT NULL AS present").fetchone()
+    if not present["present"]:
+        return {}
+    return {row["version"]: row["checksum"] for row in conn.execute("SELECT version, checksum FROM schema_migrations")}
+
+
+def _verify(migrations: List[Migration], applied: Dict[int, str]) -> List[Migration]:
+    known = {m.version for m in migrations}
+    unknown = sorted(v for v in applied if v not in known)
+    if unknown:
+        raise MigrationError(f"database has migrations unknown to this code: {unknown}")
+    for migration in migrations:
+        checksum = applied.get(migration.version)
+        if checksum is not None and checksum != migration.checksum:
+            raise MigrationError(f"checksum mismatch for applied migration {migration.version:04d}_{migration.name}; add a new migration instead of editing it")
+    return [m for m in migrations if m.version not in applied]
+
+
+def apply_migrations(conn, migrations: List[Migration]) -> List[int]:
+    """Bring the schema on `conn`'s search_path up to date inside the caller's transaction.
+
+    Returns the versions that were applied (or adopted). When everything is current this is a
+    couple of catalog reads and takes no locks, so it is cheap to call on every startup.
+    """
+    if not _verify(migrations, _applied(conn)):
+        return []
+
+    # Serialize concurrent starters per schema; the lock is released when the caller commits.
+    conn.execute("SELECT pg_advisory_xact_lock(hashtext(current_schema() || '.schema_migrations'))")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            baselined BOOLEAN NOT NULL DEFAULT FALSE,
+            execution_ms INTEGER NOT NULL DEFAULT 0,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+    )
+    pending = _verify(migrations, _applied(conn))
+    done: List[int] = []
+    for migration in pending:
+        adopt = False
+        if migration.baseline:
+            exists = conn.execute("SELECT to_regclass('instruments') IS NOT NULL AS present").fetchone()
+            adopt = bool(exists["present"])
+        started = time.perf_counter()
+        if not adopt:
+            conn.execute(migration.sql)
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        conn.execute(
+            "INSERT INTO schema_migrations (version, name, checksum, baselined, execution_ms) VALUES (%s, %s, %s, %s, %s)",
+            (migration.version, migration.name, migration.checksum, adopt, elapsed_ms),
+        )
+        logger.info("%s migration %04d_%s (%d ms)", "Adopted" if adopt else "Applied", migration.version, migration.name, elapsed_ms)
+        done.append(migration.version)
+    return done
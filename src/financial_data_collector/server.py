@@ -2,14 +2,22 @@
 FastAPI server for minimal backtest data browsing.
 """
 import os
+import threading
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from .dashboard_routes import router as dashboard_router
+from .dashboard_routes import ETAG_VERSIONS, router as dashboard_router
+from .data_changes import start_change_listener
 from .repository import Repository
+from .response_compression import CompressionMiddleware
+from .response_cache import DataVersion, ResponseCache, ResponseCacheMiddleware
 
 DATABASE_URL = os.getenv("DATABASE_URL", "")
+# Byte budget of the in-process read API response cache; 0 disables it.
+RESPONSE_CACHE_MAX_MB = int(os.getenv("RESPONSE_CACHE_MAX_MB", "64"))
+# API responses smaller than this go out uncompressed; larger ones use zstd or gzip as the client accepts.
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
 
 
 @asynccontextmanager
@@ -19,7 +27,20 @@ async def lifespan(app: FastAPI):
     repo = Repository(DATABASE_URL)
     repo.init_schema()
     app.state.repo = repo
-    yield
+    app.state.response_cache = ResponseCache(RESPONSE_CACHE_MAX_MB * 1024 * 1024)
+    app.state.data_version = DataVersion(repo.get_data_version, on_change=app.state.response_cache.reset)
+
+    def on_data_changed() -> None:
+        repo.calendar.invalidate()
+        app.state.data_version.refresh()
+
+    stop_listener = threading.Event()
+    listener = start_change_listener(repo.database_url, repo.schema, on_data_changed, stop_listener)
+    try:
+        yield
+    finally:
+        stop_listener.set()
+        listener.join(timeout=5)
 
 
 app = FastAPI(
@@ -29,6 +50,9 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(ResponseCacheMiddleware, etag_versions=ETAG_VERSIONS)
+# Added last so it runs outermost: the cache keeps uncompressed bodies and serves every encoding.
+app.add_middleware(CompressionMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_BYTES)
 app.include_router(dashboard_router)
 
 
@@ -41,8 +65,13 @@ async def root():
         "endpoints": {
             "instruments": "GET /api/v1/instruments",
             "instrument_daily": "GET /api/v1/instruments/{external_code}/daily",
+            "daily_panel": "GET /api/v1/panel/daily",
+            "market_daily": "GET /api/v1/markets/{market_code}/daily/{trade_date}",
             "benchmark_daily": "GET /api/v1/benchmarks/{index_code}/daily",
             "calendar": "GET /api/v1/calendar",
+            "calendar_sessions": "GET /api/v1/calendar/{market_code}/next|prev|offset|count",
+            "quality_summary": "GET /api/v1/quality/summary",
+            "quality_issues": "GET /api/v1/quality/issues",
         },
     }
 
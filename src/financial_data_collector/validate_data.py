@@ -0,0 +1,133 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .repository import Repository
+from .runs import RunManager
+from .settings import load_dotenv
+from .validation import ValidationJob
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_KEYS = ("rows_checked", "issues_total", "errors", "warnings", "infos")
+
+
+def plan_chunks(market_codes: List[str], date_from: date, date_to: date, chunk_days: int) -> List[Tuple[str, date, date]]:
+    if chunk_days <= 0:
+        raise ValueError("chunk_days must be > 0")
+    chunks = []
+    for market_code in market_codes:
+        start = date_from
+        while start <= date_to:
+            end = min(start + timedelta(days=chunk_days - 1), date_to)
+            chunks.append((market_code, start, end))
+            start = end + timedelta(days=1)
+    return chunks
+
+
+def run_validation(
+    database_url: str,
+    market_codes: List[str],
+    date_from: date,
+    date_to: date,
+    chunk_days: int = 90,
+    workers: int = 4,
+    rules: Optional[List[str]] = None,
+    repo: Optional[Repository] = None,
+) -> Dict[str, Any]:
+    """Full-range audit split into (market, date chunk) units validated on concurrent database sessions.
+
+    The checks themselves run inside PostgreSQL (and in the Arrow rule engine), so threads are enough to
+    keep several sessions busy. A failed chunk is reported and does not stop the others.
+    """
+    markets = [m.strip().upper() for m in market_codes if m.strip()]
+    if not markets:
+        raise ValueError("at least one market code is required")
+    owns_repo = repo is None
+    if owns_repo:
+        # Two connections per worker: the rule engine streams on one and writes each batch's issues on the other.
+        repo = Repository(database_url, pool_size=2 * max(workers, 1))
+        repo.init_schema()
+    chunks = plan_chunks(markets, date_from, date_to, chunk_days)
+    run_manager = RunManager(repo)
+    run = run_manager.start("validate-data", "validation", date_from.isoformat(), date_to.isoformat())
+    job = ValidationJob(repo)
+    totals = {key: 0 for key in SUMMARY_KEYS}
+    results: List[Dict[str, Any]] = []
+    failed = 0
+    started = time.perf_counter()
+
+    def validate_chunk(chunk: Tuple[str, date, date]) -> Dict[str, Any]:
+        market_code, chunk_from, chunk_to = chunk
+        chunk_started = time.perf_counter()
+        summary = job.validate_range(market_code, chunk_from.isoformat(), chunk_to.isoformat(), run, rules=rules)
+        return {"market_code": market_code, "date_from": chunk_from.isoformat(), "date_to": chunk_to.isoformat(), "seconds": round(time.perf_counter() - chunk_started, 3), **summary}
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="validate") as executor:
+            futures = {executor.submit(validate_chunk, chunk): chunk for chunk in chunks}
+            for done, future in enumerate(as_completed(futures), start=1):
+                market_code, chunk_from, chunk_to = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    failed += 1
+                    logger.exception("Validation failed for %s %s..%s", market_code, chunk_from, chunk_to)
+                    result = {"market_code": market_code, "date_from": chunk_from.isoformat(), "date_to": chunk_to.isoformat(), "error": str(exc)}
+                else:
+                    for key in SUMMARY_KEYS:
+                        totals[key] += result[key]
+                    logger.info(
+                        "[%d/%d] %s %s..%s rows=%d issues=%d in %.2fs",
+                        done, len(chunks), market_code, result["date_from"], result["date_to"], result["rows_checked"], result["issues_total"], result["seconds"],
+                    )
+                results.append(result)
+        run_manager.finish(run, success_count=totals["rows_checked"], failure_count=totals["errors"] + failed, warning_count=totals["warnings"])
+    except Exception:
+        run_manager.fail(run)
+        raise
+    finally:
+        if owns_repo:
+            repo.close()
+    results.sort(key=lambda r: (r["market_code"], r["date_from"]))
+    return {"run_id": run.run_id, "elapsed_seconds": round(time.perf_counter() - started, 3), "failed_chunks": failed, "totals": totals, "chunks": results}
+
+
+def main() -> None:
+    load_dotenv(".env")
+    parser = argparse.ArgumentParser(description="Audit stored daily market data over a date range, in parallel chunks.")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", ""))
+    parser.add_argument("--market-codes", default="KOSDAQ,KOSPI", help="Comma-separated market codes")
+    parser.add_argument("--date-from", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--date-to", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--chunk-days", type=int, default=90, help="Calendar days per validation chunk")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent database sessions")
+    parser.add_argument("--rules", default="", help="Comma-separated statistical rules to run as well (e.g. PRICE_JUMP_OUTLIER,VOLUME_SPIKE)")
+    parser.add_argument("--purge-resolved-days", type=int, default=0, help="Afterwards delete issues resolved more than N days ago (0 keeps them)")
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if not args.database_url:
+        raise ValueError("--database-url or DATABASE_URL is required")
+    date_from = date.fromisoformat(args.date_from)
+    date_to = date.fromisoformat(args.date_to)
+    if date_from > date_to:
+        raise ValueError("date-from must be <= date-to")
+    rules = [r.strip().upper() for r in args.rules.split(",") if r.strip()] or None
+    result = run_validation(args.database_url, args.market_codes.split(","), date_from, date_to, chunk_days=args.chunk_days, workers=args.workers, rules=rules)
+    if args.purge_resolved_days > 0:
+        repo = Repository(args.database_url)
+        result["purged_resolved_issues"] = repo.purge_resolved_issues(args.purge_resolved_days)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if result["failed_chunks"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
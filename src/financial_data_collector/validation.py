@@ -1,138 +1,133 @@
 from datetime import datetime, timezone
-from typing import Dict, List
-from uuid import UUID
+from typing import Dict, List, Optional
 
 from .repository import Repository
+from .runs import RunRef, resolve_run_id
+
+# Row checks and the open-day coverage check run as one statement inside PostgreSQL: the scoped rows are
+# read once, and issues are written with INSERT ... SELECT instead of being shipped to Python and back.
+# {run_scope} narrows the row checks to one run's change set; {coverage} picks how open days are checked.
+VALIDATE_RANGE_SQL = """
+WITH scoped AS (
+    SELECT d.instrument_id, d.trade_date, d.open, d.high, d.low, d.close, d.volume, d.turnover_value, d.market_value, d.is_trade_halted
+    FROM daily_market_data d
+    JOIN instruments i ON i.instrument_id = d.instrument_id
+    WHERE i.market_code = %s
+      AND d.trade_date BETWEEN %s AND %s
+      {run_scope}
+),
+row_issues AS (
+    SELECT s.trade_date, s.instrument_id, c.issue_code, 'ERROR' AS severity
+    FROM scoped s
+    CROSS JOIN LATERAL (
+        VALUES
+            ('OHLC_HIGH_INCONSISTENT', NOT s.is_trade_halted AND s.high < GREATEST(s.open, s.close, s.low)),
+            ('OHLC_LOW_INCONSISTENT', NOT s.is_trade_halted AND s.low > LEAST(s.open, s.close, s.high)),
+            ('NEGATIVE_VOLUME', s.volume < 0),
+            ('NEGATIVE_TURNOVER', s.turnover_value < 0),
+            ('NEGATIVE_MARKET_VALUE', s.market_value < 0)
+    ) AS c(issue_code, failed)
+    WHERE c.failed
+),
+missing_days AS (
+    SELECT c.trade_date, NULL::uuid AS instrument_id, 'OPEN_DAY_TOTAL_MISSING' AS issue_code, 'WARN' AS severity
+    FROM trading_calendar c
+    {coverage}
+),
+inserted AS (
+    INSERT INTO data_quality_issues(
+        dataset_name, trade_date, market_code, instrument_id, index_code, issue_code, severity,
+        issue_detail, source_name, detected_at, run_id, resolved_at
+    )
+    SELECT 'daily_market_data', trade_date, %s, instrument_id, NULL, issue_code, severity,
+           issue_code, 'validation', %s, %s, NULL
+    FROM (SELECT * FROM row_issues UNION ALL SELECT * FROM missing_days) issues
+    ON CONFLICT(dataset_name, trade_date, market_code, instrument_id, index_code, issue_code) DO UPDATE SET
+        severity = excluded.severity,
+        issue_detail = excluded.issue_detail,
+        source_name = excluded.source_name,
+        detected_at = excluded.detected_at,
+        run_id = excluded.run_id,
+        resolved_at = NULL
+    RETURNING severity
+)
+SELECT
+    (SELECT COUNT(*) FROM scoped) AS rows_checked,
+    COUNT(*) AS issues_total,
+    COUNT(*) FILTER (WHERE severity = 'ERROR') AS errors,
+    COUNT(*) FILTER (WHERE severity = 'WARN') AS warnings,
+    COUNT(*) FILTER (WHERE severity = 'INFO') AS infos
+FROM inserted
+"""
+
+ISSUE_CODES = ("OHLC_HIGH_INCONSISTENT", "OHLC_LOW_INCONSISTENT", "NEGATIVE_VOLUME", "NEGATIVE_TURNOVER", "NEGATIVE_MARKET_VALUE", "OPEN_DAY_TOTAL_MISSING")
+
+# Full range: every row of every day was scoped, so one anti-join against the scoped days is enough.
+FULL_COVERAGE_SQL = """
+    LEFT JOIN (SELECT trade_date FROM scoped GROUP BY trade_date) present ON present.trade_date = c.trade_date
+    WHERE c.market_code = %s
+      AND c.trade_date BETWEEN %s AND %s
+      AND c.is_open = TRUE
+      AND present.trade_date IS NULL
+"""
+
+# Change set: unchanged rows are not scoped, so probe the table per open day instead (idx_daily_trade_date).
+CHANGED_COVERAGE_SQL = """
+    WHERE c.market_code = %s
+      AND c.trade_date BETWEEN %s AND %s
+      AND c.is_open = TRUE
+      AND NOT EXISTS (
+          SELECT 1
+          FROM daily_market_data d
+          JOIN instruments i ON i.instrument_id = d.instrument_id
+          WHERE d.trade_date = c.trade_date
+            AND i.market_code = c.market_code
+      )
+"""
 
 
 class ValidationJob:
     def __init__(self, repo: Repository):
         self.repo = repo
 
-    def validate_range(self, market_code: str, date_from: str, date_to: str, run_id: str) -> Dict[str, int]:
-        issues: List[Dict] = []
-        now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        persisted_run_id = None
-        if run_id:
-            try:
-                normalized = str(UUID(str(run_id)))
-                if self.repo.query("SELECT run_id FROM collection_runs WHERE run_id = %s", (normalized,)):
-                    persisted_run_id = normalized
-            except ValueError:
-                persisted_run_id = None
+    def validate_range(self, market_code: str, date_from: str, date_to: str, run_id: RunRef, changed_only: bool = False, rules: Optional[List[str]] = None) -> Dict[str, int]:
+        """Validate `market_code` rows in [date_from, date_to].
 
-        rows = self.repo.query(
-            """
-            SELECT d.instrument_id, d.trade_date, d.open, d.high, d.low, d.close, d.volume, d.turnover_value, d.market_value, d.is_trade_halted
-            FROM daily_market_data d
-            JOIN instruments i ON i.instrument_id = d.instrument_id
-            WHERE i.market_code = %s
-              AND d.trade_date BETWEEN %s AND %s
-            """,
-            (market_code, date_from, date_to),
-        )
-        for r in rows:
-            if not bool(r.get("is_trade_halted")):
-                if r["high"] < max(r["open"], r["close"], r["low"]):
-                    issues.append(
-                        self._issue(
-                            "daily_market_data",
-                            r["trade_date"],
-                            r["instrument_id"],
-                            None,
-                            "OHLC_HIGH_INCONSISTENT",
-                            "ERROR",
-                            persisted_run_id,
-                            now,
-                        )
-                    )
-                if r["low"] > min(r["open"], r["close"], r["high"]):
-                    issues.append(
-                        self._issue(
-                            "daily_market_data",
-                            r["trade_date"],
-                            r["instrument_id"],
-                            None,
-                            "OHLC_LOW_INCONSISTENT",
-                            "ERROR",
-                            persisted_run_id,
-                            now,
-                        )
-                    )
-            if r["volume"] < 0:
-                issues.append(
-                    self._issue("daily_market_data", r["trade_date"], r["instrument_id"], None, "NEGATIVE_VOLUME", "ERROR", persisted_run_id, now)
-                )
-            if r["turnover_value"] is not None and r["turnover_value"] < 0:
-                issues.append(
-                    self._issue("daily_market_data", r["trade_date"], r["instrument_id"], None, "NEGATIVE_TURNOVER", "ERROR", persisted_run_id, now)
-                )
-            if r["market_value"] is not None and r["market_value"] < 0:
-                issues.append(
-                    self._issue("daily_market_data", r["trade_date"], r["instrument_id"], None, "NEGATIVE_MARKET_VALUE", "ERROR", persisted_run_id, now)
-                )
+        With `changed_only`, row checks cover only rows last written by `run_id` (the daily upsert keeps the
+        previous run_id on rows whose values did not change), so cost follows the change set rather than the
+        window. Without a persisted run there is no change set and the full range is validated.
 
-        open_days = self.repo.query(
-            """
-            SELECT trade_date
-            FROM trading_calendar
-            WHERE market_code = %s
-              AND trade_date BETWEEN %s AND %s
-              AND is_open = TRUE
-            """,
-            (market_code, date_from, date_to),
-        )
-        for d in open_days:
-            count = self.repo.query(
-                """
-                SELECT COUNT(1) AS c
-                FROM daily_market_data d
-                JOIN instruments i ON i.instrument_id = d.instrument_id
-                WHERE i.market_code = %s
-                  AND d.trade_date = %s
-                """,
-                (market_code, d["trade_date"]),
-            )[0]["c"]
-            if count == 0:
-                issues.append(
-                    self._issue(
-                        "daily_market_data",
-                        d["trade_date"],
-                        None,
-                        None,
-                        "OPEN_DAY_TOTAL_MISSING",
-                        "WARN",
-                        persisted_run_id,
-                        now,
-                    )
-                )
-
-        if issues:
-            self.repo.insert_issues(issues)
-
-        errors = sum(1 for issue in issues if issue["severity"] == "ERROR")
-        warnings = sum(1 for issue in issues if issue["severity"] == "WARN")
-        infos = sum(1 for issue in issues if issue["severity"] == "INFO")
-        return {
-            "issues_total": len(issues),
-            "errors": errors,
-            "warnings": warnings,
-            "infos": infos,
-            "rows_checked": len(rows),
+        `rules` names statistical rules from `validation_rules` to run over the range as well; their
+        counts are added to the summary.
+        """
+        now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        persisted_run_id = resolve_run_id(self.repo, run_id)
+        params = [market_code, date_from, date_to]
+        changed_run_id = persisted_run_id if changed_only else None
+        if changed_run_id:
+            query_text = VALIDATE_RANGE_SQL.format(run_scope="AND d.run_id = %s", coverage=CHANGED_COVERAGE_SQL)
+            params.append(changed_run_id)
+        else:
+            query_text = VALIDATE_RANGE_SQL.format(run_scope="", coverage=FULL_COVERAGE_SQL)
+        params.extend([market_code, date_from, date_to, market_code, now, persisted_run_id])
+        with self.repo.transaction():
+            summary = self.repo.query(query_text, tuple(params))[0]
+            resolved = self.repo.resolve_stale_issues(
+                "daily_market_data", ISSUE_CODES, date_from, date_to, now, market_code=market_code, changed_run_id=changed_run_id, refresh_summary=False
+            )
+            if resolved or summary["issues_total"]:
+                self.repo.refresh_issue_summary(date_from, date_to)
+        result = {
+            "issues_total": int(summary["issues_total"]),
+            "errors": int(summary["errors"]),
+            "warnings": int(summary["warnings"]),
+            "infos": int(summary["infos"]),
+            "rows_checked": int(summary["rows_checked"]),
         }
+        if rules:
+            from .validation_rules import ValidationEngine, get_rules
 
-    @staticmethod
-    def _issue(dataset_name, trade_date, instrument_id, index_code, issue_code, severity, run_id, detected_at):
-        return {
-            "dataset_name": dataset_name,
-            "trade_date": trade_date,
-            "instrument_id": instrument_id,
-            "index_code": index_code,
-            "issue_code": issue_code,
-            "severity": severity,
-            "issue_detail": issue_code,
-            "source_name": "validation",
-            "detected_at": detected_at,
-            "run_id": run_id,
-            "resolved_at": None,
-        }
+            statistics = ValidationEngine(self.repo, get_rules(rules)).run(market_code, date_from, date_to, persisted_run_id)
+            for key in ("issues_total", "errors", "warnings", "infos"):
+                result[key] += statistics[key]
+        return result
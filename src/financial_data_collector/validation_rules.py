@@ -0,0 +1,251 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .repository import Repository
+from .runs import RunRef, resolve_run_id
+
+# Columns a rule may ask for: SQL expression over `daily_market_data d` and the Arrow type it is loaded as.
+COLUMNS: Dict[str, Tuple[str, pa.DataType]] = {
+    "instrument_id": ("d.instrument_id::text", pa.string()),
+    "trade_date": ("d.trade_date", pa.date32()),
+    "open": ("d.open::float8", pa.float64()),
+    "high": ("d.high::float8", pa.float64()),
+    "low": ("d.low::float8", pa.float64()),
+    "close": ("d.close::float8", pa.float64()),
+    "volume": ("d.volume::float8", pa.float64()),
+    "turnover_value": ("d.turnover_value::float8", pa.float64()),
+    "market_value": ("d.market_value::float8", pa.float64()),
+    "listed_shares": ("d.listed_shares::float8", pa.float64()),
+    "is_trade_halted": ("d.is_trade_halted", pa.bool_()),
+}
+
+
+@dataclass
+class ValidationRule:
+    """A vectorized check over rows ordered by (instrument_id, trade_date).
+
+    `predicate` receives a table holding `columns` (plus instrument_id and trade_date) and returns a
+    boolean array that is true where a row violates the rule. Rules that compare a row with earlier
+    rows of the same instrument declare how many such rows they need in `lookback`.
+    """
+
+    code: str
+    severity: str
+    columns: Tuple[str, ...]
+    predicate: Callable[[pa.Table], pa.Array]
+    lookback: int = 0
+    description: str = ""
+
+
+RULES: Dict[str, ValidationRule] = {}
+
+
+def register_rule(rule: ValidationRule) -> ValidationRule:
+    unknown = [c for c in rule.columns if c not in COLUMNS]
+    if unknown:
+        raise ValueError(f"rule {rule.code} uses unknown columns: {unknown}")
+    if rule.severity not in ("INFO", "WARN", "ERROR"):
+        raise ValueError(f"rule {rule.code} has invalid severity: {rule.severity}")
+    RULES[rule.code] = rule
+    return rule
+
+
+def get_rules(codes: Optional[Iterable[str]] = None) -> List[ValidationRule]:
+    if codes is None:
+        return list(RULES.values())
+    missing = [c for c in codes if c not in RULES]
+    if missing:
+        raise ValueError(f"unknown validation rules: {missing}")
+    return [RULES[c] for c in codes]
+
+
+def _column(table: pa.Table, name: str) -> pa.Array:
+    return table.column(name).combine_chunks()
+
+
+def lag(values: pa.Array, ids: pa.Array, k: int) -> pa.Array:
+    """`values` shifted down by k rows; null where the row k above belongs to another instrument."""
+    n = len(values)
+    if k >= n:
+        return pa.nulls(n, values.type)
+    shifted = pa.concat_arrays([pa.nulls(k, values.type), values.slice(0, n - k)])
+    shifted_ids = pa.concat_arrays([pa.nulls(k, ids.type), ids.slice(0, n - k)])
+    same_instrument = pc.fill_null(pc.equal(ids, shifted_ids), False)
+    return pc.if_else(same_instrument, shifted, pa.scalar(None, values.type))
+
+
+def rolling_mean_std(values: pa.Array, ids: pa.Array, window: int) -> Tuple[pa.Array, pa.Array, pa.Array]:
+    """Mean, population std and sample count of the previous `window` non-null values of the same instrument."""
+    total = squares = count = None
+    for k in range(1, window + 1):
+        lagged = lag(values, ids, k)
+        filled = pc.fill_null(lagged, 0.0)
+        valid = pc.cast(pc.is_valid(lagged), pa.float64())
+        total = filled if total is None else pc.add(total, filled)
+        squares = pc.multiply(filled, filled) if squares is None else pc.add(squares, pc.multiply(filled, filled))
+        count = valid if count is None else pc.add(count, valid)
+    safe_count = pc.max_element_wise(count, 1.0)
+    mean = pc.divide(total, safe_count)
+    variance = pc.max_element_wise(pc.subtract(pc.divide(squares, safe_count), pc.multiply(mean, mean)), 0.0)
+    return mean, pc.sqrt(variance), count
+
+
+def _log_returns(table: pa.Table) -> pa.Array:
+    ids = _column(table, "instrument_id")
+    close = _column(table, "close")
+    previous = lag(close, ids, 1)
+    positive = pc.and_(pc.greater(close, 0.0), pc.greater(previous, 0.0))
+    return pc.if_else(positive, pc.ln(pc.divide(close, previous)), pa.scalar(None, pa.float64()))
+
+
+def price_jump_rule(window: int = 20, sigma: float = 4.0, min_periods: int = 10, min_std: float = 0.005) -> ValidationRule:
+    def predicate(table: pa.Table) -> pa.Array:
+        ids = _column(table, "instrument_id")
+        returns = _log_returns(table)
+        mean, std, count = rolling_mean_std(returns, ids, window)
+        threshold = pc.multiply(pc.max_element_wise(std, min_std), sigma)
+        return pc.and_(pc.greater_equal(count, float(min_periods)), pc.greater(pc.abs(pc.subtract(returns, mean)), threshold))
+
+    return ValidationRule(
+        "PRICE_JUMP_OUTLIER", "WARN", ("close",), predicate, lookback=window + 1,
+        description=f"log return beyond {sigma:g} sigma of the previous {window} returns",
+    )
+
+
+def stale_price_rule(sessions: int = 5) -> ValidationRule:
+    def predicate(table: pa.Table) -> pa.Array:
+        ids = _column(table, "instrument_id")
+        close = _column(table, "close")
+        stale = pc.invert(_column(table, "is_trade_halted"))
+        for k in range(1, sessions):
+            stale = pc.and_(stale, pc.fill_null(pc.equal(lag(close, ids, k), close), False))
+        return stale
+
+    return ValidationRule(
+        "STALE_PRICE", "WARN", ("close", "is_trade_halted"), predicate, lookback=sessions - 1,
+        description=f"close unchanged for {sessions} consecutive sessions while trading",
+    )
+
+
+def volume_spike_rule(window: int = 20, factor: float = 20.0, min_periods: int = 10, min_mean: float = 1.0) -> ValidationRule:
+    def predicate(table: pa.Table) -> pa.Array:
+        ids = _column(table, "instrument_id")
+        volume = _column(table, "volume")
+        mean, _, count = rolling_mean_std(volume, ids, window)
+        return pc.and_(
+            pc.and_(pc.greater_equal(count, float(min_periods)), pc.greater_equal(mean, min_mean)),
+            pc.greater(volume, pc.multiply(mean, factor)),
+        )
+
+    return ValidationRule(
+        "VOLUME_SPIKE", "WARN", ("volume",), predicate, lookback=window,
+        description=f"volume above {factor:g}x the mean of the previous {window} sessions",
+    )
+
+
+def market_value_mismatch_rule(tolerance: float = 0.02) -> ValidationRule:
+    def predicate(table: pa.Table) -> pa.Array:
+        expected = pc.multiply(_column(table, "close"), _column(table, "listed_shares"))
+        deviation = pc.divide(pc.abs(pc.subtract(_column(table, "market_value"), expected)), expected)
+        return pc.and_(pc.greater(expected, 0.0), pc.greater(deviation, tolerance))
+
+    return ValidationRule(
+        "MARKET_VALUE_MISMATCH", "WARN", ("close", "listed_shares", "market_value"), predicate,
+        description=f"market_value differs from close x listed_shares by more than {tolerance:.0%}",
+    )
+
+
+for _rule in (price_jump_rule(), stale_price_rule(), volume_spike_rule(), market_value_mismatch_rule()):
+    register_rule(_rule)
+
+
+class ValidationEngine:
+    """Evaluates rules in one streaming pass over daily rows of a market, in bounded memory.
+
+    Rows arrive as Arrow record batches ordered by (instrument_id, trade_date). The last `lookback`
+    rows of each batch are carried into the next one so rolling windows span batch boundaries, and
+    rows before `date_from` are loaded only as history for those windows.
+    """
+
+    def __init__(self, repo: Repository, rules: Optional[List[ValidationRule]] = None, batch_size: int = 100_000):
+        self.repo = repo
+        self.rules = rules if rules is not None else get_rules()
+        self.batch_size = batch_size
+
+    def run(self, market_code: str, date_from: str, date_to: str, run_id: RunRef = None) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        persisted_run_id = resolve_run_id(self.repo, run_id)
+        summary: Dict[str, Any] = {"issues_total": 0, "errors": 0, "warnings": 0, "infos": 0, "rows_checked": 0, "by_rule": {r.code: 0 for r in self.rules}}
+        if not self.rules:
+            return summary
+
+        names = ["instrument_id", "trade_date"]
+        for rule in self.rules:
+            names.extend(c for c in rule.columns if c not in names)
+        schema = pa.schema([(name, COLUMNS[name][1]) for name in names])
+        lookback = max(rule.lookback for rule in self.rules)
+        start = date.fromisoformat(str(date_from))
+        # Trading sessions to calendar days, with room for weekends and holidays.
+        history_from = start - timedelta(days=lookback * 2 + 10) if lookback else start
+        query_text = f"""
+            SELECT {", ".join(COLUMNS[name][0] + " AS " + name for name in names)}
+            FROM daily_market_data d
+            JOIN instruments i ON i.instrument_id = d.instrument_id
+            WHERE i.market_code = %s
+              AND d.trade_date BETWEEN %s AND %s
+            ORDER BY d.instrument_id, d.trade_date
+        """
+
+        carry: Optional[pa.Table] = None
+        for batch in self.repo.stream_record_batches(query_text, (market_code, history_from.isoformat(), date_to), schema, self.batch_size):
+            table = pa.Table.from_batches([batch])
+            carried = carry.num_rows if carry is not None else 0
+            if carry is not None:
+                table = pa.concat_tables([carry, table])
+            table = table.combine_chunks()
+            emit = pc.and_(
+                pa.concat_arrays([pa.repeat(False, carried), pa.repeat(True, table.num_rows - carried)]),
+                pc.greater_equal(_column(table, "trade_date"), pa.scalar(start, pa.date32())),
+            )
+            summary["rows_checked"] += pc.sum(pc.cast(emit, pa.int64())).as_py() or 0
+            issues: List[Dict] = []
+            for rule in self.rules:
+                flagged = pc.indices_nonzero(pc.fill_null(pc.and_(rule.predicate(table), emit), False))
+                if not len(flagged):
+                    continue
+                hits = table.select(["instrument_id", "trade_date"]).take(flagged).to_pylist()
+                summary["by_rule"][rule.code] += len(hits)
+                issues.extend(
+                    {
+                        "dataset_name": "daily_market_data",
+                        "trade_date": hit["trade_date"].isoformat(),
+                        "market_code": market_code,
+                        "instrument_id": hit["instrument_id"],
+                        "index_code": None,
+                        "issue_code": rule.code,
+                        "severity": rule.severity,
+                        "issue_detail": rule.description or rule.code,
+                        "source_name": "validation",
+                        "detected_at": now,
+                        "run_id": persisted_run_id,
+                        "resolved_at": None,
+                    }
+                    for hit in hits
+                )
+            if issues:
+                # Written per batch on a second connection: the stream holds its own until the loop ends.
+                self.repo.insert_issues(issues, refresh_summary=False)
+                summary["issues_total"] += len(issues)
+                summary["errors"] += sum(1 for i in issues if i["severity"] == "ERROR")
+                summary["warnings"] += sum(1 for i in issues if i["severity"] == "WARN")
+                summary["infos"] += sum(1 for i in issues if i["severity"] == "INFO")
+            carry = table.slice(table.num_rows - min(lookback, table.num_rows)) if lookback else None
+        resolved = self.repo.resolve_stale_issues("daily_market_data", [rule.code for rule in self.rules], date_from, date_to, now, market_code=market_code, refresh_summary=False)
+        # Batches skip the summary refresh; one pass over the whole range covers them all.
+        if resolved or summary["issues_total"]:
+            self.repo.refresh_issue_summary(date_from, date_to)
+        return summary
@@ -1,7 +1,9 @@
+import threading
 from datetime import date
 
 from financial_data_collector.adjustment_service import AdjustmentService
 from financial_data_collector.collectors import DailyMarketCollector, InstrumentCollector
+from financial_data_collector.repository import Repository
 
 
 def test_adjustment_service_builds_cumulative_factor_from_base_price(repo):
@@ -65,4 +67,66 @@ def test_adjustment_service_defaults_to_one_without_base_price(repo):
 
 def test_adjustment_service_compute_impacted_window():
     out = AdjustmentService.compute_impacted_window("2026-01-10", "2026-01-20", overlap_days=7)
-    assert out == {"date_from": "2026-01-03", "date_to": "2026-01-20"}
\ No newline at end of file
+    assert out == {"date_from": "2026-01-03", "date_to": "2026-01-20"}
+
+
+def test_adjustment_coverage_tracks_daily_inserts_and_rebuilds(repo):
+    InstrumentCollector(repo).collect(
+        [{"instrument_id": "i_cov_1", "external_code": "222333", "market_code": "KOSDAQ", "instrument_name": "Coverage", "listing_date": date(2020, 1, 1)}],
+        "krx",
+    )
+    instrument_id = repo.get_instrument_id_by_external_code("222333", market_code="KOSDAQ")
+    first = [
+        {"instrument_id": instrument_id, "trade_date": date(2026, 1, 2), "open": 100, "high": 110, "low": 90, "close": 100, "volume": 10, "base_price": 100},
+        {"instrument_id": instrument_id, "trade_date": date(2026, 1, 5), "open": 100, "high": 110, "low": 90, "close": 100, "volume": 10, "base_price": 100},
+    ]
+    DailyMarketCollector(repo).collect(first, "krx", "r1")
+    coverage = repo.get_adjustment_coverage("2026-01-01", "2026-01-10")
+    assert (coverage["daily_rows"], coverage["factor_rows"], coverage["is_complete"]) == (2, 0, False)
+
+    AdjustmentService(repo).rebuild_factors("2026-01-01", "2026-01-10")
+    AdjustmentService(repo).rebuild_factors("2026-01-01", "2026-01-10", as_of_timestamp="2026-01-06T00:00:00Z")
+    # A corrected re-collection is an update and keeps the day covered; a new day is not covered yet.
+    DailyMarketCollector(repo).collect([{**first[1], "close": 101}, {**first[1], "trade_date": date(2026, 1, 6)}], "krx", "r2")
+
+    coverage = repo.get_adjustment_coverage("2026-01-01", "2026-01-10")
+    assert (coverage["daily_rows"], coverage["factor_rows"], coverage["is_complete"]) == (3, 2, False)
+    assert coverage["missing_dates"] == [{"trade_date": "2026-01-06", "daily_rows": 1, "missing_rows": 1}]
+    assert repo.get_adjustment_coverage("2026-01-01", "2026-01-10", as_of_date="2026-01-06")["factor_rows"] == 2
+    missing = repo.list_missing_adjustment_factors("2026-01-01", "2026-01-10")
+    assert [(m["trade_date"], m["external_code"]) for m in missing] == [("2026-01-06", "222333")]
+
+    AdjustmentService(repo).rebuild_factors("2026-01-01", "2026-01-10")
+    assert repo.get_adjustment_coverage("2026-01-01", "2026-01-10")["is_complete"] is True
+    assert repo.list_missing_adjustment_factors("2026-01-01", "2026-01-10") == []
+
+    with repo.transaction(pipeline=True):
+        assert repo.clear_price_adjustment_factors("2026-01-01", "2026-01-10", as_of_date="2026-01-06") == 2
+    assert repo.get_adjustment_coverage("2026-01-01", "2026-01-10", as_of_date="2026-01-06")["factor_rows"] == 0
+
+
+def test_adjustment_coverage_bumps_of_other_markets_do_not_wait(repo):
+    for instrument_id, code, market_code in (("i_mk_1", "300001", "KOSPI"), ("i_mk_2", "300002", "KOSDAQ")):
+        InstrumentCollector(repo).collect([{"instrument_id": instrument_id, "external_code": code, "market_code": market_code, "instrument_name": code, "listing_date": date(2020, 1, 1)}], "krx")
+    kospi = repo.get_instrument_id_by_external_code("300001", market_code="KOSPI")
+    kosdaq = repo.get_instrument_id_by_external_code("300002", market_code="KOSDAQ")
+    other = Repository(repo.database_url, schema=repo.schema)
+    done = threading.Event()
+
+    def collect_kosdaq():
+        with other.transaction():
+            DailyMarketCollector(other).collect([{"instrument_id": kosdaq, "trade_date": date(2026, 1, 2), "open": 10, "high": 11, "low": 9, "close": 10, "volume": 1}], "krx", "r2")
+        done.set()
+
+    # The KOSPI day is still open while KOSDAQ commits the same trade date.
+    with repo.transaction():
+        DailyMarketCollector(repo).collect([{"instrument_id": kospi, "trade_date": date(2026, 1, 2), "open": 10, "high": 11, "low": 9, "close": 10, "volume": 1}], "krx", "r1")
+        writer = threading.Thread(target=collect_kosdaq)
+        writer.start()
+        assert done.wait(timeout=5)
+    writer.join()
+
+    coverage = repo.get_adjustment_coverage("2026-01-01", "2026-01-10")
+    assert coverage["daily_rows"] == 2 and coverage["missing_dates"] == [{"trade_date": "2026-01-02", "daily_rows": 2, "missing_rows": 2}]
+    AdjustmentService(repo).rebuild_factors("2026-01-01", "2026-01-10")
+    assert repo.get_adjustment_coverage("2026-01-01", "2026-01-10")["is_complete"] is True
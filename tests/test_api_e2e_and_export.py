@@ -1,14 +1,19 @@
 import importlib
+import json
 from datetime import date
 from pathlib import Path
 
+import pyarrow as pa
 import pyarrow.parquet as pq
 import pytest
 from fastapi.testclient import TestClient
 
 from financial_data_collector.adjustment_service import AdjustmentService
+from financial_data_collector.arrow_responses import ARROW_STREAM_MEDIA_TYPE, INSTRUMENT_DAILY_SCHEMA, PARQUET_MEDIA_TYPE, negotiate_format
 from financial_data_collector.collectors import BenchmarkCollector, DailyMarketCollector, InstrumentCollector
 from financial_data_collector.export_backtest_dataset import export_backtest_dataset
+from financial_data_collector import json_responses
+from financial_data_collector.repository import Repository
 
 
 def _seed_instrument(repo, instrument_id, external_code, market_code, delisting_date=None):
@@ -105,7 +110,8 @@ def test_export_backtest_dataset_requires_rebuilt_factors(repo, monkeypatch, tmp
             )
 
 
-def test_export_backtest_dataset_writes_backtest_ready_parquet(repo, monkeypatch, tmp_path):
+@pytest.mark.parametrize("use_panel", [True, False])
+def test_export_backtest_dataset_writes_backtest_ready_parquet(repo, monkeypatch, tmp_path, use_panel):
     _seed_market_rows(repo)
     with _make_api_client(repo, monkeypatch) as client:
         def api_get(path, params):
@@ -113,6 +119,11 @@ def test_export_backtest_dataset_writes_backtest_ready_parquet(repo, monkeypatch
             response.raise_for_status()
             return response.json()
 
+        def api_batches(path, params):
+            response = client.get(path, params=params, headers={"Accept": ARROW_STREAM_MEDIA_TYPE})
+            response.raise_for_status()
+            return list(pa.ipc.open_stream(response.content))
+
         manifest = export_backtest_dataset(
             base_url="http://testserver",
             output_dir=str(tmp_path),
@@ -120,6 +131,7 @@ def test_export_backtest_dataset_writes_backtest_ready_parquet(repo, monkeypatch
             date_to="2026-01-03",
             series_page_size=1,
             api_get=api_get,
+            api_batches=api_batches if use_panel else None,
         )
 
     assert manifest["counts"]["instruments"] == 2
@@ -140,3 +152,107 @@ def test_export_backtest_dataset_writes_backtest_ready_parquet(repo, monkeypatch
 
     calendar_rows = pq.read_table(Path(tmp_path) / "trading_calendar.parquet").to_pylist()
     assert len(calendar_rows) == 3
+
+
+def test_daily_panel_streams_rows_ordered_by_date_and_code(repo, monkeypatch):
+    _seed_market_rows(repo)
+    with _make_api_client(repo, monkeypatch) as client:
+        response = client.get("/api/v1/panel/daily", params={"date_from": "2026-01-01", "date_to": "2026-01-03"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [(r["trade_date"], r["external_code"]) for r in rows] == [
+            ("2026-01-01", "111111"), ("2026-01-02", "111111"), ("2026-01-02", "222222"), ("2026-01-03", "222222"),
+        ]
+        kospi = client.get("/api/v1/panel/daily", params={"date_from": "2026-01-01", "date_to": "2026-01-03", "market_codes": "kospi"})
+        assert {json.loads(line)["external_code"] for line in kospi.text.splitlines()} == {"222222"}
+        assert client.get("/api/v1/panel/daily", params={"date_from": "2026-01-03", "date_to": "2026-01-01"}).status_code == 400
+
+
+def test_stream_query_releases_connection_when_closed_early(repo):
+    pooled = Repository(repo.database_url, schema=repo.schema, pool_size=1)
+    try:
+        rows = pooled.stream_query("SELECT g FROM generate_series(1, 100) AS g", fetch_size=10)
+        assert next(rows)["g"] == 1
+        rows.close()
+        conn = pooled._get_pool().getconn(timeout=2)
+        pooled._get_pool().putconn(conn)
+        assert [r["g"] for r in pooled.stream_query("SELECT g FROM generate_series(1, 3) AS g")] == [1, 2, 3]
+    finally:
+        pooled.close()
+
+
+def test_daily_endpoints_negotiate_arrow_and_parquet(repo, monkeypatch):
+    _seed_market_rows(repo)
+    with _make_api_client(repo, monkeypatch) as client:
+        params = {"date_from": "2026-01-01", "date_to": "2026-01-03"}
+        arrow = client.get("/api/v1/panel/daily", params=params, headers={"Accept": ARROW_STREAM_MEDIA_TYPE})
+        assert arrow.headers["content-type"] == ARROW_STREAM_MEDIA_TYPE
+        table = pa.ipc.open_stream(arrow.content).read_all()
+        assert table.column("trade_date").type == pa.date32()
+        assert table.column("external_code").to_pylist() == ["111111", "111111", "222222", "222222"]
+        json_rows = [json.loads(line) for line in client.get("/api/v1/panel/daily", params=params).text.splitlines()]
+        assert table.column("adj_close").to_pylist() == [r["adj_close"] for r in json_rows]
+
+        parquet = client.get("/api/v1/instruments/222222/daily", params=params, headers={"Accept": PARQUET_MEDIA_TYPE})
+        assert parquet.headers["content-type"] == PARQUET_MEDIA_TYPE
+        daily = pq.read_table(pa.BufferReader(parquet.content))
+        assert daily.column("close").to_pylist() == [18.0, 21.0]
+
+        bench = client.get("/api/v1/benchmarks/KOSPI/daily", headers={"Accept": ARROW_STREAM_MEDIA_TYPE})
+        assert pa.ipc.open_stream(bench.content).read_all().column("close").to_pylist() == [204.0]
+
+        calendar = client.get("/api/v1/calendar", params={"market_codes": "KOSPI", **params}, headers={"Accept": ARROW_STREAM_MEDIA_TYPE})
+        assert pa.ipc.open_stream(calendar.content).read_all().num_rows == 2
+
+        assert client.get("/api/v1/instruments/222222/daily", params=params).json()["total"] == 2
+
+
+def test_negotiate_format():
+    assert negotiate_format("") == "json"
+    assert negotiate_format("text/html, application/vnd.apache.parquet;q=0.9") == "parquet"
+    assert negotiate_format("application/vnd.apache.arrow.stream;q=0, application/json") == "json"
+
+
+def test_market_cross_section_with_projection(repo, monkeypatch):
+    _seed_market_rows(repo)
+    with _make_api_client(repo, monkeypatch) as client:
+        payload = client.get("/api/v1/markets/kospi/daily/2026-01-02").json()
+        assert payload["count"] == 1
+        assert payload["items"][0]["external_code"] == "222222"
+        row = payload["items"][0]
+        assert row["adj_close"] == pytest.approx(row["close"] * row["cumulative_factor"])
+
+        projected = client.get("/api/v1/markets/KOSPI/daily/2026-01-02", params={"columns": "external_code,adj_close"}).json()
+        assert projected["items"] == [{"external_code": "222222", "adj_close": row["adj_close"]}]
+        assert client.get("/api/v1/markets/KOSPI/daily/2026-01-02", params={"columns": "close;DROP"}).status_code == 400
+
+        arrow = client.get(
+            "/api/v1/markets/KOSDAQ/daily", params={"date_from": "2026-01-01", "date_to": "2026-01-03", "columns": "trade_date,external_code,close"},
+            headers={"Accept": ARROW_STREAM_MEDIA_TYPE},
+        )
+        table = pa.ipc.open_stream(arrow.content).read_all()
+        assert table.schema.names == ["trade_date", "external_code", "close"]
+        assert table.column("close").to_pylist() == [10.0, 5.0]
+
+
+def test_daily_endpoints_return_columnar_json(repo, monkeypatch):
+    _seed_market_rows(repo)
+    with _make_api_client(repo, monkeypatch) as client:
+        rows = client.get("/api/v1/instruments/111111/daily").json()
+        shaped = client.get("/api/v1/instruments/111111/daily", params={"shape": "columnar"}).json()
+        assert shaped["total"] == rows["total"] and "items" not in shaped
+        assert shaped["columns"] == INSTRUMENT_DAILY_SCHEMA.names
+        assert [dict(zip(shaped["columns"], values)) for values in zip(*(shaped["data"][c] for c in shaped["columns"]))] == rows["items"]
+
+        row = client.get("/api/v1/markets/KOSPI/daily/2026-01-02").json()["items"][0]
+        cross_section = client.get("/api/v1/markets/KOSPI/daily/2026-01-02", params={"columns": "external_code,adj_close", "shape": "columnar"}).json()
+        assert cross_section["data"] == {"external_code": ["222222"], "adj_close": [row["adj_close"]]}
+        benchmark = client.get("/api/v1/benchmarks/KOSPI/daily", params={"shape": "columnar"}).json()
+        assert benchmark["data"]["close"] == [204.0]
+        assert client.get("/api/v1/instruments/111111/daily", params={"shape": "wide"}).status_code == 422
+
+        # The stdlib fallback encodes the same document (a different limit keeps the response cache out of it).
+        monkeypatch.setattr(json_responses, "orjson", None)
+        fallback = client.get("/api/v1/instruments/111111/daily", params={"limit": 100}).json()
+        assert fallback == {**rows, "limit": 100}
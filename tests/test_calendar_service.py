@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from financial_data_collector.calendar_builder import TradingCalendarBuilder
+from financial_data_collector.calendar_service import MarketCalendar
+from financial_data_collector.dashboard_routes import get_calendar, get_next_session, get_session_count, get_session_offset
+from financial_data_collector.data_changes import DATA_CHANGED_CHANNEL, start_change_listener
+from financial_data_collector.runs import RunManager
+from test_dashboard_routes import _DummyRequest
+
+
+def _market(*days):
+    # (day of January 2026, is_open)
+    return MarketCalendar("KOSDAQ", [(date(2026, 1, d).toordinal(), is_open, None if is_open else "CLOSED") for d, is_open in days])
+
+
+def test_market_calendar_navigation():
+    calendar = _market((2, True), (3, False), (4, False), (5, True), (6, True), (7, False), (8, True))
+    assert calendar.is_open("2026-01-05") and not calendar.is_open(date(2026, 1, 3))
+    assert calendar.next_open("2026-01-02") == date(2026, 1, 5)
+    assert calendar.next_open("2026-01-05", inclusive=True) == date(2026, 1, 5)
+    assert calendar.next_open("2026-01-08") is None
+    assert calendar.prev_open("2026-01-05") == date(2026, 1, 2)
+    assert calendar.prev_open("2026-01-07", inclusive=True) == date(2026, 1, 6)
+    assert calendar.prev_open("2026-01-02") is None
+    assert calendar.count_open_between("2026-01-01", "2026-01-31") == 4
+    assert calendar.count_open_between("2026-01-03", "2026-01-04") == 0
+    assert calendar.offset("2026-01-02", 2) == date(2026, 1, 6)
+    assert calendar.offset("2026-01-03", 1) == date(2026, 1, 5)
+    assert calendar.offset("2026-01-03", 0) == date(2026, 1, 5)
+    assert calendar.offset("2026-01-07", -2) == date(2026, 1, 5)
+    assert calendar.offset("2026-01-08", 1) is None
+    assert calendar.offset("2026-01-02", -1) is None
+    assert [r["trade_date"] for r in calendar.rows("2026-01-03", "2026-01-05")] == ["2026-01-03", "2026-01-04", "2026-01-05"]
+
+
+def test_builder_writes_range_in_one_statement_and_refreshes_cache(repo):
+    builder = TradingCalendarBuilder(repo)
+    assert builder.build_from_index_days("KOSDAQ", date(2026, 1, 1), date(2026, 1, 10), [date(2026, 1, 2), date(2026, 1, 5), date(2026, 1, 5)], "krx", None) == 10
+    rows = asyncio.run(get_calendar(_DummyRequest(repo), market_codes="kosdaq", date_from="2026-01-01", date_to="2026-01-05"))
+    assert [(r["trade_date"], r["is_open"], r["holiday_name"]) for r in rows] == [
+        ("2026-01-01", False, "CLOSED"), ("2026-01-02", True, None), ("2026-01-03", False, "CLOSED"), ("2026-01-04", False, "CLOSED"), ("2026-01-05", True, None),
+    ]
+    assert {r["market_code"] for r in rows} == {"KOSDAQ"}
+    assert set(rows[0]) == {"market_code", "trade_date", "is_open", "holiday_name"}
+
+    # Rebuilding a range overwrites it and the cached copy follows.
+    builder.build_from_index_days("KOSDAQ", date(2026, 1, 1), date(2026, 1, 10), [date(2026, 1, 2), date(2026, 1, 6)], "krx", None)
+    assert repo.calendar.market("KOSDAQ").next_open("2026-01-02") == date(2026, 1, 6)
+    assert repo.calendar.market("KOSPI").next_open("2026-01-02") is None
+
+
+def test_session_endpoints_answer_from_cache(repo, monkeypatch):
+    TradingCalendarBuilder(repo).build_from_index_days("KOSPI", date(2026, 1, 1), date(2026, 1, 9), [date(2026, 1, d) for d in (2, 5, 6, 7, 8, 9)], "krx", None)
+    request = _DummyRequest(repo)
+    assert asyncio.run(get_next_session("kospi", request, trade_date="2026-01-02", inclusive=False))["trade_date"] == "2026-01-05"
+    monkeypatch.setattr(repo, "query", lambda *args, **kwargs: pytest.fail("calendar lookups must not query the database"))
+    assert asyncio.run(get_session_offset("KOSPI", request, trade_date="2026-01-02", sessions=3))["trade_date"] == "2026-01-07"
+    assert asyncio.run(get_session_count("KOSPI", request, date_from="2026-01-01", date_to="2026-01-31"))["count"] == 6
+    with pytest.raises(HTTPException) as missing:
+        asyncio.run(get_session_offset("KOSPI", request, trade_date="2026-01-09", sessions=1))
+    assert missing.value.status_code == 404
+    with pytest.raises(HTTPException) as invalid:
+        asyncio.run(get_next_session("KOSPI", request, trade_date="not-a-date", inclusive=False))
+    assert invalid.value.status_code == 400
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_listener_drops_cache_on_notification(repo):
+    stop = threading.Event()
+    listener = start_change_listener(repo.database_url, repo.schema, repo.calendar.invalidate, stop, poll_seconds=0.1)
+    try:
+        # Let the listener connect (it drops the cache once on connect) before loading.
+        time.sleep(0.5)
+        repo.calendar.market("KOSDAQ")
+        assert repo.calendar.loaded
+        with repo.connect() as conn:
+            conn.execute(
+                "INSERT INTO trading_calendar(market_code, trade_date, is_open, source_name, collected_at) VALUES ('KOSDAQ', '2026-01-02', TRUE, 'krx', now())"
+            )
+            conn.execute("SELECT pg_notify(%s, %s)", (DATA_CHANGED_CHANNEL, repo.schema))
+        assert _wait_until(lambda: not repo.calendar.loaded)
+        assert repo.calendar.market("KOSDAQ").is_open("2026-01-02")
+    finally:
+        stop.set()
+        listener.join(timeout=5)
+    assert not listener.is_alive()
+
+
+def test_run_finish_refreshes_calendar(repo):
+    manager = RunManager(repo)
+    run = manager.start("test", "krx", "2026-01-01", "2026-01-02")
+    assert repo.calendar.market("KOSDAQ").next_open("2026-01-01") is None
+    with repo.connect() as conn:
+        conn.execute("INSERT INTO trading_calendar(market_code, trade_date, is_open, source_name, collected_at) VALUES ('KOSDAQ', '2026-01-02', TRUE, 'krx', now())")
+    manager.finish(run, success_count=1, failure_count=0, warning_count=0)
+    assert repo.calendar.market("KOSDAQ").next_open("2026-01-01") == date(2026, 1, 2)
@@ -0,0 +1,92 @@
+import json
+from datetime import datetime, time, timedelta, timezone
+
+import pytest
+
+from financial_data_collector.collect_krx_daemon import CollectorDaemon, MarketSchedule, parse_schedule
+from financial_data_collector.krx_client import KRXClient, KRXClientConfig
+from financial_data_collector.runs import RunManager
+
+from test_collect_krx_data import FakeKosdaqOpenAPI
+
+KST = timezone(timedelta(hours=9))
+
+
+def test_parse_schedule_maps_index_codes_by_order():
+    schedules = parse_schedule("kosdaq=08:00, KOSPI=08:30", ["KOSDAQ150", "KOSPI200"])
+    assert [(s.market_code, s.index_code, s.run_at) for s in schedules] == [("KOSDAQ", "KOSDAQ150", time(8, 0)), ("KOSPI", "KOSPI200", time(8, 30))]
+    assert parse_schedule("KOSDAQ=18:45")[0].index_code == "KOSDAQ"
+    with pytest.raises(ValueError):
+        parse_schedule("KOSDAQ")
+    with pytest.raises(ValueError):
+        parse_schedule("KOSDAQ=25:00")
+
+
+def _daemon(repo, tmp_path, openapi=None, **kwargs):
+    clients = []
+
+    def factory():
+        clients.append(KRXClient(KRXClientConfig(auth_key="k"), openapi_client=openapi or FakeKosdaqOpenAPI()))
+        return clients[-1]
+
+    daemon = CollectorDaemon(repo, [MarketSchedule("KOSDAQ", "KOSDAQ", time(8, 0))], client_factory=factory, tz=KST, status_path=str(tmp_path / "status.json"), **kwargs)
+    return daemon, clients
+
+
+def test_daemon_runs_after_schedule_time_and_catches_up(repo, tmp_path):
+    daemon, clients = _daemon(repo, tmp_path)
+    assert daemon.tick(datetime(2026, 1, 7, 7, 59, tzinfo=KST)) == []
+
+    first = daemon.tick(datetime(2026, 1, 7, 8, 0, tzinfo=KST))
+    assert [r["counts"]["daily_market"] for r in first] == [1]
+    assert daemon.tick(datetime(2026, 1, 7, 12, 0, tzinfo=KST)) == []
+
+    # Two days later the daemon collects both missed days in one run, with a fresh client for the new day's quota.
+    caught_up = daemon.tick(datetime(2026, 1, 9, 9, 0, tzinfo=KST))
+    assert caught_up[0]["counts"]["daily_market"] == 2
+    assert len(clients) == 2
+    windows = repo.query("SELECT window_start, window_end, status FROM collection_runs ORDER BY started_at")
+    assert [(r["window_start"], r["window_end"], r["status"]) for r in windows] == [
+        ("2026-01-06", "2026-01-06", "SUCCESS"),
+        ("2026-01-07", "2026-01-08", "SUCCESS"),
+    ]
+
+    status = json.loads((tmp_path / "status.json").read_text(encoding="utf-8"))
+    assert status["state"] == "idle"
+    assert status["markets"]["KOSDAQ"]["done_through"] == "2026-01-08"
+
+
+def test_daemon_resumes_from_last_successful_run(repo, tmp_path):
+    daemon, _ = _daemon(repo, tmp_path)
+    daemon.tick(datetime(2026, 1, 6, 8, 0, tzinfo=KST))
+
+    restarted, _ = _daemon(repo, tmp_path, max_catchup_days=3)
+    result = restarted.tick(datetime(2026, 1, 20, 8, 0, tzinfo=KST))
+    run = repo.query("SELECT window_start, window_end FROM collection_runs WHERE run_id = %s", (result[0]["run_id"],))[0]
+    assert (run["window_start"], run["window_end"]) == ("2026-01-17", "2026-01-19")
+
+
+def test_daemon_resumes_after_runs_that_completed_with_validation_errors(repo, tmp_path):
+    runs = RunManager(repo)
+    completed = runs.start("phase1-collect-KOSDAQ", "krx", "2026-01-05", "2026-01-06")
+    runs.finish(completed, success_count=3, failure_count=1, warning_count=0)
+    aborted = runs.start("phase1-collect-KOSDAQ", "krx", "2026-01-07", "2026-01-08")
+    runs.fail(aborted)
+
+    restarted, _ = _daemon(repo, tmp_path)
+    result = restarted.tick(datetime(2026, 1, 9, 8, 0, tzinfo=KST))
+    run = repo.query("SELECT window_start, window_end FROM collection_runs WHERE run_id = %s", (result[0]["run_id"],))[0]
+    assert (run["window_start"], run["window_end"]) == ("2026-01-07", "2026-01-08")
+
+
+def test_daemon_backs_off_after_failure(repo, tmp_path):
+    class BrokenOpenAPI(FakeKosdaqOpenAPI):
+        def get_kosdaq_stock_base_info(self, bas_dd):
+            raise RuntimeError("upstream down")
+
+    daemon, _ = _daemon(repo, tmp_path, openapi=BrokenOpenAPI())
+    failed = daemon.tick(datetime(2026, 1, 7, 8, 0, tzinfo=KST))
+    assert "upstream down" in failed[0]["error"]
+    assert daemon.tick(datetime(2026, 1, 7, 8, 10, tzinfo=KST)) == []
+    assert daemon.status()["markets"]["KOSDAQ"]["last_error"]
+    assert len(daemon.tick(datetime(2026, 1, 7, 8, 31, tzinfo=KST))) == 1
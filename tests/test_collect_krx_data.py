@@ -1,12 +1,18 @@
 from datetime import date
 
+import psycopg
+import pytest
+
 from financial_data_collector.collect_krx_data import (
     _extract_rows,
     _instrument_uuid,
     _normalize_daily_market,
     _normalize_instrument_code,
     _normalize_instruments,
+    run_collection,
+    run_collection_multi,
 )
+from financial_data_collector.krx_client import KRXClient, KRXClientConfig, KRXClientError
 
 
 def test_extract_rows_with_outblock1():
@@ -58,4 +64,125 @@ def test_normalize_daily_market_trade_halted_ohlc_corrected():
     assert normalized[0]["is_trade_halted"] is True
     assert normalized[0]["open"] == 12345.0
     assert normalized[0]["high"] == 12345.0
-    assert normalized[0]["low"] == 12345.0
\ No newline at end of file
+    assert normalized[0]["low"] == 12345.0
+
+
+class FakeKosdaqOpenAPI:
+    def __init__(self, index_name="KOSDAQ"):
+        self.index_name = index_name
+
+    def get_kosdaq_stock_base_info(self, bas_dd):
+        return {"OutBlock_1": [{"ISU_SRT_CD": "000001", "ISU_NM": "Sample", "LIST_DD": "20200101", "LIST_SHRS": "1000"}]}
+
+    def get_kosdaq_stock_daily_trade(self, bas_dd):
+        return {"OutBlock_1": [{"ISU_SRT_CD": "000001", "TDD_OPNPRC": "100", "TDD_HGPRC": "110", "TDD_LWPRC": "95", "TDD_CLSPRC": "105", "ACC_TRDVOL": "1000"}]}
+
+    def get_kosdaq_stock_daily_base_price(self, bas_dd):
+        return {"OutBlock_1": []}
+
+    def get_kosdaq_daily_trade(self, bas_dd):
+        return {"OutBlock_1": [{"IDX_NM": self.index_name, "OPNPRC_IDX": "900", "HGPRC_IDX": "910", "LWPRC_IDX": "890", "CLSPRC_IDX": "905"}]}
+
+
+def test_run_collection_commits_each_day(repo):
+    client = KRXClient(KRXClientConfig(auth_key="k"), openapi_client=FakeKosdaqOpenAPI())
+    result = run_collection(repo.database_url, "KOSDAQ", "KOSDAQ", date(2026, 1, 5), date(2026, 1, 6), client=client, repo=repo)
+    assert result["counts"] == {"instruments": 1, "daily_market": 2, "benchmark": 2}
+    assert repo.query("SELECT COUNT(*) AS c FROM daily_market_data WHERE run_id = %s", (result["run_id"],))[0]["c"] == 2
+    assert repo.query("SELECT status FROM collection_runs WHERE run_id = %s", (result["run_id"],))[0]["status"] == "SUCCESS"
+
+
+class FakeKosdaqOpenAPIWithSeriesGap(FakeKosdaqOpenAPI):
+    # The "KOSDAQ 150" series is not published on 2026-01-06 while "KOSDAQ" is.
+    def get_kosdaq_daily_trade(self, bas_dd):
+        rows = super().get_kosdaq_daily_trade(bas_dd)["OutBlock_1"]
+        if bas_dd != "20260106":
+            rows = rows + [{"IDX_NM": "KOSDAQ 150", "OPNPRC_IDX": "1200", "HGPRC_IDX": "1210", "LWPRC_IDX": "1190", "CLSPRC_IDX": "1205"}]
+        return {"OutBlock_1": rows}
+
+
+def test_run_collection_flags_benchmark_gaps_over_the_window(repo):
+    client = KRXClient(KRXClientConfig(auth_key="k"), openapi_client=FakeKosdaqOpenAPIWithSeriesGap())
+    run_collection(repo.database_url, "KOSDAQ", "KOSDAQ", date(2026, 1, 5), date(2026, 1, 7), client=client, repo=repo)
+    gaps = repo.query("SELECT trade_date, issue_detail FROM data_quality_issues WHERE issue_code = 'BENCHMARK_DAY_MISSING' AND resolved_at IS NULL")
+    assert gaps == [{"trade_date": "2026-01-06", "issue_detail": "missing benchmark day for KOSDAQ/KOSDAQ 150"}]
+
+    # Re-collecting the missing day once the series is published closes the gap.
+    client = KRXClient(KRXClientConfig(auth_key="k"), openapi_client=FakeKosdaqOpenAPI(index_name="KOSDAQ 150"))
+    run_collection(repo.database_url, "KOSDAQ", "KOSDAQ", date(2026, 1, 6), date(2026, 1, 6), client=client, repo=repo)
+    assert repo.query("SELECT COUNT(*) AS c FROM data_quality_issues WHERE issue_code = 'BENCHMARK_DAY_MISSING' AND resolved_at IS NULL")[0]["c"] == 0
+
+
+def test_run_collection_never_exposes_partial_day(repo):
+    client = KRXClient(KRXClientConfig(auth_key="k"), openapi_client=FakeKosdaqOpenAPI(index_name="X" * 300))
+    with pytest.raises(psycopg.errors.StringDataRightTruncation):
+        run_collection(repo.database_url, "KOSDAQ", "KOSDAQ", date(2026, 1, 5), date(2026, 1, 5), client=client, repo=repo)
+    assert repo.query("SELECT COUNT(*) AS c FROM daily_market_data")[0]["c"] == 0
+    assert repo.query("SELECT status FROM collection_runs")[0]["status"] == "FAILED"
+
+
+def test_run_collection_multi_parallel_isolates_failed_market(repo):
+    # The fake only serves KOSDAQ, so the KOSPI market fails while KOSDAQ still completes.
+    client = KRXClient(KRXClientConfig(auth_key="k"), openapi_client=FakeKosdaqOpenAPI())
+    result = run_collection_multi(repo.database_url, ["KOSDAQ", "KOSPI"], None, date(2026, 1, 5), date(2026, 1, 6), parallel_markets=True, client=client, repo=repo)
+    kosdaq, kospi = result["markets"]
+    assert kosdaq["market_code"] == "KOSDAQ"
+    assert kosdaq["counts"] == {"instruments": 1, "daily_market": 2, "benchmark": 2}
+    assert kospi["market_code"] == "KOSPI"
+    assert kospi["run_id"] is None
+    assert "method not found" in kospi["error"]
+    statuses = {r["pipeline_name"]: r["status"] for r in repo.query("SELECT pipeline_name, status FROM collection_runs")}
+    assert statuses == {"phase1-collect-KOSDAQ": "SUCCESS", "phase1-collect-KOSPI": "FAILED"}
+
+
+def test_krx_client_quota_is_shared_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    client = KRXClient(KRXClientConfig(auth_key="k", daily_limit=50), openapi_client=FakeKosdaqOpenAPI())
+
+    def call(_):
+        try:
+            client.get_daily_market("KOSDAQ", date(2026, 1, 5))
+            return True
+        except KRXClientError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        outcomes = list(executor.map(call, range(200)))
+    assert outcomes.count(True) == 50
+    assert client._call_count == 50
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+def test_repository_transaction_rolls_back_registry(repo, pipeline):
+    with pytest.raises(RuntimeError):
+        with repo.transaction(pipeline=pipeline):
+            repo.insert_missing_instruments([{
+                "instrument_id": _instrument_uuid("KOSDAQ", "000002"), "external_code": "000002", "market_code": "KOSDAQ",
+                "instrument_name": "000002", "listing_date": "2026-01-02", "source_name": "krx", "collected_at": "2026-01-02T00:00:00Z",
+            }])
+            assert repo.get_instrument_id_by_external_code("000002", "KOSDAQ") == _instrument_uuid("KOSDAQ", "000002")
+            raise RuntimeError("abort day")
+    assert repo.get_instrument_id_by_external_code("000002", "KOSDAQ") is None
+    assert repo.query("SELECT COUNT(*) AS c FROM instruments")[0]["c"] == 0
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+def test_insert_missing_instruments_counts_inserted_rows(repo, monkeypatch, pipeline):
+    def row(code):
+        return {
+            "instrument_id": _instrument_uuid("KOSDAQ", code), "external_code": code, "market_code": "KOSDAQ",
+            "instrument_name": code, "listing_date": "2026-01-02", "source_name": "krx", "collected_at": "2026-01-02T00:00:00Z",
+        }
+
+    repo.insert_missing_instruments([row("000001")])
+    invalidated = []
+    monkeypatch.setattr(repo.instruments, "invalidate", lambda: invalidated.append(True))
+    with repo.transaction(pipeline=pipeline):
+        repo.insert_missing_instruments([row("000002"), row("000003")])
+    assert invalidated == []
+    with repo.transaction(pipeline=pipeline):
+        repo.insert_missing_instruments([row("000001"), row("000004")])
+    assert invalidated == [True]
+    stats = repo.query("SELECT row_count FROM dataset_stats WHERE dataset_name = 'instruments' AND partition_key = 'KOSDAQ'")
+    assert stats[0]["row_count"] == 4
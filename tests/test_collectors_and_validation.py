@@ -1,7 +1,9 @@
-from datetime import date
+from datetime import date, datetime, timezone
+from uuid import uuid5
 
 from financial_data_collector.calendar_builder import TradingCalendarBuilder
 from financial_data_collector.collectors import BenchmarkCollector, DailyMarketCollector, InstrumentCollector
+from financial_data_collector.runs import UUID_COERCE_NAMESPACE, RunManager, resolve_run_id
 from financial_data_collector.validation import ValidationJob
 
 
@@ -89,4 +91,204 @@ def test_validation_open_day_missing_issue(repo):
     v = ValidationJob(repo).validate_range("KOSDAQ", "2026-01-02", "2026-01-02", "r1")
     assert v["warnings"] == 1
     issues = repo.query("SELECT issue_code FROM data_quality_issues")
-    assert issues[0]["issue_code"] == "OPEN_DAY_TOTAL_MISSING"
\ No newline at end of file
+    assert issues[0]["issue_code"] == "OPEN_DAY_TOTAL_MISSING"
+
+
+def test_daily_collect_registers_placeholder_instruments(repo):
+    _seed_instrument(repo)
+    DailyMarketCollector(repo).collect([
+        {"instrument_id": "new-1", "external_code": "0002", "market_code": "kosdaq", "trade_date": date(2026, 1, 2), "open": 10, "high": 12, "low": 9, "close": 11, "volume": 100},
+    ], "krx", "r1")
+    instrument_id = repo.get_instrument_id_by_external_code("0002", market_code="KOSDAQ")
+    assert instrument_id is not None
+    assert repo.get_existing_instrument_ids([instrument_id]) == {instrument_id}
+    rows = repo.query("SELECT instrument_id FROM instruments WHERE external_code = '0002'")
+    assert rows[0]["instrument_id"] == instrument_id
+
+
+def test_placeholder_insert_does_not_clobber_instrument_missing_from_registry(repo):
+    _seed_instrument(repo)
+    repo.instruments.invalidate()
+    repo.query(
+        "INSERT INTO instruments(instrument_id, external_code, market_code, instrument_name, listing_date, source_name, collected_at) "
+        "VALUES ('5b0a3f5e-0000-4000-8000-000000000001', '0003', 'KOSDAQ', 'Real Name', '2019-01-01', 'krx', '2026-01-01') RETURNING instrument_id"
+    )
+    DailyMarketCollector(repo).collect([
+        {"instrument_id": "5b0a3f5e-0000-4000-8000-000000000001", "external_code": "0003", "market_code": "KOSDAQ", "trade_date": date(2026, 1, 2), "open": 10, "high": 12, "low": 9, "close": 11, "volume": 100},
+    ], "krx", "r1")
+    assert repo.query("SELECT instrument_name FROM instruments WHERE external_code = '0003'")[0]["instrument_name"] == "Real Name"
+
+
+def test_bulk_update_delisting_dates_keeps_registry_coherent(repo):
+    _seed_instrument(repo)
+    rows = [
+        {"market_code": "KOSDAQ", "external_code": "0001", "delisting_date": "2026-01-15"},
+        {"market_code": "KOSDAQ", "external_code": "9999", "delisting_date": "2026-01-15"},
+    ]
+    assert repo.bulk_update_delisting_dates(rows, source_name="kind") == {"matched": 1, "updated": 1, "unchanged": 0, "unmatched": 1, "invalid": 0}
+    assert repo.instruments.find("0001", "KOSDAQ")["delisting_date"] == "2026-01-15"
+    assert repo.bulk_update_delisting_dates(rows[:1], source_name="kind")["unchanged"] == 1
+    assert repo.query("SELECT delisting_date FROM instruments WHERE external_code = '0001'")[0]["delisting_date"] == "2026-01-15"
+
+
+def test_run_context_skips_per_batch_run_lookup(repo, monkeypatch):
+    _seed_instrument(repo)
+    run = RunManager(repo).start("test", "krx", "2026-01-02", "2026-01-02")
+    original_query = repo.query
+    seen = []
+
+    def tracking_query(query_text, params=()):
+        seen.append(query_text)
+        return original_query(query_text, params)
+
+    monkeypatch.setattr(repo, "query", tracking_query)
+    DailyMarketCollector(repo).collect([
+        {"instrument_id": "i1", "trade_date": date(2026, 1, 2), "open": 10, "high": 12, "low": 9, "close": 11, "volume": 100},
+    ], "krx", run)
+    BenchmarkCollector(repo).collect([
+        {"index_code": "KOSDAQ", "trade_date": date(2026, 1, 2), "open": 100, "high": 101, "low": 99, "close": 100.5},
+    ], "krx", run)
+    ValidationJob(repo).validate_range("KOSDAQ", "2026-01-02", "2026-01-02", run)
+    assert not any("FROM collection_runs" in q for q in seen)
+    assert original_query("SELECT run_id FROM daily_market_data")[0]["run_id"] == run.run_id
+
+
+def test_resolve_run_id_maps_legacy_run_ids_with_uuid5(repo):
+    legacy_run_id = str(uuid5(UUID_COERCE_NAMESPACE, "nightly-2026-01-02"))
+    repo.insert_run({
+        "run_id": legacy_run_id, "pipeline_name": "test", "source_name": "krx", "window_start": "2026-01-02", "window_end": "2026-01-02",
+        "status": "SUCCESS", "started_at": "2026-01-02T00:00:00Z", "finished_at": None, "success_count": 0, "failure_count": 0, "warning_count": 0, "metadata": None,
+    })
+    assert resolve_run_id(repo, "nightly-2026-01-02") == legacy_run_id
+    assert resolve_run_id(repo, "nightly-2026-01-03") is None
+
+
+def test_validation_row_checks_run_in_database(repo):
+    _seed_instrument(repo)
+    instrument_id = repo.get_instrument_id_by_external_code("0001", "KOSDAQ")
+    with repo.connect() as conn:
+        conn.execute(
+            """
+            DO $$
+            DECLARE c record;
+            BEGIN
+                FOR c IN SELECT conname FROM pg_constraint WHERE conrelid = 'daily_market_data'::regclass AND contype = 'c' LOOP
+                    EXECUTE format('ALTER TABLE daily_market_data DROP CONSTRAINT %I', c.conname);
+                END LOOP;
+            END $$
+            """
+        )
+    base = {"instrument_id": instrument_id, "source_name": "krx", "collected_at": "2026-01-06T00:00:00Z", "run_id": None}
+    repo.upsert_daily_market([
+        {**base, "trade_date": "2026-01-02", "open": 10, "high": 9, "low": 8, "close": 11, "volume": -1},
+        {**base, "trade_date": "2026-01-05", "open": 10, "high": 9, "low": 8, "close": 11, "volume": 0, "is_trade_halted": True},
+    ])
+    TradingCalendarBuilder(repo).build_from_index_days(
+        market_code="KOSDAQ",
+        date_from=date(2026, 1, 2),
+        date_to=date(2026, 1, 6),
+        index_trade_dates=[date(2026, 1, 2), date(2026, 1, 5), date(2026, 1, 6)],
+        source_name="krx",
+        run_id=None,
+    )
+    v = ValidationJob(repo).validate_range("KOSDAQ", "2026-01-02", "2026-01-06", None)
+    assert v == {"issues_total": 3, "errors": 2, "warnings": 1, "infos": 0, "rows_checked": 2}
+    issues = repo.query("SELECT trade_date, issue_code FROM data_quality_issues ORDER BY trade_date, issue_code")
+    assert [(r["trade_date"], r["issue_code"]) for r in issues] == [
+        ("2026-01-02", "NEGATIVE_VOLUME"),
+        ("2026-01-02", "OHLC_HIGH_INCONSISTENT"),
+        ("2026-01-06", "OPEN_DAY_TOTAL_MISSING"),
+    ]
+
+
+def test_changed_only_validation_scopes_to_rows_changed_by_run(repo):
+    _seed_instrument(repo)
+    InstrumentCollector(repo).collect([{"instrument_id": "i2", "external_code": "0002", "market_code": "kosdaq", "instrument_name": "B", "listing_date": date(2020, 1, 1)}], "krx")
+    manager = RunManager(repo)
+    first = manager.start("test", "krx", "2026-01-02", "2026-01-06")
+    bars = [
+        {"instrument_id": iid, "trade_date": date(2026, 1, 2), "open": 10, "high": 12, "low": 9, "close": 11, "volume": 100}
+        for iid in ("i1", "i2")
+    ]
+    DailyMarketCollector(repo).collect(bars, "krx", first)
+    TradingCalendarBuilder(repo).build_from_index_days(
+        market_code="KOSDAQ",
+        date_from=date(2026, 1, 2),
+        date_to=date(2026, 1, 6),
+        index_trade_dates=[date(2026, 1, 2), date(2026, 1, 5)],
+        source_name="krx",
+        run_id=first,
+    )
+    assert ValidationJob(repo).validate_range("KOSDAQ", "2026-01-02", "2026-01-06", first, changed_only=True)["rows_checked"] == 2
+
+    second = manager.start("test", "krx", "2026-01-02", "2026-01-06")
+    DailyMarketCollector(repo).collect([bars[0], {**bars[1], "close": 11.5}], "krx", second)
+    owners = repo.query("SELECT i.external_code, d.run_id FROM daily_market_data d JOIN instruments i USING (instrument_id) ORDER BY i.external_code")
+    assert [r["run_id"] for r in owners] == [first.run_id, second.run_id]
+
+    v = ValidationJob(repo).validate_range("KOSDAQ", "2026-01-02", "2026-01-06", second, changed_only=True)
+    assert v["rows_checked"] == 1
+    # Coverage is still judged against the whole table, not just the change set.
+    assert v["warnings"] == 1
+    assert ValidationJob(repo).validate_range("KOSDAQ", "2026-01-02", "2026-01-06", second)["rows_checked"] == 2
+
+
+def test_validation_reruns_upsert_and_resolve_issues(repo):
+    _seed_instrument(repo)
+    TradingCalendarBuilder(repo).build_from_index_days(
+        market_code="KOSDAQ",
+        date_from=date(2026, 1, 2),
+        date_to=date(2026, 1, 2),
+        index_trade_dates=[date(2026, 1, 2)],
+        source_name="krx",
+        run_id=None,
+    )
+    manager = RunManager(repo)
+    first = manager.start("test", "krx", "2026-01-02", "2026-01-02")
+    second = manager.start("test", "krx", "2026-01-02", "2026-01-02")
+    ValidationJob(repo).validate_range("KOSDAQ", "2026-01-02", "2026-01-02", first)
+    assert ValidationJob(repo).validate_range("KOSDAQ", "2026-01-02", "2026-01-02", second)["warnings"] == 1
+    issues = repo.query("SELECT market_code, run_id, resolved_at FROM data_quality_issues")
+    assert [(r["market_code"], r["run_id"], r["resolved_at"]) for r in issues] == [("KOSDAQ", second.run_id, None)]
+
+    DailyMarketCollector(repo).collect([
+        {"instrument_id": "i1", "trade_date": date(2026, 1, 2), "open": 10, "high": 12, "low": 9, "close": 11, "volume": 100},
+    ], "krx", second)
+    assert ValidationJob(repo).validate_range("KOSDAQ", "2026-01-02", "2026-01-02", second, changed_only=True)["issues_total"] == 0
+    assert repo.query("SELECT resolved_at FROM data_quality_issues")[0]["resolved_at"] is not None
+
+
+def test_purge_resolved_issues_keeps_open_and_recent(repo):
+    base = {"dataset_name": "benchmark_index_data", "index_code": "KOSDAQ", "severity": "WARN", "source_name": "krx", "detected_at": "2026-01-01T00:00:00Z"}
+    repo.insert_issues([
+        {**base, "trade_date": "2026-01-01", "issue_code": "OLD", "resolved_at": "2020-01-01T00:00:00Z"},
+        {**base, "trade_date": "2026-01-02", "issue_code": "OLD", "resolved_at": "2020-01-02T00:00:00Z"},
+        {**base, "trade_date": "2026-01-03", "issue_code": "RECENT", "resolved_at": datetime.now(timezone.utc).isoformat()},
+        {**base, "trade_date": "2026-01-04", "issue_code": "OPEN"},
+    ])
+    assert repo.purge_resolved_issues(older_than_days=30, batch_size=1) == 2
+    assert sorted(r["issue_code"] for r in repo.query("SELECT issue_code FROM data_quality_issues")) == ["OPEN", "RECENT"]
+
+
+def test_benchmark_gap_issue_resolves_when_day_arrives(repo):
+    run = RunManager(repo).start("test", "krx", "2026-01-05", "2026-01-07")
+    bar = {"index_code": "KOSDAQ", "open": 100, "high": 101, "low": 99, "close": 100.5}
+    collector = BenchmarkCollector(repo)
+    collector.collect([{**bar, "trade_date": date(2026, 1, 5)}, {**bar, "trade_date": date(2026, 1, 7)}], "krx", run)
+    collector.collect([{**bar, "trade_date": date(2026, 1, 5)}, {**bar, "trade_date": date(2026, 1, 7)}], "krx", run)
+    assert repo.query("SELECT COUNT(*) AS c FROM data_quality_issues WHERE resolved_at IS NULL")[0]["c"] == 1
+    collector.collect([{**bar, "trade_date": date(2026, 1, 6)}], "krx", run)
+    assert repo.query("SELECT COUNT(*) AS c FROM data_quality_issues WHERE resolved_at IS NULL")[0]["c"] == 0
+
+
+def test_benchmark_gaps_follow_trading_calendar(repo):
+    run = RunManager(repo).start("test", "krx", "2026-01-01", "2026-01-31")
+    repo.upsert_trading_calendar([
+        {"market_code": "KOSDAQ", "trade_date": "2026-01-13", "is_open": False, "holiday_name": "holiday", "source_name": "krx", "collected_at": "2026-01-01T00:00:00Z"},
+    ])
+    bar = {"index_code": "KOSDAQ", "open": 100, "high": 101, "low": 99, "close": 100.5}
+    # Fri 01-09 .. Fri 01-16: the weekend and the calendar holiday are not gaps, Wed 01-14 is.
+    BenchmarkCollector(repo).collect([{**bar, "trade_date": date(2026, 1, day)} for day in (9, 12, 15, 16)], "krx", run)
+    rows = repo.query("SELECT trade_date FROM data_quality_issues WHERE issue_code = 'BENCHMARK_DAY_MISSING'")
+    assert [r["trade_date"] for r in rows] == ["2026-01-14"]
+    assert ("open_days", "KOSDAQ", "2026-01-09", "2026-01-16") in run.cache
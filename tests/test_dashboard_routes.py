@@ -1,8 +1,10 @@
 import asyncio
+import threading
 from datetime import date
 
 from financial_data_collector.collectors import BenchmarkCollector, DailyMarketCollector, InstrumentCollector
-from financial_data_collector.dashboard_routes import get_benchmark_series, get_instrument_profile, get_instruments, get_prices
+from financial_data_collector.dashboard_routes import get_benchmark_series, get_instrument_profile, get_instruments, get_prices, get_quality_issues, get_quality_summary, get_summary
+from financial_data_collector.repository import Repository
 
 
 class _DummyState:
@@ -16,8 +18,9 @@ class _DummyApp:
 
 
 class _DummyRequest:
-    def __init__(self, repo):
+    def __init__(self, repo, headers=None):
         self.app = _DummyApp(repo)
+        self.headers = headers or {}
 
 
 def _seed_instrument(repo, instrument_id="seed-1", external_code="111111", market_code="KOSDAQ", delisting_date=None):
@@ -84,4 +87,101 @@ def test_dashboard_benchmark_defaults_to_available_series(repo):
     ], "krx", "r1")
     payload = asyncio.run(get_benchmark_series("KOSDAQ", _DummyRequest(repo), series_name="", date_from="", date_to="", limit=5, offset=0))
     assert payload["total"] == 1
-    assert payload["items"][0]["close"] == 100.5
\ No newline at end of file
+    assert payload["items"][0]["close"] == 100.5
+
+
+def test_dashboard_summary_is_maintained_by_upserts(repo):
+    _seed_instrument(repo, instrument_id="s1", external_code="666666")
+    _seed_instrument(repo, instrument_id="s2", external_code="777777", market_code="KOSPI")
+    kosdaq = repo.get_instrument_id_by_external_code("666666", market_code="KOSDAQ")
+    kospi = repo.get_instrument_id_by_external_code("777777", market_code="KOSPI")
+    rows = [
+        {"instrument_id": kosdaq, "trade_date": date(2026, 1, 2), "open": 10, "high": 11, "low": 9, "close": 10, "volume": 1000},
+        {"instrument_id": kospi, "trade_date": date(2026, 1, 5), "open": 20, "high": 21, "low": 19, "close": 20, "volume": 1000},
+    ]
+    DailyMarketCollector(repo).collect(rows, "krx", "r1")
+    # Re-collecting and correcting existing rows changes neither counts nor bounds.
+    DailyMarketCollector(repo).collect(rows + [{**rows[0], "close": 10.5}], "krx", "r2")
+    DailyMarketCollector(repo).collect([{**rows[0], "trade_date": date(2025, 12, 30)}], "krx", "r3")
+    BenchmarkCollector(repo).collect([
+        {"index_code": "KOSPI", "index_name": "KOSPI", "trade_date": date(2026, 1, 5), "open": 100, "high": 101, "low": 99, "close": 100.5}
+    ], "krx", "r1")
+
+    payload = asyncio.run(get_summary(_DummyRequest(repo)))
+    assert payload["instrument_count"] == 2
+    assert (payload["price_count"], payload["price_date_from"], payload["price_date_to"]) == (3, "2025-12-30", "2026-01-05")
+    assert (payload["benchmark_count"], payload["benchmark_date_from"], payload["benchmark_date_to"]) == (1, "2026-01-05", "2026-01-05")
+    by_partition = {(p["dataset_name"], p["partition_key"]): p["row_count"] for p in payload["partitions"]}
+    assert by_partition[("daily_market_data", "KOSDAQ")] == 2
+    assert by_partition[("daily_market_data", "KOSPI")] == 1
+    assert by_partition[("benchmark_index_data", "KOSPI/KOSPI")] == 1
+
+    with repo.connect() as conn:
+        conn.execute("DELETE FROM daily_market_data WHERE trade_date = DATE '2025-12-30'")
+    repo.rebuild_dataset_stats()
+    payload = asyncio.run(get_summary(_DummyRequest(repo)))
+    assert (payload["price_count"], payload["price_date_from"]) == (2, "2026-01-02")
+
+
+def test_concurrent_instrument_writers_recount_stats_in_turn(repo):
+    _seed_instrument(repo, instrument_id="c1", external_code="111111")
+    other = Repository(repo.database_url, schema=repo.schema)
+    errors = []
+
+    def second_writer():
+        try:
+            _seed_instrument(other, instrument_id="c3", external_code="333333", market_code="KOSPI")
+        except Exception as exc:
+            errors.append(exc)
+
+    with repo.transaction():
+        _seed_instrument(repo, instrument_id="c2", external_code="222222")
+        writer = threading.Thread(target=second_writer)
+        writer.start()
+        writer.join(timeout=0.5)
+        # Waits for the first recount to commit instead of re-inserting rows it cannot see yet.
+        assert writer.is_alive()
+    writer.join(timeout=10)
+    assert errors == []
+    payload = asyncio.run(get_summary(_DummyRequest(repo)))
+    assert payload["instrument_count"] == 3
+    assert {p["partition_key"]: p["row_count"] for p in payload["partitions"] if p["dataset_name"] == "instruments"} == {"KOSDAQ": 2, "KOSPI": 1}
+
+
+def _issue(trade_date, instrument_id, issue_code="HIGH_LT_LOW", severity="ERROR"):
+    return {
+        "dataset_name": "daily_market_data", "trade_date": trade_date, "instrument_id": instrument_id, "index_code": None,
+        "issue_code": issue_code, "severity": severity, "issue_detail": issue_code, "source_name": "validation",
+        "detected_at": "2026-01-05T00:00:00Z", "run_id": None, "resolved_at": None,
+    }
+
+
+def test_quality_summary_follows_issue_writes_and_resolution(repo):
+    _seed_instrument(repo, instrument_id="q1", external_code="555555")
+    instrument_id = repo.get_instrument_id_by_external_code("555555", market_code="KOSDAQ")
+    repo.insert_issues([_issue("2026-01-02", instrument_id), _issue("2026-01-05", instrument_id), _issue("2026-01-05", instrument_id, "VOLUME_SPIKE", "WARN")])
+    payload = asyncio.run(get_quality_summary(_DummyRequest(repo), date_from="2026-01-01", date_to="2026-01-31", market_code="kosdaq", dataset_name="", issue_code="", severity=""))
+    assert payload["totals"] == {"ERROR": {"open_count": 2, "resolved_count": 0}, "WARN": {"open_count": 1, "resolved_count": 0}}
+    assert [(r["trade_date"], r["issue_code"]) for r in payload["items"]] == [("2026-01-05", "HIGH_LT_LOW"), ("2026-01-05", "VOLUME_SPIKE"), ("2026-01-02", "HIGH_LT_LOW")]
+
+    assert repo.resolve_stale_issues("daily_market_data", ["HIGH_LT_LOW"], "2026-01-02", "2026-01-02", "2026-01-06T00:00:00Z", market_code="KOSDAQ") == 1
+    payload = asyncio.run(get_quality_summary(_DummyRequest(repo), date_from="", date_to="", market_code="", dataset_name="", issue_code="", severity="error"))
+    assert payload["totals"] == {"ERROR": {"open_count": 1, "resolved_count": 1}}
+
+
+def test_quality_issues_keyset_pagination_and_status(repo):
+    _seed_instrument(repo, instrument_id="q2", external_code="666666")
+    instrument_id = repo.get_instrument_id_by_external_code("666666", market_code="KOSDAQ")
+    repo.insert_issues([_issue(f"2026-01-{day:02d}", instrument_id) for day in range(1, 6)])
+    repo.resolve_stale_issues("daily_market_data", ["HIGH_LT_LOW"], "2026-01-01", "2026-01-01", "2026-01-06T00:00:00Z")
+
+    def page(after_id, status="open"):
+        return asyncio.run(get_quality_issues(_DummyRequest(repo), date_from="", date_to="", market_code="", dataset_name="", issue_code="", severity="", status=status, after_id=after_id, limit=2))
+
+    first = page(None)
+    second = page(first["next_after_id"])
+    assert [r["trade_date"] for r in first["items"] + second["items"]] == ["2026-01-05", "2026-01-04", "2026-01-03", "2026-01-02"]
+    assert second["next_after_id"] is None
+    resolved = page(None, status="resolved")
+    assert [r["trade_date"] for r in resolved["items"]] == ["2026-01-01"]
+    assert resolved["items"][0]["market_code"] == "KOSDAQ"
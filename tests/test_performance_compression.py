@@ -0,0 +1,89 @@
+import os
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+
+import pyarrow as pa
+import pytest
+
+from financial_data_collector import response_compression, server
+from financial_data_collector.adjustment_service import AdjustmentService
+from financial_data_collector.arrow_responses import ARROW_STREAM_MEDIA_TYPE
+from financial_data_collector.export_backtest_dataset import export_backtest_dataset
+from test_api_e2e_and_export import _make_api_client
+
+pytestmark = [
+    pytest.mark.performance,
+    pytest.mark.postgres,
+    pytest.mark.skipif(os.getenv("RUN_PERF_TESTS") != "1", reason="set RUN_PERF_TESTS=1 to run performance tests"),
+]
+
+
+def _seed(repo, instruments: int, days: int) -> tuple:
+    ids = [str(uuid4()) for _ in range(instruments)]
+    now = "2026-01-02T00:00:00Z"
+    repo.upsert_instruments(
+        {"instrument_id": iid, "external_code": f"{n:06d}", "market_code": "KOSPI", "instrument_name": f"perf-{n}", "listing_date": "2000-01-01", "source_name": "perf", "collected_at": now}
+        for n, iid in enumerate(ids)
+    )
+    trade_dates = [date(2025, 1, 1) + timedelta(days=d) for d in range(days)]
+    for d, trade_date in enumerate(trade_dates):
+        repo.upsert_daily_market(
+            {
+                "instrument_id": iid, "trade_date": trade_date, "open": 100 + d, "high": 110 + d, "low": 90 + d, "close": 100 + d + n % 7,
+                "volume": 1000 * (n + 1) + d, "turnover_value": 1e6 + n * d, "market_value": 1e9 + n, "listed_shares": 10_000 + n, "base_price": 100 + d,
+                "source_name": "perf", "collected_at": now, "run_id": None,
+            }
+            for n, iid in enumerate(ids)
+        )
+    repo.upsert_benchmark({"index_code": "KOSPI", "trade_date": t, "open": 1, "high": 2, "low": 1, "close": 2, "source_name": "perf", "collected_at": now} for t in trade_dates)
+    repo.upsert_trading_calendar({"market_code": "KOSPI", "trade_date": t, "is_open": True, "holiday_name": None, "source_name": "perf", "collected_at": now} for t in trade_dates)
+    AdjustmentService(repo).rebuild_factors(trade_dates[0].isoformat(), trade_dates[-1].isoformat())
+    return trade_dates[0].isoformat(), trade_dates[-1].isoformat()
+
+
+def test_export_bytes_and_time_with_and_without_compression(repo, monkeypatch, tmp_path):
+    instruments = int(os.getenv("PERF_EXPORT_INSTRUMENTS", "200"))
+    days = int(os.getenv("PERF_EXPORT_DAYS", "120"))
+    link_mbps = float(os.getenv("PERF_LINK_MBPS", "100"))
+    date_from, date_to = _seed(repo, instruments, days)
+    # Every export must reach the database and the encoder, not the response cache.
+    monkeypatch.setattr(server, "RESPONSE_CACHE_MAX_MB", 0)
+
+    encodings = ["identity", "gzip"] + (["zstd"] if response_compression.zstandard is not None else [])
+    results = {}
+    with _make_api_client(repo, monkeypatch) as client:
+        # The first export pays for cold caches and query plans; run it untimed.
+        for encoding in ["warmup"] + encodings:
+            wire = {"bytes": 0, "decoded": 0}
+
+            def fetch(path, params, accept="application/json"):
+                response = client.get(path, params=params, headers={"accept": accept, "accept-encoding": "identity" if encoding == "warmup" else encoding})
+                response.raise_for_status()
+                wire["bytes"] += response.num_bytes_downloaded
+                wire["decoded"] += len(response.content)
+                return response
+
+            started = time.perf_counter()
+            manifest = export_backtest_dataset(
+                base_url="http://testserver",
+                output_dir=str(tmp_path / encoding),
+                date_from=date_from,
+                date_to=date_to,
+                api_get=lambda path, params: fetch(path, params).json(),
+                api_batches=lambda path, params: list(pa.ipc.open_stream(fetch(path, params, ARROW_STREAM_MEDIA_TYPE).content)),
+            )
+            elapsed = time.perf_counter() - started
+            assert manifest["counts"]["instrument_daily"] == instruments * days
+            if encoding != "warmup":
+                results[encoding] = {**wire, "seconds": elapsed, "link_seconds": elapsed + wire["bytes"] * 8 / (link_mbps * 1e6)}
+
+    print(f"\ninstruments={instruments} days={days} link={link_mbps}Mbit/s (loopback time + modelled transfer time)")
+    for encoding, r in results.items():
+        print(
+            f"{encoding:>8}: wire={r['bytes'] / 1e6:.2f}MB decoded={r['decoded'] / 1e6:.2f}MB ratio={r['bytes'] / r['decoded']:.3f} "
+            f"loopback={r['seconds']:.2f}s at_link={r['link_seconds']:.2f}s"
+        )
+    assert results["gzip"]["decoded"] == results["identity"]["decoded"]
+    assert results["gzip"]["bytes"] < results["identity"]["bytes"] * 0.7
+    assert results["gzip"]["link_seconds"] < results["identity"]["link_seconds"]
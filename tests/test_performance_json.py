@@ -0,0 +1,85 @@
+import os
+import statistics
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+
+import pytest
+from fastapi import APIRouter, FastAPI, Query, Request
+from fastapi.testclient import TestClient
+
+from financial_data_collector.arrow_responses import INSTRUMENT_DAILY_SCHEMA
+from financial_data_collector.json_responses import FastJSONRoute, columnar
+
+pytestmark = [
+    pytest.mark.performance,
+    pytest.mark.postgres,
+    pytest.mark.skipif(os.getenv("RUN_PERF_TESTS") != "1", reason="set RUN_PERF_TESTS=1 to run performance tests"),
+]
+
+
+def _page_app(repo) -> FastAPI:
+    """The instrument daily page behind FastAPI's default encoding and behind FastJSONRoute."""
+    app = FastAPI()
+    app.state.repo = repo
+    default_router = APIRouter()
+    fast_router = APIRouter(route_class=FastJSONRoute)
+
+    async def page(external_code: str, request: Request, limit: int = Query(2000), shape: str = Query("rows")):
+        payload = request.app.state.repo.get_instrument_daily(external_code, limit=limit)
+        if shape == "columnar":
+            payload.update(columnar(payload.pop("items"), INSTRUMENT_DAILY_SCHEMA.names))
+        return payload
+
+    default_router.add_api_route("/default/{external_code}", page)
+    fast_router.add_api_route("/fast/{external_code}", page)
+    app.include_router(default_router)
+    app.include_router(fast_router)
+    return app
+
+
+def _measure(client: TestClient, path: str, params: dict, pages: int) -> dict:
+    wall, cpu, size = [], [], 0
+    for _ in range(pages):
+        started, started_cpu = time.perf_counter(), time.process_time()
+        response = client.get(path, params=params)
+        cpu.append(time.process_time() - started_cpu)
+        wall.append(time.perf_counter() - started)
+        assert response.status_code == 200
+        size = len(response.content)
+    wall.sort()
+    return {
+        "p50_ms": statistics.median(wall) * 1000,
+        "p99_ms": wall[min(len(wall) - 1, int(len(wall) * 0.99))] * 1000,
+        "cpu_ms": statistics.mean(cpu) * 1000,
+        "bytes": size,
+    }
+
+
+def test_fast_json_page_latency_and_cpu(repo):
+    rows_per_page = int(os.getenv("PERF_JSON_ROWS", "2000"))
+    pages = int(os.getenv("PERF_JSON_PAGES", "30"))
+    instrument_id = str(uuid4())
+    repo.upsert_instruments([{"instrument_id": instrument_id, "external_code": "900000", "market_code": "KOSPI", "instrument_name": "perf", "listing_date": "2000-01-01", "source_name": "perf", "collected_at": "2026-01-01T00:00:00Z"}])
+    start = date(2000, 1, 3)
+    repo.upsert_daily_market(
+        {
+            "instrument_id": instrument_id, "trade_date": start + timedelta(days=n), "open": 100 + n, "high": 110 + n, "low": 90 + n, "close": 105 + n,
+            "volume": 1000 + n, "turnover_value": 1e6 + n, "market_value": 1e9, "listed_shares": 10_000, "base_price": 100 + n,
+            "source_name": "perf", "collected_at": "2026-01-02T00:00:00Z", "run_id": None,
+        }
+        for n in range(rows_per_page)
+    )
+
+    results = {}
+    with TestClient(_page_app(repo)) as client:
+        for label, path, shape in (("default", "/default/900000", "rows"), ("fast", "/fast/900000", "rows"), ("fast_columnar", "/fast/900000", "columnar")):
+            client.get(path, params={"shape": shape})
+            results[label] = _measure(client, path, {"shape": shape}, pages)
+
+    print(f"\nrows/page={rows_per_page} pages={pages}")
+    for label, r in results.items():
+        print(f"{label:>14}: p50={r['p50_ms']:.1f}ms p99={r['p99_ms']:.1f}ms cpu/page={r['cpu_ms']:.1f}ms bytes={r['bytes']}")
+    assert results["fast"]["p50_ms"] < results["default"]["p50_ms"]
+    assert results["fast"]["cpu_ms"] < results["default"]["cpu_ms"]
+    assert results["fast_columnar"]["bytes"] < results["fast"]["bytes"]
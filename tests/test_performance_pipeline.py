@@ -0,0 +1,134 @@
+import os
+import queue
+import socket
+import threading
+import time
+from uuid import uuid4
+
+import pytest
+from psycopg.conninfo import conninfo_to_dict, make_conninfo
+
+from financial_data_collector.repository import Repository
+from financial_data_collector.runs import RunManager
+
+pytestmark = [
+    pytest.mark.performance,
+    pytest.mark.postgres,
+    pytest.mark.skipif(os.getenv("RUN_PERF_TESTS") != "1", reason="set RUN_PERF_TESTS=1 to run performance tests"),
+]
+
+
+class LatencyProxy:
+    """Local TCP proxy that delays every chunk by `one_way_delay_sec` in each direction."""
+
+    def __init__(self, upstream_dsn: str, one_way_delay_sec: float):
+        params = conninfo_to_dict(upstream_dsn)
+        host = params.get("host") or "localhost"
+        port = int(params.get("port") or 5432)
+        if host.startswith("/"):
+            self.upstream = (socket.AF_UNIX, os.path.join(host, f".s.PGSQL.{port}"))
+        else:
+            self.upstream = (socket.AF_INET, (host, port))
+        self.delay = one_way_delay_sec
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.port = self.listener.getsockname()[1]
+        self.dsn = make_conninfo(upstream_dsn, host="127.0.0.1", port=str(self.port), sslmode="disable")
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            upstream = socket.socket(self.upstream[0], socket.SOCK_STREAM)
+            upstream.connect(self.upstream[1])
+            for src, dst in ((client, upstream), (upstream, client)):
+                pending: "queue.Queue" = queue.Queue()
+                threading.Thread(target=self._read, args=(src, pending), daemon=True).start()
+                threading.Thread(target=self._write, args=(dst, pending), daemon=True).start()
+
+    def _read(self, src: socket.socket, pending: "queue.Queue") -> None:
+        while True:
+            try:
+                data = src.recv(65536)
+            except OSError:
+                data = b""
+            pending.put((time.monotonic() + self.delay, data))
+            if not data:
+                return
+
+    @staticmethod
+    def _write(dst: socket.socket, pending: "queue.Queue") -> None:
+        while True:
+            deadline, data = pending.get()
+            wait = deadline - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            if not data:
+                try:
+                    dst.shutdown(socket.SHUT_WR)
+                except OSError:
+                    pass
+                return
+            try:
+                dst.sendall(data)
+            except OSError:
+                return
+
+    def close(self) -> None:
+        self.listener.close()
+
+
+def _day_workload(repo: Repository, run_id: str, instrument_ids, trade_date: str) -> None:
+    now = "2026-01-02T00:00:00Z"
+    with repo.transaction():
+        repo.upsert_daily_market(
+            {"instrument_id": iid, "trade_date": trade_date, "open": 10, "high": 12, "low": 9, "close": 11, "volume": 100, "source_name": "perf", "collected_at": now, "run_id": run_id}
+            for iid in instrument_ids
+        )
+        repo.insert_issues(
+            {"dataset_name": "daily_market_data", "trade_date": trade_date, "instrument_id": iid, "issue_code": "PERF", "severity": "INFO", "source_name": "perf", "detected_at": now, "run_id": run_id}
+            for iid in instrument_ids[:5]
+        )
+        repo.upsert_benchmark([{"index_code": "KOSDAQ", "trade_date": trade_date, "open": 1, "high": 1, "low": 1, "close": 1, "source_name": "perf", "collected_at": now, "run_id": run_id}])
+        repo.update_run(run_id, {"success_count": len(instrument_ids)})
+
+
+def test_pipeline_mode_throughput_over_latency_proxy(repo):
+    latency_ms = float(os.getenv("PERF_PROXY_LATENCY_MS", "10"))
+    rows_per_day = int(os.getenv("PERF_ROWS_PER_DAY", "200"))
+    days = int(os.getenv("PERF_DAYS", "10"))
+    instrument_ids = [str(uuid4()) for _ in range(rows_per_day)]
+    repo.upsert_instruments(
+        {"instrument_id": iid, "external_code": f"{n:06d}", "market_code": "KOSDAQ", "instrument_name": "perf", "listing_date": "2020-01-01", "source_name": "perf", "collected_at": "2026-01-01T00:00:00Z"}
+        for n, iid in enumerate(instrument_ids)
+    )
+    run_id = RunManager(repo).start("perf", "perf", "2020-01-01", "2020-12-31").run_id
+
+    proxy = LatencyProxy(repo.database_url, latency_ms / 2000.0)
+    results = {}
+    try:
+        for label, pipeline in (("plain", False), ("pipeline", True)):
+            proxied = Repository(proxy.dsn, schema=repo.schema, pool_size=1, pipeline=pipeline)
+            try:
+                proxied.query("SELECT 1 AS ok")
+                started = time.perf_counter()
+                for day in range(days):
+                    _day_workload(proxied, run_id, instrument_ids, f"2020-02-{day + 1:02d}")
+                results[label] = time.perf_counter() - started
+            finally:
+                proxied.close()
+    finally:
+        proxy.close()
+
+    print(
+        f"\nlatency={latency_ms}ms rows/day={rows_per_day} days={days} "
+        f"plain={days / results['plain']:.2f} days/s pipeline={days / results['pipeline']:.2f} days/s "
+        f"speedup={results['plain'] / results['pipeline']:.2f}x"
+    )
+    assert repo.query("SELECT COUNT(*) AS c FROM daily_market_data")[0]["c"] == rows_per_day * days
+    assert results["pipeline"] < results["plain"]
@@ -0,0 +1,152 @@
+import time
+
+from financial_data_collector.adjustment_service import AdjustmentService
+from financial_data_collector.response_cache import ENTRY_OVERHEAD_BYTES, DataVersion, ResponseCache, cache_key
+from financial_data_collector.runs import RunManager
+from test_api_e2e_and_export import _make_api_client, _seed_market_rows
+
+
+def _entry(size):
+    return (200, [], b"x" * (size - ENTRY_OVERHEAD_BYTES))
+
+
+def test_cache_evicts_least_recently_used_by_bytes():
+    cache = ResponseCache(max_bytes=3000, max_entry_bytes=1500)
+    cache.reset("v1")
+    keys = [cache_key("v1", f"/api/v1/{name}", b"", "") for name in "abc"]
+    for key in keys:
+        assert cache.put(key, _entry(1000))
+    assert cache.get(keys[0]) is not None
+    assert cache.put(cache_key("v1", "/api/v1/d", b"", ""), _entry(1000))
+    # b was least recently used once a was read.
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+    assert cache.size == 3000
+    assert not cache.put(cache_key("v1", "/api/v1/big", b"", ""), _entry(2000))
+
+
+def test_cache_key_normalizes_parameters_and_drops_old_versions():
+    assert cache_key("v1", "/p", b"b=2&a=1&c=", "") == cache_key("v1", "/p", b"a=1&b=2", "application/json")
+    assert cache_key("v1", "/p", b"", "application/vnd.apache.arrow.stream") != cache_key("v1", "/p", b"", "")
+    cache = ResponseCache(max_bytes=10_000)
+    cache.reset("v1")
+    assert cache.put(cache_key("v1", "/p", b"", ""), _entry(500))
+    cache.reset("v2")
+    assert len(cache) == 0
+    # A request that read the old token before the switch finishes late: its body is not stored.
+    assert not cache.put(cache_key("v1", "/p", b"", ""), _entry(500))
+    assert cache.put(cache_key("v2", "/p", b"", ""), _entry(500))
+    assert len(cache) == 1
+
+
+def test_data_version_resets_the_cache_only_when_the_token_changes():
+    tokens = iter(["v1", "v1", "v2"])
+    cache = ResponseCache(max_bytes=10_000)
+    version = DataVersion(lambda: next(tokens), on_change=cache.reset)
+    assert version.current() == "v1"
+    assert cache.put(cache_key("v1", "/p", b"", ""), _entry(500))
+    version.refresh()
+    assert len(cache) == 1
+    version.refresh()
+    assert version.current() == "v2" and len(cache) == 0
+
+
+def test_api_responses_are_cached_until_a_run_finishes(repo, monkeypatch):
+    _seed_market_rows(repo)
+    with _make_api_client(repo, monkeypatch) as client:
+        params = {"limit": 10, "offset": 0, "search": ""}
+        first = client.get("/api/v1/instruments", params=params)
+        assert first.headers["x-cache"] == "MISS"
+        second = client.get("/api/v1/instruments", params={"offset": 0, "limit": 10})
+        assert second.headers["x-cache"] == "HIT"
+        assert second.json() == first.json()
+        assert client.get("/health").headers.get("x-cache") is None
+
+        with repo.connect() as conn:
+            conn.execute("UPDATE instruments SET instrument_name = 'Renamed' WHERE external_code = '111111'")
+        assert client.get("/api/v1/instruments", params=params).headers["x-cache"] == "HIT"
+
+        run = RunManager(repo).start("test", "krx", "2026-01-01", "2026-01-01")
+        RunManager(repo).finish(run, success_count=1, failure_count=0, warning_count=0)
+        deadline = time.monotonic() + 5
+        while True:
+            response = client.get("/api/v1/instruments", params=params)
+            if response.headers["x-cache"] == "MISS" or time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+        assert response.headers["x-cache"] == "MISS"
+        assert "Renamed" in {item["instrument_name"] for item in response.json()["items"]}
+
+
+def test_etag_revalidation_skips_the_query_and_tracks_each_instrument(repo, monkeypatch):
+    _seed_market_rows(repo)
+    with _make_api_client(repo, monkeypatch) as client:
+        # Uncompressed, so the ETags stay strong (compression weakens them).
+        first = client.get("/api/v1/instruments/111111/daily", headers={"accept-encoding": "identity"})
+        other = client.get("/api/v1/instruments/222222/daily", headers={"accept-encoding": "identity"})
+        listing = client.get("/api/v1/instruments")
+        etag = first.headers["etag"]
+        assert etag.startswith('"') and etag != other.headers["etag"]
+        assert client.get("/api/v1/instruments/111111/daily", headers={"accept": "application/vnd.apache.arrow.stream"}).headers["etag"] != etag
+
+        def no_query(*args, **kwargs):
+            raise AssertionError("row query ran for a revalidation")
+
+        monkeypatch.setattr(repo, "get_instrument_daily", no_query)
+        not_modified = client.get("/api/v1/instruments/111111/daily", headers={"if-none-match": f'W/{etag}, "stale"'})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag and not_modified.content == b""
+        monkeypatch.undo()
+
+        with repo.connect() as conn:
+            conn.execute("UPDATE daily_market_data SET close = 19, collected_at = collected_at + interval '1 day' WHERE trade_date = DATE '2026-01-03'")
+        run = RunManager(repo).start("test", "krx", "2026-01-03", "2026-01-03")
+        RunManager(repo).finish(run, success_count=1, failure_count=0, warning_count=0)
+        deadline = time.monotonic() + 5
+        while client.get("/api/v1/instruments", headers={"if-none-match": listing.headers["etag"]}).status_code == 304 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert client.get("/api/v1/instruments", headers={"if-none-match": listing.headers["etag"]}).status_code == 200
+
+        # The run only rewrote 222222, so 111111 still revalidates.
+        assert client.get("/api/v1/instruments/111111/daily", headers={"if-none-match": etag}).status_code == 304
+        changed = client.get("/api/v1/instruments/222222/daily", headers={"if-none-match": other.headers["etag"]})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != other.headers["etag"]
+        assert changed.json()["items"][0]["close"] == 19
+
+        series = client.get("/api/v1/benchmarks/KOSPI/daily")
+        assert client.get("/api/v1/benchmarks/KOSPI/daily", headers={"if-none-match": series.headers["etag"]}).status_code == 304
+
+
+def test_factor_rebuild_refreshes_cached_bodies_and_etags(repo, monkeypatch):
+    _seed_market_rows(repo)
+    with _make_api_client(repo, monkeypatch) as client:
+        path = "/api/v1/instruments/111111/daily"
+        client.get(path)
+        cached = client.get(path)
+        coverage = client.get("/api/v1/adjustments/coverage", params={"date_from": "2026-01-01", "date_to": "2026-01-03"})
+        assert cached.headers["x-cache"] == "HIT"
+
+        AdjustmentService(repo).rebuild_factors("2026-01-01", "2026-01-03")
+        # No run finished, yet the body is rebuilt under the new ETag rather than replayed from the cache.
+        rebuilt = client.get(path)
+        assert rebuilt.headers["x-cache"] == "MISS" and rebuilt.headers["etag"] != cached.headers["etag"]
+        assert client.get(path, headers={"if-none-match": rebuilt.headers["etag"]}).status_code == 304
+
+        deadline = time.monotonic() + 5
+        while True:
+            response = client.get("/api/v1/adjustments/coverage", params={"date_from": "2026-01-01", "date_to": "2026-01-03"}, headers={"if-none-match": coverage.headers["etag"]})
+            if response.status_code == 200 or time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+        assert response.status_code == 200 and response.headers["etag"] != coverage.headers["etag"]
+
+
+def test_data_version_ignores_validation_runs_that_change_nothing(repo):
+    _seed_market_rows(repo)
+    before = repo.get_data_version()
+    runs = RunManager(repo)
+    runs.finish(runs.start("validate-data", "validation", "2026-01-01", "2026-01-03"), success_count=4, failure_count=0, warning_count=0)
+    assert repo.get_data_version() == before
+    runs.finish(runs.start("phase1-collect-KOSPI", "krx", "2026-01-03", "2026-01-03"), success_count=1, failure_count=0, warning_count=0)
+    assert repo.get_data_version() != before
@@ -0,0 +1,57 @@
+import pyarrow as pa
+import pytest
+
+from financial_data_collector import response_compression
+from financial_data_collector.arrow_responses import ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE
+from financial_data_collector.response_compression import negotiate_encoding
+from test_api_e2e_and_export import _make_api_client, _seed_market_rows
+
+PANEL_PATH = "/api/v1/panel/daily"
+PANEL_PARAMS = {"date_from": "2026-01-01", "date_to": "2026-01-03"}
+
+
+def test_negotiate_encoding(monkeypatch):
+    monkeypatch.setattr(response_compression, "zstandard", object())
+    assert negotiate_encoding("gzip, deflate, zstd") == "zstd"
+    assert negotiate_encoding("zstd;q=0.5, gzip") == "gzip"
+    assert negotiate_encoding("*") == "zstd"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("") is None
+    monkeypatch.setattr(response_compression, "zstandard", None)
+    assert negotiate_encoding("zstd") is None
+    assert negotiate_encoding("zstd, gzip;q=0.1") == "gzip"
+
+
+def test_bulk_responses_are_compressed_while_streaming(repo, monkeypatch):
+    _seed_market_rows(repo)
+    with _make_api_client(repo, monkeypatch) as client:
+        plain = client.get(PANEL_PATH, params=PANEL_PARAMS, headers={"accept-encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+
+        zipped = client.get(PANEL_PATH, params=PANEL_PARAMS, headers={"accept-encoding": "gzip"})
+        assert zipped.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in zipped.headers["vary"]
+        assert zipped.content == plain.content
+        assert zipped.num_bytes_downloaded < plain.num_bytes_downloaded
+
+        # Cached identity bodies are re-encoded per request.
+        daily = client.get("/api/v1/instruments/111111/daily", headers={"accept-encoding": "identity"})
+        cached = client.get("/api/v1/instruments/111111/daily", headers={"accept-encoding": "gzip"})
+        assert cached.headers["x-cache"] == "HIT" and cached.headers["content-encoding"] == "gzip"
+        assert cached.json() == daily.json()
+        assert cached.headers["etag"] == f"W/{daily.headers['etag']}"
+        assert client.get("/api/v1/instruments/111111/daily", headers={"accept-encoding": "gzip", "if-none-match": cached.headers["etag"]}).status_code == 304
+
+        arrow = client.get(PANEL_PATH, params=PANEL_PARAMS, headers={"accept": ARROW_STREAM_MEDIA_TYPE, "accept-encoding": "gzip"})
+        assert arrow.headers["content-encoding"] == "gzip"
+        assert pa.ipc.open_stream(arrow.content).read_all().num_rows == 4
+        parquet = client.get(PANEL_PATH, params=PANEL_PARAMS, headers={"accept": PARQUET_MEDIA_TYPE, "accept-encoding": "gzip"})
+        assert "content-encoding" not in parquet.headers
+        small = client.get("/api/v1/calendar/KOSPI/next", params={"date": "2026-01-02"}, headers={"accept-encoding": "gzip"})
+        assert small.status_code == 200 and "content-encoding" not in small.headers
+
+        if response_compression.zstandard is None:
+            pytest.skip("zstandard is not installed")
+        zstd = client.get(PANEL_PATH, params=PANEL_PARAMS, headers={"accept-encoding": "gzip, zstd"})
+        assert zstd.headers["content-encoding"] == "zstd"
+        assert zstd.content == plain.content
@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from financial_data_collector.repository import Repository
+from financial_data_collector.schema_migrations import Migration, MigrationError, apply_migrations, load_migrations
+
+
+def test_init_schema_is_a_noop_once_current(repo):
+    rows = repo.query("SELECT version, name, baselined FROM schema_migrations ORDER BY version")
+    assert [(r["version"], r["name"], r["baselined"]) for r in rows][:2] == [(1, "platform_schema", False), (2, "platform_postgres_migrations", False)]
+    assert [r["version"] for r in rows] == [m.version for m in load_migrations()]
+    assert repo.init_schema() == []
+
+
+def test_init_schema_adopts_pre_versioning_database(repo):
+    with repo.connect() as conn:
+        conn.execute("DROP TABLE schema_migrations")
+    assert repo.init_schema() == [m.version for m in load_migrations()]
+    rows = repo.query("SELECT version, baselined FROM schema_migrations ORDER BY version")
+    assert [(r["version"], r["baselined"]) for r in rows][:2] == [(1, True), (2, False)]
+
+
+def test_init_schema_rejects_edited_migration(repo):
+    with repo.connect() as conn:
+        conn.execute("UPDATE schema_migrations SET checksum = repeat('0', 64) WHERE version = 2")
+    with pytest.raises(MigrationError, match="checksum mismatch"):
+        repo.init_schema()
+
+
+def test_new_migration_file_is_applied_once(repo, tmp_path):
+    step = tmp_path / "9999_add_probe.sql"
+    step.write_text("CREATE TABLE migration_probe (id INTEGER PRIMARY KEY);\n", encoding="utf-8")
+    migrations = load_migrations() + [Migration(9999, "add_probe", step)]
+    with repo.connect() as conn:
+        assert apply_migrations(conn, migrations) == [9999]
+    with repo.connect() as conn:
+        assert apply_migrations(conn, migrations) == []
+    assert repo.query("SELECT to_regclass('migration_probe') IS NOT NULL AS present")[0]["present"] is True
+
+
+def test_load_migrations_rejects_bad_file_names(tmp_path):
+    sql_dir = tmp_path / "sql"
+    (sql_dir / "migrations").mkdir(parents=True)
+    for name in ("platform_schema.sql", "platform_postgres_migrations.sql"):
+        (sql_dir / name).write_text(Path("sql", name).read_text(encoding="utf-8-sig"), encoding="utf-8")
+    (sql_dir / "migrations" / "add_thing.sql").write_text("SELECT 1;", encoding="utf-8")
+    with pytest.raises(MigrationError):
+        load_migrations(sql_dir)
+
+
+def test_concurrent_starters_apply_schema_once(repo):
+    schema = f"{repo.schema}_race"
+    with repo.connect() as conn:
+        conn.execute(f'CREATE SCHEMA "{schema}"')
+    try:
+        starters = [Repository(repo.database_url, schema=schema) for _ in range(4)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            applied = list(executor.map(lambda r: r.init_schema(), starters))
+        assert sorted(len(a) for a in applied) == [0, 0, 0, len(load_migrations())]
+    finally:
+        with repo.connect() as conn:
+            conn.execute(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+
+def test_issue_key_migration_dedupes_existing_rows(repo):
+    with repo.connect() as conn:
+        conn.execute("DROP INDEX uq_data_quality_issues_natural_key")
+        conn.execute("ALTER TABLE data_quality_issues DROP COLUMN market_code")
+        conn.execute("DELETE FROM schema_migrations WHERE version >= 4")
+        for detected_at in ("2026-01-01", "2026-01-03", "2026-01-02"):
+            conn.execute(
+                "INSERT INTO data_quality_issues(dataset_name, trade_date, index_code, issue_code, severity, source_name, detected_at) "
+                "VALUES ('benchmark_index_data', '2026-01-02', 'KOSDAQ', 'BENCHMARK_DAY_MISSING', 'WARN', 'krx', %s)",
+                (detected_at,),
+            )
+    assert 4 in repo.init_schema()
+    rows = repo.query("SELECT detected_at FROM data_quality_issues")
+    assert len(rows) == 1
+    assert str(rows[0]["detected_at"]).startswith("2026-01-03")
@@ -0,0 +1,48 @@
+from datetime import date
+
+from financial_data_collector import validate_data
+from financial_data_collector.calendar_builder import TradingCalendarBuilder
+from financial_data_collector.repository import Repository
+from financial_data_collector.validate_data import plan_chunks, run_validation
+
+from test_validation_rules import _seed_series
+
+
+def test_plan_chunks_covers_range_per_market():
+    chunks = plan_chunks(["KOSDAQ", "KOSPI"], date(2026, 1, 1), date(2026, 1, 10), chunk_days=4)
+    assert [(m, f.day, t.day) for m, f, t in chunks] == [
+        ("KOSDAQ", 1, 4), ("KOSDAQ", 5, 8), ("KOSDAQ", 9, 10),
+        ("KOSPI", 1, 4), ("KOSPI", 5, 8), ("KOSPI", 9, 10),
+    ]
+
+
+def test_run_validation_matches_single_pass_totals(repo):
+    _seed_series(repo)
+    TradingCalendarBuilder(repo).build_from_index_days(
+        market_code="KOSDAQ",
+        date_from=date(2026, 2, 10),
+        date_to=date(2026, 2, 12),
+        index_trade_dates=[date(2026, 2, 10), date(2026, 2, 11)],
+        source_name="krx",
+        run_id=None,
+    )
+    result = run_validation(repo.database_url, ["kosdaq"], date(2026, 1, 1), date(2026, 2, 12), chunk_days=7, workers=3, rules=["PRICE_JUMP_OUTLIER"], repo=repo)
+    assert len(result["chunks"]) == 7
+    assert result["failed_chunks"] == 0
+    assert result["totals"] == {"rows_checked": 80, "issues_total": 4, "errors": 0, "warnings": 4, "infos": 0}
+    assert all("seconds" in chunk for chunk in result["chunks"])
+    run = repo.query("SELECT pipeline_name, status, warning_count FROM collection_runs WHERE run_id = %s", (result["run_id"],))[0]
+    assert (run["pipeline_name"], run["status"], run["warning_count"]) == ("validate-data", "PARTIAL", 4)
+    issues = repo.query("SELECT issue_code, COUNT(*) AS c FROM data_quality_issues WHERE run_id = %s GROUP BY issue_code ORDER BY issue_code", (result["run_id"],))
+    assert [(r["issue_code"], r["c"]) for r in issues] == [("OPEN_DAY_TOTAL_MISSING", 2), ("PRICE_JUMP_OUTLIER", 2)]
+
+
+def test_run_validation_with_rules_on_its_own_pool(repo, monkeypatch):
+    # The CLI path: run_validation builds its own pool, and the rule engine writes issues while it streams.
+    _seed_series(repo)
+    monkeypatch.setattr(validate_data, "Repository", lambda url, pool_size: Repository(url, schema=repo.schema, pool_size=pool_size))
+    result = run_validation(repo.database_url, ["kosdaq"], date(2026, 1, 1), date(2026, 2, 12), chunk_days=60, workers=1, rules=["PRICE_JUMP_OUTLIER"])
+    assert result["failed_chunks"] == 0
+    assert result["totals"]["issues_total"] == 2
+    issues = repo.query("SELECT COUNT(*) AS c FROM data_quality_issues WHERE run_id = %s AND issue_code = 'PRICE_JUMP_OUTLIER'", (result["run_id"],))
+    assert issues[0]["c"] == 2
@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+
+import pyarrow as pa
+import pytest
+
+from financial_data_collector.collectors import InstrumentCollector
+from financial_data_collector.validation import ValidationJob
+from financial_data_collector.validation_rules import (
+    RULES,
+    ValidationEngine,
+    get_rules,
+    market_value_mismatch_rule,
+    price_jump_rule,
+    stale_price_rule,
+    volume_spike_rule,
+)
+
+
+def _table(**columns):
+    n = len(next(iter(columns.values())))
+    columns.setdefault("instrument_id", ["a"] * n)
+    columns.setdefault("trade_date", [date(2026, 1, 1) + timedelta(days=i) for i in range(n)])
+    columns.setdefault("is_trade_halted", [False] * n)
+    return pa.table(columns)
+
+
+def test_registry_exposes_statistical_rules():
+    assert {"PRICE_JUMP_OUTLIER", "STALE_PRICE", "VOLUME_SPIKE", "MARKET_VALUE_MISMATCH"} <= set(RULES)
+    with pytest.raises(ValueError):
+        get_rules(["NOT_A_RULE"])
+
+
+def test_price_jump_flags_outlier_within_same_instrument_only():
+    closes = [100.0 * (1.01 if i % 2 else 0.99) for i in range(12)] + [150.0]
+    rule = price_jump_rule(window=10, sigma=4.0, min_periods=5)
+    assert rule.predicate(_table(close=closes)).to_pylist()[-1] is True
+    # The same jump across an instrument boundary is not a return.
+    ids = ["a"] * 12 + ["b"]
+    assert not any(rule.predicate(_table(close=closes, instrument_id=ids)).to_pylist())
+
+
+def test_stale_volume_and_market_value_rules():
+    stale = stale_price_rule(sessions=3).predicate(_table(close=[10.0, 10.0, 10.0, 11.0], is_trade_halted=[False, False, False, False]))
+    assert stale.to_pylist() == [False, False, True, False]
+    halted = stale_price_rule(sessions=3).predicate(_table(close=[10.0, 10.0, 10.0], is_trade_halted=[False, False, True]))
+    assert halted.to_pylist() == [False, False, False]
+
+    spike = volume_spike_rule(window=5, factor=10.0, min_periods=3).predicate(_table(volume=[100.0, 110.0, 90.0, 100.0, 5000.0]))
+    assert spike.to_pylist() == [False, False, False, False, True]
+
+    mismatch = market_value_mismatch_rule(tolerance=0.02).predicate(
+        _table(close=[10.0, 10.0, 10.0], listed_shares=[100.0, 100.0, None], market_value=[1000.0, 1500.0, 1.0])
+    )
+    assert [bool(v) for v in mismatch.to_pylist()] == [False, True, False]
+
+
+def _seed_series(repo, days=40, jump_day=30):
+    InstrumentCollector(repo).collect(
+        [{"instrument_id": code, "external_code": code, "market_code": "KOSDAQ", "instrument_name": code, "listing_date": date(2020, 1, 1)} for code in ("000001", "000002")],
+        "krx",
+    )
+    rows = []
+    for code in ("000001", "000002"):
+        instrument_id = repo.get_instrument_id_by_external_code(code, "KOSDAQ")
+        for i in range(days):
+            close = 100.0 * (1.01 if i % 2 else 0.99)
+            if code == "000001" and i == jump_day:
+                close = 180.0
+            rows.append({
+                "instrument_id": instrument_id, "trade_date": (date(2026, 1, 1) + timedelta(days=i)).isoformat(),
+                "open": close, "high": close, "low": close, "close": close, "volume": 1000,
+                "source_name": "krx", "collected_at": "2026-03-01T00:00:00Z",
+            })
+    repo.upsert_daily_market(rows)
+
+
+@pytest.mark.parametrize("batch_size", [7, 100_000])
+def test_engine_streams_batches_with_rolling_history(repo, batch_size):
+    _seed_series(repo)
+    summary = ValidationEngine(repo, [price_jump_rule(window=10, min_periods=5)], batch_size=batch_size).run("KOSDAQ", "2026-01-21", "2026-02-09")
+    assert summary["rows_checked"] == 40
+    # Only the jump is flagged; its own return widens the window enough to absorb the reversion.
+    assert summary["by_rule"] == {"PRICE_JUMP_OUTLIER": 1}
+    issues = repo.query("SELECT trade_date, issue_code, severity FROM data_quality_issues")
+    assert [(r["trade_date"], r["issue_code"], r["severity"]) for r in issues] == [("2026-01-31", "PRICE_JUMP_OUTLIER", "WARN")]
+
+
+def test_validate_range_adds_rule_counts(repo):
+    _seed_series(repo)
+    summary = ValidationJob(repo).validate_range("KOSDAQ", "2026-01-01", "2026-02-09", None, rules=["PRICE_JUMP_OUTLIER"])
+    assert summary["rows_checked"] == 80
+    # With the default 20-session window the reversion after the jump is an outlier too.
+    assert summary["warnings"] == 2
+    issues = repo.query("SELECT trade_date FROM data_quality_issues WHERE issue_code = 'PRICE_JUMP_OUTLIER' ORDER BY trade_date")
+    assert [r["trade_date"] for r in issues] == ["2026-01-31", "2026-02-01"]